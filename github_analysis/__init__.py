@@ -0,0 +1,65 @@
+"""Reusable building blocks for the *Analyzing Popular Repositories on GitHub* report.
+
+The notebook (and its ``.py`` export) walks through the analysis cell by cell.
+This package holds the same steps as importable functions so they can be run
+on scraped dumps far larger than the 1,500 repos of ``Github_data.csv``.
+"""
+
+import importlib
+
+# Public names and the module defining each. They are imported on first
+# access, so ``python -m github_analysis.<module>`` does not find its own
+# module already imported by the package.
+_EXPORTS = {
+    "COUNT_COLUMNS": "schema",
+    "OPTIONAL_COLUMNS": "schema",
+    "RAW_TO_CLEAN": "schema",
+    "AggregateCube": "cube",
+    "CleaningReport": "cleaning",
+    "CorrelationAccumulator": "correlation",
+    "CountMinSketch": "sketches",
+    "Deduplicator": "dedup",
+    "DescribeSketch": "quantiles",
+    "GroupedCorrelation": "correlation",
+    "Instrumentation": "instrumentation",
+    "KLLSketch": "quantiles",
+    "Leaderboard": "leaderboards",
+    "RelatedRepos": "related",
+    "RepoTopics": "dedup",
+    "RunningAggregates": "aggregates",
+    "SnapshotStore": "snapshots",
+    "SpaceSaving": "sketches",
+    "TagIndex": "tag_index",
+    "TagTable": "tags",
+    "clean_counts": "cleaning",
+    "compact_github_df": "schema",
+    "contribution_correlations": "correlation",
+    "deduplicate": "dedup",
+    "instrumented": "instrumentation",
+    "iter_clean_chunks": "loading",
+    "load_cached_github_df": "cache",
+    "load_github_df": "loading",
+    "memory_report": "schema",
+    "parse_counts": "cleaning",
+    "parse_topic_tags": "tags",
+    "run_analysis": "mapreduce",
+    "run_analysis_csv": "mapreduce",
+    "select_columns": "schema",
+    "top_tags": "sketches",
+    "top_users": "sketches",
+    "topic_tag_totals": "tags",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,76 @@
+"""Run selected sections of the analysis from the command line.
+
+Usage::
+
+    python -m github_analysis Github_data.csv --sections tags
+    python -m github_analysis Github_data.csv --sections popularity,users --out report
+
+Only the columns the chosen sections need are read and cleaned, and only
+their aggregates are computed. The result frames are printed; with ``--out``
+the sections' figures are also rendered there, as by ``github_analysis.report``.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from github_analysis import instrumentation
+from github_analysis.cache import DEFAULT_CACHE_DIR, load_cached_github_df
+from github_analysis.loading import DEFAULT_CSV
+from github_analysis.mapreduce import run_analysis
+from github_analysis.sections import SECTIONS, plan
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m github_analysis", description="Run sections of the analysis.")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="scraped CSV (default: %(default)s)")
+    parser.add_argument(
+        "--sections", default=",".join(SECTIONS), help="comma-separated sections (default: %(default)s)"
+    )
+    parser.add_argument("--out", default=None, help="also render the sections' figures to this directory")
+    parser.add_argument("--formats", default="png", help="comma-separated figure formats, e.g. png,svg")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="read the CSV without using the cache")
+    parser.add_argument("--dedup", action="store_true", help="count repos listed under several topics once")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        selection = plan(args.sections, dedup=args.dedup)
+    except ValueError as error:
+        parser.error(str(error))
+
+    instrumentation.enable_from_args(args)
+    start = time.perf_counter()
+    try:
+        github_df, _, status = load_cached_github_df(
+            args.csv, cache_dir=args.cache_dir, columns=selection.columns, use_cache=not args.no_cache
+        )
+        outputs = run_analysis(github_df, workers=args.workers, sections=selection.sections, dedup=args.dedup)
+        if args.out:
+            # Imported here so plain runs never load matplotlib
+            from github_analysis.report import render_report, report_inputs
+
+            render_report(
+                report_inputs(outputs, github_df, dedup=args.dedup),
+                out_dir=args.out,
+                formats=args.formats.split(","),
+                workers=args.workers,
+                figures=selection.figures,
+                cache_dir=args.cache_dir,
+            )
+    finally:
+        instrumentation.disable()
+    elapsed = time.perf_counter() - start
+
+    with pd.option_context("display.width", 120, "display.max_columns", 20):
+        for name, value in outputs.items():
+            if name == "tag_counts":
+                continue  # the full tag histogram; toptags_df shows its head
+            print(f"== {name}\n{value}\n")
+    print(f"sections {', '.join(selection.sections)}: {len(selection.columns)} columns, cache {status}, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
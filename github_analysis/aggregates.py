@@ -0,0 +1,96 @@
+"""Incremental, mergeable per-topic aggregates (In[6] and In[24]).
+
+In[6] builds ``pop_mean_df`` with ``github_df.groupby("Topic").mean()`` and
+In[24] sums ``Total_Tags`` with ``groupby("Topic").sum()``, both from scratch.
+``RunningAggregates`` keeps the running non-null count, sum and sum of squares
+of every numeric column per group instead. New batches of repos are folded in
+with ``update`` and stores built by separate runs are combined with ``merge``
+(or ``+``); means, totals and variances come out without rescanning history.
+"""
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.schema import COUNT_COLUMNS
+
+STATISTICS = ("count", "sum", "sumsq")
+
+
+class RunningAggregates:
+    """Per-group count, sum and sum of squares of ``columns``, keyed by ``by``."""
+
+    def __init__(self, by: str = "Topic", columns: list | None = None):
+        self.by = by
+        self.columns = list(COUNT_COLUMNS if columns is None else columns)
+        empty = pd.DataFrame(columns=self.columns, index=pd.Index([], name=by), dtype=np.float64)
+        self.stats = {stat: empty.copy() for stat in STATISTICS}
+
+    def _fold(self, stats: dict) -> None:
+        for stat in STATISTICS:
+            self.stats[stat] = self.stats[stat].add(stats[stat], fill_value=0).sort_index()
+
+    def update(self, chunk: pd.DataFrame) -> "RunningAggregates":
+        """Fold a batch of cleaned rows into the store."""
+        values = pd.DataFrame(chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan), columns=self.columns)
+        keys = pd.Series(chunk[self.by].to_numpy(), name=self.by)
+        grouped = values.groupby(keys, sort=False, observed=True)
+        squared = (values * values).groupby(keys, sort=False, observed=True)
+        self._fold({"count": grouped.count(), "sum": grouped.sum(), "sumsq": squared.sum()})
+        return self
+
+    def merge(self, other: "RunningAggregates") -> "RunningAggregates":
+        """Fold another store, e.g. from a separate run or shard, into this one."""
+        if other.by != self.by or other.columns != self.columns:
+            raise ValueError("Cannot merge aggregates over different keys or columns")
+        self._fold(other.stats)
+        return self
+
+    def __add__(self, other: "RunningAggregates") -> "RunningAggregates":
+        return self.copy().merge(other)
+
+    def copy(self) -> "RunningAggregates":
+        result = RunningAggregates(self.by, self.columns)
+        result.stats = {stat: frame.copy() for stat, frame in self.stats.items()}
+        return result
+
+    def sum(self) -> pd.DataFrame:
+        """Per-group totals, like ``groupby(by).sum().reset_index()``."""
+        return self.stats["sum"].reset_index()
+
+    def mean(self) -> pd.DataFrame:
+        """Per-group means, like ``pop_mean_df`` in In[6]."""
+        counts = self.stats["count"]
+        return (self.stats["sum"] / counts.where(counts > 0)).reset_index()
+
+    def var(self, ddof: int = 1) -> pd.DataFrame:
+        """Per-group variances from the running moments."""
+        counts = self.stats["count"]
+        mean = self.stats["sum"] / counts.where(counts > 0)
+        centered = (self.stats["sumsq"] - counts * mean * mean).clip(lower=0)
+        return (centered / (counts - ddof).where(counts > ddof)).reset_index()
+
+    def std(self, ddof: int = 1) -> pd.DataFrame:
+        variance = self.var(ddof=ddof)
+        variance[self.columns] = np.sqrt(variance[self.columns])
+        return variance
+
+    def to_frame(self) -> pd.DataFrame:
+        """All statistics in one frame with ``(statistic, column)`` columns."""
+        return pd.concat(self.stats, axis=1, names=["statistic", "column"])
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "RunningAggregates":
+        """Rebuild a store from the output of ``to_frame``."""
+        columns = frame["count"].columns.tolist()
+        result = cls(by=frame.index.name, columns=columns)
+        result.stats = {stat: frame[stat].astype(np.float64).rename_axis(columns=None) for stat in STATISTICS}
+        return result
+
+    def save(self, path: str) -> None:
+        self.to_frame().to_csv(path)
+
+    @classmethod
+    def load(cls, path: str) -> "RunningAggregates":
+        frame = pd.read_csv(path, header=[0, 1], index_col=0)
+        frame.columns = frame.columns.set_names(["statistic", "column"])
+        return cls.from_frame(frame)
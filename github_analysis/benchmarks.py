@@ -0,0 +1,208 @@
+"""Scaling benchmark of the pipeline stages on synthetic scrapes.
+
+For every requested size a synthetic CSV is written to a temporary directory
+and each stage is timed and memory-profiled on it: load (read and clean the
+CSV), clean (the In[4] conversion alone), aggregate (per-topic moments and
+leaderboards), tag parse, correlation and render (all report figures,
+headless, with an empty word cloud cache). Results go to a JSON file so runs
+of different versions can be compared.
+
+CPU time includes that of finished child processes, but the memory peak is
+traced in this process only, so figures are rendered here unless
+``--workers`` asks for a pool.
+
+``--startup`` also times imports in fresh interpreters: the computation-only
+entry points should not load matplotlib, seaborn, wordcloud or PIL.
+
+Usage::
+
+    python -m github_analysis.benchmarks --rows 10000,100000,1000000 --out bench.json
+    python -m github_analysis.benchmarks --rows "" --startup
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.aggregates import RunningAggregates
+from github_analysis.cleaning import clean_counts
+from github_analysis.correlation import contribution_correlations
+from github_analysis.leaderboards import Leaderboard
+from github_analysis.loading import DEFAULT_CHUNKSIZE, load_github_df, raw_columns
+from github_analysis.schema import select_columns
+from github_analysis.synthetic import write_csv
+from github_analysis.tags import parse_topic_tags
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+STAGES = ["load", "clean", "aggregate", "tag_parse", "correlation", "render"]
+
+# Name -> statement timed by the startup benchmark
+IMPORTS = {
+    "numpy_pandas": "import numpy, pandas",
+    "package": "import github_analysis",
+    "compute": "from github_analysis.mapreduce import run_analysis",
+    "cli": "import github_analysis.__main__",
+    "report": "import github_analysis.report",
+    "plotting": "import github_analysis.plots; github_analysis.plots._pyplot()",
+}
+HEAVY_MODULES = ("matplotlib", "seaborn", "wordcloud", "PIL")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, sorted(m for m in {heavy!r} if m in sys.modules)]))
+"""
+
+
+def _cpu_time() -> float:
+    """CPU time of this process plus that of its terminated, waited-for children (where reported)."""
+    if resource is None:
+        return time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def measure(function, *args, **kwargs) -> tuple:
+    """Run ``function`` and return its result with wall time, CPU time and peak traced memory.
+
+    The memory peak only covers allocations of this process.
+    """
+    tracemalloc.start()
+    wall, cpu = time.perf_counter(), _cpu_time()
+    try:
+        result = function(*args, **kwargs)
+        wall, cpu = time.perf_counter() - wall, _cpu_time() - cpu
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"wall_s": wall, "cpu_s": cpu, "peak_bytes": peak}
+
+
+def _aggregate(github_df: pd.DataFrame) -> tuple:
+    return RunningAggregates().update(github_df).mean(), Leaderboard(k=100).update(github_df)
+
+
+def _render(github_df: pd.DataFrame, out_dir: str, cache_dir: str, workers: int):
+    # Imported here so the Agg backend is only forced when rendering is benchmarked
+    from github_analysis.mapreduce import run_analysis
+    from github_analysis.report import render_report
+
+    inputs = dict(run_analysis(github_df, workers=1), github_df=github_df)
+    return render_report(inputs, out_dir=out_dir, workers=workers, force=True, cache_dir=cache_dir)
+
+
+def run_benchmark(rows: int, stages: list, workdir: str, seed: int = 0, workers: int = 1) -> list:
+    """Time and profile ``stages`` on a synthetic scrape of ``rows`` repos."""
+    path = os.path.join(workdir, f"synthetic_{rows}.csv")
+    write_csv(path, rows, seed=seed)
+    records = []
+
+    def record(stage, function, *args, **kwargs):
+        result, stats = measure(function, *args, **kwargs)
+        records.append({"rows": rows, "stage": stage, **stats})
+        return result
+
+    github_df, _ = record("load", load_github_df, path, chunksize=DEFAULT_CHUNKSIZE)
+    if "clean" in stages:
+        raw = select_columns(pd.read_csv(path, usecols=raw_columns(), dtype=str))
+        record("clean", clean_counts, raw)
+        del raw
+    if "aggregate" in stages:
+        record("aggregate", _aggregate, github_df)
+    if "tag_parse" in stages:
+        record("tag_parse", parse_topic_tags, github_df["Topic_Tags"])
+    if "correlation" in stages:
+        record("correlation", contribution_correlations, [github_df])
+    if "render" in stages:
+        # A fresh cache directory, so the word cloud is laid out rather than read back
+        out_dir, cache_dir = os.path.join(workdir, f"report_{rows}"), os.path.join(workdir, f"cache_{rows}")
+        record("render", _render, github_df, out_dir, cache_dir, workers)
+    os.remove(path)
+    return [r for r in records if r["stage"] in stages]
+
+
+def import_time(statement: str, repeat: int = 5) -> dict:
+    """Best and median time of ``statement`` in fresh interpreters, and the heavy modules it loads."""
+    # Time this copy of the package, not whichever one the fresh interpreter would find first
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    code = _IMPORT_PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        elapsed, loaded = json.loads(output.stdout.splitlines()[-1])
+        times.append(elapsed)
+    return {"statement": statement, "best_s": min(times), "median_s": statistics.median(times), "heavy_modules": loaded}
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data.")
+    parser.add_argument("--rows", default=",".join(map(str, DEFAULT_ROWS)), help="comma-separated dataset sizes")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated stages (default: all)")
+    parser.add_argument("--out", default="bench.json", help="JSON output file (default: %(default)s)")
+    parser.add_argument("--label", default="", help="free-form label stored with the results, e.g. a version")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="render worker processes (default: 1, in this process)"
+    )
+    parser.add_argument("--startup", action="store_true", help="also time imports in fresh interpreters")
+    args = parser.parse_args(argv)
+
+    stages = args.stages.split(",")
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {sorted(unknown)}")
+
+    startup = {}
+    if args.startup:
+        for name, statement in IMPORTS.items():
+            startup[name] = import_time(statement)
+            heavy = ", ".join(startup[name]["heavy_modules"]) or "-"
+            print(f"{name:<14} {startup[name]['median_s'] * 1e3:8.1f} ms median import  heavy modules: {heavy}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in [int(rows) for rows in args.rows.split(",") if rows]:
+            for entry in run_benchmark(rows, stages, workdir, seed=args.seed, workers=args.workers):
+                results.append(entry)
+                print(
+                    f"{entry['rows']:>10} {entry['stage']:<12} {entry['wall_s']:8.3f}s wall "
+                    f"{entry['cpu_s']:8.3f}s cpu {entry['peak_bytes'] / 2**20:10.1f} MiB peak"
+                )
+
+    with open(args.out, "w") as f:
+        output = {"label": args.label, "environment": environment(), "results": results, "startup": startup}
+        json.dump(output, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
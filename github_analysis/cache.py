@@ -0,0 +1,265 @@
+"""Content-addressed on-disk cache of the cleaned ``github_df``.
+
+Each cache entry is a directory named after a hash of the source CSV, the
+cleaning version and the requested columns (the 11 default columns share the
+key of ``columns=None``). Numeric columns are stored as
+``.npy`` files that are memory-mapped on load and back the returned frame
+directly, read-only and without a copy. Text columns are stored as their
+UTF-8 bytes, end offsets and a missing-value mask, so nothing in the cache is
+pickled and reading an entry never runs code. Any change to the CSV, to the
+cleaning logic or to this layout yields a new key, so a stale entry is never
+read; entries of the same CSV left stale by such a change are removed on the
+next build, while entries of other column sets stay valid.
+
+Hashing the CSV is skipped while its path, size, modification time, inode
+and status-change time are all unchanged (``file_digest``). Copying another
+file over it with ``cp -p`` or ``rsync -t`` changes the last two;
+``--rebuild-cache`` rebuilds an entry whatever the digest says.
+
+Usage::
+
+    python -m github_analysis.cache Github_data.csv [--no-cache | --rebuild-cache]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from github_analysis import instrumentation
+from github_analysis.cleaning import CLEANING_VERSION, CleaningReport
+from github_analysis.instrumentation import stage
+from github_analysis.loading import DEFAULT_CHUNKSIZE, DEFAULT_CSV, load_github_df
+from github_analysis.schema import RAW_TO_CLEAN
+
+DEFAULT_CACHE_DIR = ".github_analysis_cache"
+# Version of the on-disk layout of an entry, part of its key
+CACHE_FORMAT = 2
+
+_HASH_BLOCK = 1 << 20
+
+# Digests by file signature (see file_digest), so a cache hit does not rehash an unchanged file
+_DIGESTS = {}
+_DIGESTS_FILE = "digests.json"
+
+
+def _read_digests(cache_dir: str) -> dict:
+    try:
+        with open(os.path.join(cache_dir, _DIGESTS_FILE)) as f:
+            return {tuple(signature): digest for signature, digest in json.load(f)}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_digests(cache_dir: str, digests: dict) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump([[list(signature), digest] for signature, digest in digests.items()], f)
+    os.replace(tmp_file, os.path.join(cache_dir, _DIGESTS_FILE))
+
+
+def file_digest(path: str, cache_dir: str | None = None) -> str:
+    """SHA-256 of the file contents, read in 1 MiB blocks.
+
+    Digests are remembered while the file's size, modification time, inode
+    and status-change time stay the same, in this process and, given a
+    ``cache_dir``, across runs. Tools that preserve the modification time of
+    a copy (``cp -p``, ``rsync -t``) still give it a new inode or ctime.
+    """
+    info = os.stat(path)
+    signature = (os.path.abspath(path), info.st_size, info.st_mtime_ns, info.st_ino, info.st_ctime_ns)
+    if signature not in _DIGESTS and cache_dir is not None:
+        _DIGESTS.update(_read_digests(cache_dir))
+    if signature not in _DIGESTS:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                digest.update(block)
+        _DIGESTS[signature] = digest.hexdigest()
+        if cache_dir is not None:
+            # Only the current signature of each file is worth keeping
+            stored = {key: value for key, value in _read_digests(cache_dir).items() if key[0] != signature[0]}
+            _write_digests(cache_dir, {**stored, signature: _DIGESTS[signature]})
+    return _DIGESTS[signature]
+
+
+def cache_key(path: str, columns: list | None = None, cache_dir: str | None = None) -> str:
+    """Key of the cache entry for ``path`` cleaned into ``columns`` (see ``file_digest`` for ``cache_dir``)."""
+    # The default columns load the same frame as None, so they share its entry
+    if columns is not None and sorted(columns) == sorted(RAW_TO_CLEAN.values()):
+        columns = None
+    digest = hashlib.sha256()
+    digest.update(file_digest(path, cache_dir).encode())
+    digest.update(f"cleaning-v{CLEANING_VERSION}".encode())
+    digest.update(f"format-v{CACHE_FORMAT}".encode())
+    digest.update(json.dumps(sorted(columns) if columns else None).encode())
+    return digest.hexdigest()[:32]
+
+
+def _save_text(prefix: str, values: np.ndarray) -> None:
+    """Store strings and missing values as ``<prefix>-bytes/-offsets/-missing.npy``."""
+    missing = pd.isna(values)
+    texts = values[~missing].tolist()
+    if any(not isinstance(text, str) for text in texts):
+        raise TypeError(f"Text column {prefix!r} holds values that are neither strings nor missing")
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    lengths = np.zeros(len(values), dtype=np.int64)
+    lengths[~missing] = [len(text) for text in encoded]
+    np.cumsum(lengths, out=offsets[1:])
+    np.save(f"{prefix}-bytes.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(f"{prefix}-offsets.npy", offsets)
+    np.save(f"{prefix}-missing.npy", missing)
+
+
+def _load_text(prefix: str) -> np.ndarray:
+    """Object array of the strings written by ``_save_text``, with NaN for missing values."""
+    data = np.load(f"{prefix}-bytes.npy").tobytes()
+    offsets = np.load(f"{prefix}-offsets.npy").tolist()
+    missing = np.load(f"{prefix}-missing.npy")
+    values = np.empty(len(missing), dtype=object)
+    values[:] = [data[start:stop].decode("utf-8") for start, stop in zip(offsets[:-1], offsets[1:])]
+    values[missing] = np.nan
+    return values
+
+
+def write_cache(entry_dir: str, github_df: pd.DataFrame, report: CleaningReport, source: str) -> None:
+    """Store ``github_df`` column by column under ``entry_dir``, atomically."""
+    parent = os.path.dirname(entry_dir) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        meta = {
+            "source": os.path.abspath(source),
+            "digest": file_digest(source),
+            "cleaning_version": CLEANING_VERSION,
+            "format": CACHE_FORMAT,
+            "rows": report.rows,
+            "coerced": report.coerced,
+            "columns": [],
+        }
+        np.save(os.path.join(tmp_dir, "index.npy"), github_df.index.to_numpy(dtype=np.int64))
+        for i, col in enumerate(github_df.columns):
+            values = github_df[col].to_numpy()
+            if values.dtype == object:
+                _save_text(os.path.join(tmp_dir, str(i)), values)
+            else:
+                np.save(os.path.join(tmp_dir, f"{i}.npy"), values, allow_pickle=False)
+            meta["columns"].append({"name": col, "dtype": str(values.dtype)})
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def read_cache(entry_dir: str) -> tuple[pd.DataFrame, CleaningReport]:
+    """Open a cache entry written by ``write_cache``; numeric columns stay memory-mapped."""
+    with open(os.path.join(entry_dir, "meta.json")) as f:
+        meta = json.load(f)
+    data = {}
+    for i, col in enumerate(meta["columns"]):
+        prefix = os.path.join(entry_dir, str(i))
+        if col["dtype"] == "object":
+            data[col["name"]] = _load_text(prefix)
+        else:
+            data[col["name"]] = np.load(f"{prefix}.npy", mmap_mode="r")
+    index = pd.Index(np.load(os.path.join(entry_dir, "index.npy")))
+    # copy=False keeps one block per column, viewing the mapped file instead of consolidating a copy
+    github_df = pd.DataFrame(data, index=index, columns=[col["name"] for col in meta["columns"]], copy=False)
+    return github_df, CleaningReport(rows=meta["rows"], coerced=meta["coerced"])
+
+
+def prune_stale(cache_dir: str, source: str) -> None:
+    """Remove the entries built from an older version of ``source``, or by an older cleaning version or layout."""
+    current = {
+        "source": os.path.abspath(source),
+        "digest": file_digest(source, cache_dir),
+        "cleaning_version": CLEANING_VERSION,
+        "format": CACHE_FORMAT,
+    }
+    for name in os.listdir(cache_dir):
+        meta_file = os.path.join(cache_dir, name, "meta.json")
+        if not os.path.isfile(meta_file):
+            continue
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if meta.get("source") != current["source"]:
+            continue
+        if any(meta.get(field) != value for field, value in current.items()):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+
+
+def load_cached_github_df(
+    path: str = DEFAULT_CSV,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    columns: list | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    use_cache: bool = True,
+    rebuild: bool = False,
+) -> tuple[pd.DataFrame, CleaningReport, str]:
+    """Cleaned ``github_df`` for ``path``, from the cache when possible.
+
+    Returns ``(github_df, report, status)`` where ``status`` is ``"hit"``,
+    ``"miss"``, ``"rebuilt"`` or ``"disabled"`` (``use_cache=False``).
+    """
+    if not use_cache:
+        github_df, report = load_github_df(path, chunksize=chunksize, columns=columns)
+        return github_df, report, "disabled"
+
+    key = cache_key(path, columns, cache_dir)
+    entry_dir = os.path.join(cache_dir, key)
+    exists = os.path.isfile(os.path.join(entry_dir, "meta.json"))
+    if exists and not rebuild:
+        with stage("cache_read") as read:
+            github_df, report = read_cache(entry_dir)
+            read.rows_out = len(github_df)
+        return github_df, report, "hit"
+
+    github_df, report = load_github_df(path, chunksize=chunksize, columns=columns)
+    if exists:
+        shutil.rmtree(entry_dir, ignore_errors=True)
+    with stage("cache_write", rows_in=len(github_df)):
+        write_cache(entry_dir, github_df, report, path)
+    prune_stale(cache_dir, path)
+    return github_df, report, "rebuilt" if exists else "miss"
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or open the cleaned github_df cache.")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="scraped CSV (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache directory (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows per CSV chunk")
+    switch = parser.add_mutually_exclusive_group()
+    switch.add_argument("--no-cache", action="store_true", help="read the CSV without using the cache")
+    switch.add_argument("--rebuild-cache", action="store_true", help="rebuild the cache entry even if present")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    instrumentation.enable_from_args(args)
+    start = time.perf_counter()
+    try:
+        github_df, report, status = load_cached_github_df(
+            args.csv,
+            cache_dir=args.cache_dir,
+            chunksize=args.chunksize,
+            use_cache=not args.no_cache,
+            rebuild=args.rebuild_cache,
+        )
+    finally:
+        instrumentation.disable()
+    elapsed = time.perf_counter() - start
+    print(f"cache {status}: {len(github_df)} rows in {elapsed:.3f}s")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Vectorized cleaning of the GitHub-style count columns (In[4]).
+
+The scraped counts come as text such as ``"47.9k"``, ``"1.2m"`` or ``"2,940"``.
+In[4] converts them with one Python ``lambda`` call per value followed by a
+row-wise ``pd.to_numeric(..., axis=1)``. Here every column is converted in a
+handful of whole-column string/NumPy operations instead. The optional
+``License`` column loses the placeholders the scraper picked up for repos
+without a license.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever the cleaning output changes, so cached frames get rebuilt
+CLEANING_VERSION = 2
+
+# Multiplier for each magnitude suffix GitHub uses when abbreviating counts
+SUFFIX_MULTIPLIERS = {"k": 1e3, "m": 1e6, "b": 1e9}
+
+# How each count column is parsed, mirroring In[4]:
+# Star, Fork and Watch carry "k" suffixes, Issues and Commits carry ","
+# separators, and Pull_Requests and Contributors are converted as they are.
+COLUMN_FORMATS = {
+    "Star": {"suffixes": True, "thousands": None},
+    "Fork": {"suffixes": True, "thousands": None},
+    "Watch": {"suffixes": True, "thousands": None},
+    "Issues": {"suffixes": False, "thousands": ","},
+    "Pull_Requests": {"suffixes": False, "thousands": None},
+    "Commits": {"suffixes": False, "thousands": ","},
+    "Contributors": {"suffixes": False, "thousands": None},
+}
+
+# What the scraper found in the license slot of repos without a license:
+# GitHub's loading text or the contributor count shown in its place
+LICENSE_PLACEHOLDER = r"Fetching contributors|[\d,]+\s+contributors?"
+
+
+@dataclass
+class CleaningReport:
+    """Number of rows seen and of non-null values coerced to NaN, per column."""
+
+    rows: int = 0
+    coerced: dict = field(default_factory=dict)
+
+    @property
+    def total_coerced(self) -> int:
+        return sum(self.coerced.values())
+
+    def __add__(self, other: "CleaningReport") -> "CleaningReport":
+        coerced = dict(self.coerced)
+        for col, count in other.coerced.items():
+            coerced[col] = coerced.get(col, 0) + count
+        return CleaningReport(rows=self.rows + other.rows, coerced=coerced)
+
+    def __str__(self) -> str:
+        details = ", ".join(f"{col}={count}" for col, count in self.coerced.items() if count)
+        return f"{self.rows} rows cleaned, {self.total_coerced} values coerced to NaN" + (
+            f" ({details})" if details else ""
+        )
+
+
+def parse_counts(series: pd.Series, suffixes: bool = True, thousands: str | None = ",") -> pd.Series:
+    """Convert a column of GitHub-style counts to float64.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Raw values, e.g. ``"47.9k"``, ``"1.2m"``, ``"2,940"`` or ``"87"``.
+    suffixes : bool
+        Expand a trailing ``k``/``m``/``b`` into thousands/millions/billions.
+    thousands : str or None
+        Separator removed before conversion; ``None`` leaves values untouched.
+
+    Values that still are not numbers become NaN.
+    """
+    if not pd.api.types.is_object_dtype(series) and not pd.api.types.is_string_dtype(series):
+        return pd.to_numeric(series, errors="coerce").astype("float64")
+
+    missing = series.isna()
+    text = series.astype(str).str.strip().mask(missing)
+    if thousands:
+        text = text.str.replace(thousands, "", regex=False)
+
+    multiplier = None
+    if suffixes:
+        # Like In[4]'s rstrip("k"), a repeated suffix is stripped as a whole
+        suffix = text.str[-1:].str.lower()
+        multiplier = suffix.map(SUFFIX_MULTIPLIERS)
+        has_suffix = multiplier.notna()
+        if has_suffix.any():
+            text = text.where(~has_suffix, text.str.rstrip("kKmMbB"))
+
+    values = pd.to_numeric(text, errors="coerce").astype("float64")
+    if multiplier is not None:
+        values = values * multiplier.fillna(1.0).to_numpy(dtype=np.float64)
+    return values
+
+
+def clean_license(series: pd.Series) -> pd.Series:
+    """``License`` values with the scraping placeholders replaced by NaN."""
+    return series.mask(series.astype(str).str.strip().str.fullmatch(LICENSE_PLACEHOLDER) & series.notna())
+
+
+def clean_counts(github_df: pd.DataFrame, columns: list | None = None) -> tuple[pd.DataFrame, CleaningReport]:
+    """Convert the count columns of ``github_df`` to numbers, column by column.
+
+    Returns a cleaned copy of the frame and a ``CleaningReport`` with the
+    number of non-null values per column that could not be parsed. A
+    ``License`` column is cleaned with ``clean_license`` alongside.
+    """
+    if columns is None:
+        columns = [col for col in COLUMN_FORMATS if col in github_df.columns]
+
+    cleaned = github_df.copy()
+    report = CleaningReport(rows=len(github_df))
+    for col in columns:
+        raw = github_df[col]
+        cleaned[col] = parse_counts(raw, **COLUMN_FORMATS[col])
+        report.coerced[col] = int((cleaned[col].isna() & raw.notna()).sum())
+    if "License" in github_df.columns:
+        cleaned["License"] = clean_license(github_df["License"])
+        report.coerced["License"] = int((cleaned["License"].isna() & github_df["License"].notna()).sum())
+    return cleaned, report
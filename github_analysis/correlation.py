@@ -0,0 +1,235 @@
+"""One-pass, mergeable correlation of the contribution columns (In[18]-In[20]).
+
+The three heatmaps each slice ``github_df``, drop missing values and call
+``.corr()``, copying and rescanning the data every time. Here the moments
+behind Pearson's r are accumulated chunk by chunk instead:
+
+``CorrelationAccumulator``
+    For every pair of columns, the count, means, sums of squared deviations
+    and co-moment over the rows where both values are present. Chunks and
+    partial accumulators are combined with the pairwise update of Chan et
+    al., so missing values are handled pairwise, like ``DataFrame.corr``.
+``GroupedCorrelation``
+    The same statistics per group (e.g. per user), so the matrix of any set
+    of groups can be assembled after the pass. Partials are kept as they
+    come and combined in one grouped Chan et al. update when read.
+
+``contribution_correlations`` computes the all-repos, top-100-by-star and
+large-repo-users matrices in a single pass over chunked data.
+"""
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.leaderboards import Leaderboard
+
+CONTRIBUTION_COLUMNS = ["Issues", "Pull_Requests", "Commits", "Contributors"]
+
+# In[18] drops rows missing any of these before correlating
+CORR_DROPNA_SUBSET = ["Issues", "Pull_Requests", "Contributors"]
+
+# Partials a GroupedCorrelation buffers before combining them, bounding memory on long streams
+MAX_PARTS = 64
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _power_sums(values: np.ndarray, shift: np.ndarray) -> dict:
+    """Pairwise sums of ``values - shift`` over rows where both columns are present."""
+    present = ~np.isnan(values)
+    weights = present.astype(np.float64)
+    deviations = np.where(present, values - shift, 0.0)
+    sx = deviations.T @ weights
+    sxx = (deviations * deviations).T @ weights
+    return {"n": weights.T @ weights, "sx": sx, "sxx": sxx, "sxy": deviations.T @ deviations}
+
+
+class CorrelationAccumulator:
+    """Pairwise-complete count, means and co-moments of ``columns``."""
+
+    def __init__(self, columns: list | None = None):
+        self.columns = list(CONTRIBUTION_COLUMNS if columns is None else columns)
+        shape = (len(self.columns), len(self.columns))
+        self.n = np.zeros(shape)
+        self.mean_x = np.zeros(shape)  # mean of column i over rows where i and j are present
+        self.mean_y = np.zeros(shape)  # mean of column j over the same rows
+        self.m2_x = np.zeros(shape)
+        self.m2_y = np.zeros(shape)
+        self.c_xy = np.zeros(shape)
+
+    @classmethod
+    def from_power_sums(cls, columns: list, sums: dict, shift: np.ndarray) -> "CorrelationAccumulator":
+        """Accumulator from the pairwise sums of values shifted by ``shift``."""
+        result = cls(columns)
+        n, sx = sums["n"], sums["sx"]
+        sy = sx.T
+        result.n = n
+        result.mean_x = shift[:, None] + _divide(sx, n)
+        result.mean_y = shift[None, :] + _divide(sy, n)
+        result.m2_x = sums["sxx"] - _divide(sx * sx, n)
+        result.m2_y = sums["sxx"].T - _divide(sy * sy, n)
+        result.c_xy = sums["sxy"] - _divide(sx * sy, n)
+        return result
+
+    def update(self, chunk: pd.DataFrame) -> "CorrelationAccumulator":
+        """Fold a chunk of rows into the accumulator."""
+        values = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        if not len(values):
+            return self
+        # Shifting by the chunk means keeps the sums of squares well conditioned
+        shift = _divide(np.nansum(values, axis=0), (~np.isnan(values)).sum(axis=0).astype(np.float64))
+        return self.merge(self.from_power_sums(self.columns, _power_sums(values, shift), shift))
+
+    def merge(self, other: "CorrelationAccumulator") -> "CorrelationAccumulator":
+        """Combine with an accumulator over other rows (pairwise Chan et al. update)."""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators over different columns")
+        n = self.n + other.n
+        weight = _divide(self.n * other.n, n)
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        self.mean_x = self.mean_x + _divide(delta_x * other.n, n)
+        self.mean_y = self.mean_y + _divide(delta_y * other.n, n)
+        self.m2_x = self.m2_x + other.m2_x + delta_x * delta_x * weight
+        self.m2_y = self.m2_y + other.m2_y + delta_y * delta_y * weight
+        self.c_xy = self.c_xy + other.c_xy + delta_x * delta_y * weight
+        self.n = n
+        return self
+
+    def cov(self) -> pd.DataFrame:
+        """Pairwise sample covariance, like ``DataFrame.cov()``."""
+        cov = np.where(self.n > 1, _divide(self.c_xy, self.n - 1), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def corr(self) -> pd.DataFrame:
+        """Pairwise Pearson correlation, like ``DataFrame.corr()``."""
+        divisor = np.sqrt(self.m2_x * self.m2_y)
+        corr = np.where((self.n >= 1) & (divisor > 0), _divide(self.c_xy, divisor), np.nan)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+
+def _group_sums(codes: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+    """Sums of the rows of ``values`` per code in ``range(n_groups)``; every code must occur."""
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(n_groups))
+    return np.add.reduceat(values[order], starts, axis=0)
+
+
+def _combine_groups(codes: np.ndarray, n_groups: int, part: tuple) -> tuple:
+    """Combine ``(rows, n, mean, m2, c)`` entries sharing a code, with the k-way Chan et al. update.
+
+    ``n``, ``mean``, ``m2`` and ``c`` are ``(entries, p, p)`` arrays in the
+    layout of ``CorrelationAccumulator``'s ``n``, ``mean_x``, ``m2_x`` and
+    ``c_xy``; deviations are taken from the combined means, never from zero.
+    """
+    rows, n, mean, m2, c = part
+    total = _group_sums(codes, n_groups, n)
+    combined_mean = _divide(_group_sums(codes, n_groups, n * mean), total)
+    delta = mean - combined_mean[codes]
+    m2 = _group_sums(codes, n_groups, m2 + n * delta * delta)
+    c = _group_sums(codes, n_groups, c + n * delta * delta.swapaxes(1, 2))
+    return _group_sums(codes, n_groups, rows), total, combined_mean, m2, c
+
+
+class GroupedCorrelation:
+    """Per-group row counts and pairwise counts, means and co-moments of ``columns``, keyed by ``by``."""
+
+    def __init__(self, by: str = "User_Name", columns: list | None = None):
+        self.by = by
+        self.columns = list(CONTRIBUTION_COLUMNS if columns is None else columns)
+        # (groups, (rows, n, mean, m2, c)) partials, combined lazily so merging many is linear
+        self.parts = []
+
+    def update(self, chunk: pd.DataFrame) -> "GroupedCorrelation":
+        """Fold a chunk of rows into the per-group statistics."""
+        codes, groups = pd.factorize(chunk[self.by], sort=False)
+        values = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)[codes >= 0]
+        codes = codes[codes >= 0]
+        if not len(codes):
+            return self
+        present = ~np.isnan(values)
+        weights = present.astype(np.float64)
+        filled = np.where(present, values, 0.0)
+        # Shifting by the per-group means keeps the sums of squares well conditioned
+        shift = _divide(_group_sums(codes, len(groups), filled), _group_sums(codes, len(groups), weights))
+        deviations = np.where(present, values - shift[codes], 0.0)
+        # Row-wise outer products, summed per group into (groups, p, p) arrays
+        n = _group_sums(codes, len(groups), weights[:, :, None] * weights[:, None, :])
+        sx = _group_sums(codes, len(groups), deviations[:, :, None] * weights[:, None, :])
+        sxx = _group_sums(codes, len(groups), (deviations * deviations)[:, :, None] * weights[:, None, :])
+        sxy = _group_sums(codes, len(groups), deviations[:, :, None] * deviations[:, None, :])
+        sy = sx.swapaxes(1, 2)
+        rows = np.bincount(codes, minlength=len(groups)).astype(np.float64)
+        mean = shift[:, :, None] + _divide(sx, n)
+        part = (rows, n, mean, sxx - _divide(sx * sx, n), sxy - _divide(sx * sy, n))
+        self.parts.append((pd.Index(groups), part))
+        return self
+
+    def merge(self, other: "GroupedCorrelation") -> "GroupedCorrelation":
+        """Fold in per-group statistics built over other rows."""
+        if (other.by, other.columns) != (self.by, self.columns):
+            raise ValueError("Cannot merge grouped statistics over different keys or columns")
+        self.parts.extend(other.parts)
+        if len(self.parts) > MAX_PARTS:
+            self._consolidate()
+        return self
+
+    def _consolidate(self) -> tuple | None:
+        """The combined ``(groups, part)``, in first-seen group order."""
+        if len(self.parts) > 1:
+            first, *rest = [groups for groups, _ in self.parts]
+            codes, groups = pd.factorize(first.append(rest), sort=False)
+            stacked = tuple(np.concatenate(arrays) for arrays in zip(*(part for _, part in self.parts)))
+            self.parts = [(pd.Index(groups), _combine_groups(codes, len(groups), stacked))]
+        return self.parts[0] if self.parts else None
+
+    def sizes(self) -> pd.Series:
+        """Number of rows per group, sorted by group (``groupby(by).size()``)."""
+        state = self._consolidate()
+        if state is None:
+            return pd.Series(dtype=np.int64)
+        groups, (rows, *_) = state
+        return pd.Series(rows.astype(np.int64), index=groups).sort_index().rename_axis(self.by)
+
+    def largest(self, n: int = 10) -> list:
+        """The ``n`` groups with the most rows, like In[16]'s ``large_repo_users``."""
+        sizes = self.sizes()
+        return sizes.index[np.argsort(-sizes.to_numpy(), kind="stable")[:n]].to_list()
+
+    def accumulator(self, groups: list) -> CorrelationAccumulator:
+        """Correlation accumulator over all rows of ``groups``."""
+        result = CorrelationAccumulator(self.columns)
+        state = self._consolidate()
+        selected = np.zeros(0, dtype=bool) if state is None else state[0].isin(groups)
+        if not selected.any():
+            return result
+        part = tuple(array[selected] for array in state[1])
+        _, n, mean, m2, c = _combine_groups(np.zeros(int(selected.sum()), dtype=np.int64), 1, part)
+        result.n, result.mean_x, result.m2_x, result.c_xy = n[0], mean[0], m2[0], c[0]
+        result.mean_y, result.m2_y = result.mean_x.T, result.m2_x.T
+        return result
+
+
+def contribution_correlations(chunks, top_n: int = 100, n_users: int = 10, columns: list | None = None) -> dict:
+    """The three contribution heatmap matrices of In[18]-In[20] in one pass.
+
+    Returns a dict with the ``"all"`` (In[18]), ``"popular"`` (top ``top_n``
+    repos by Star, In[19]) and ``"large_repo_users"`` (repos of the ``n_users``
+    users with most repos, In[20]) correlation frames.
+    """
+    columns = list(CONTRIBUTION_COLUMNS if columns is None else columns)
+    overall = CorrelationAccumulator(columns)
+    popular = Leaderboard(metrics=("Star",), k=top_n)
+    per_user = GroupedCorrelation("User_Name", columns)
+    for chunk in chunks:
+        overall.update(chunk.dropna(subset=[col for col in CORR_DROPNA_SUBSET if col in columns]))
+        popular.update(chunk[["Star", *columns]])
+        per_user.update(chunk)
+    top = popular.top("Star")
+    return {
+        "all": overall.corr(),
+        "popular": CorrelationAccumulator(columns).update(top).corr(),
+        "large_repo_users": per_user.accumulator(per_user.largest(n_users)).corr(),
+    }
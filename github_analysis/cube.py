@@ -0,0 +1,229 @@
+"""Precomputed aggregate cube over Topic, User_Name and License.
+
+Every analysis cell runs its own groupby over the whole frame: by ``Topic``
+in In[6] and In[24], by ``User_Name`` in In[16]. ``AggregateCube`` keeps the
+count, sum, min and max of each count column per (Topic, User_Name, License)
+cell, built chunk by chunk and mergeable like
+``aggregates.RunningAggregates``. Any roll-up (the cells grouped by a subset
+of the dimensions) follows from the cells alone; ``materialize`` precomputes
+all of them with a hash lookup per group, so ``query`` answers a dashboard
+request such as "stars of MIT-licensed java repos" without touching the
+repos. ``slice`` restricts the cube to some dimension values.
+
+Missing dimension values are grouped under ``MISSING``.
+
+Usage::
+
+    python -m github_analysis.cube Github_data.csv --by Topic,License --where License=MIT
+"""
+
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.loading import DEFAULT_CSV, iter_clean_chunks
+from github_analysis.schema import COUNT_COLUMNS
+
+DIMENSIONS = ("Topic", "User_Name", "License")
+STATISTICS = ("count", "sum", "min", "max")
+MISSING = "(missing)"
+# Label of the grand-total row
+ALL = "All"
+# Chunk cells buffered before they are combined into the cube
+MAX_PENDING = 32
+
+# How the statistics of several cells combine into one
+_COMBINE = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+
+
+class Cuboid:
+    """One roll-up of the cube: a frame of statistics plus a hash lookup from group key to row."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.values = frame.to_numpy(dtype=np.float64)
+        keys = frame.index if isinstance(frame.index, pd.MultiIndex) else [(key,) for key in frame.index]
+        self.lookup = {key: row for row, key in enumerate(keys)}
+
+
+class AggregateCube:
+    """Count, sum, min and max of ``metrics`` per combination of ``dimensions``."""
+
+    def __init__(self, dimensions: tuple = DIMENSIONS, metrics: list | None = None):
+        self.dimensions = tuple(dimensions)
+        self.metrics = list(COUNT_COLUMNS if metrics is None else metrics)
+        columns = pd.MultiIndex.from_product([STATISTICS, self.metrics], names=["statistic", "metric"])
+        index = pd.MultiIndex.from_arrays([[]] * len(self.dimensions), names=self.dimensions)
+        self._cells = pd.DataFrame(columns=columns, index=index, dtype=np.float64)
+        self._pending = []
+        self.cuboids = {}
+
+    @property
+    def cells(self) -> pd.DataFrame:
+        """Statistics per (``dimensions``) cell, with ``(statistic, metric)`` columns."""
+        self._flush()
+        return self._cells
+
+    @cells.setter
+    def cells(self, cells: pd.DataFrame) -> None:
+        self._cells = cells
+        self._pending = []
+        self.cuboids = {}
+
+    def _combine(self, frame: pd.DataFrame, by: list) -> pd.DataFrame:
+        keys = {"level": by} if by else {"by": np.zeros(len(frame), dtype=int)}
+        combined = pd.concat(
+            {stat: getattr(frame[stat].groupby(sort=True, **keys), _COMBINE[stat])() for stat in STATISTICS}, axis=1
+        )
+        combined.columns = combined.columns.set_names(["statistic", "metric"])
+        if not by:
+            combined.index = pd.Index([ALL])
+        return combined
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._cells = self._combine(pd.concat([self._cells, *self._pending]), list(self.dimensions))
+            self._pending = []
+
+    def _fold(self, cells: pd.DataFrame) -> None:
+        # Combining once per batch of chunks, not per chunk, keeps a long stream linear
+        self._pending.append(cells)
+        if len(self._pending) >= MAX_PENDING:
+            self._flush()
+        self.cuboids = {}
+
+    def update(self, chunk: pd.DataFrame) -> "AggregateCube":
+        """Fold a batch of cleaned rows with the dimension columns into the cube."""
+        values = pd.DataFrame(chunk[self.metrics].to_numpy(dtype=np.float64, na_value=np.nan), columns=self.metrics)
+        keys = [pd.Series(chunk[dim].astype(object).fillna(MISSING).to_numpy(), name=dim) for dim in self.dimensions]
+        grouped = values.groupby(keys, sort=False)
+        cells = pd.concat({stat: getattr(grouped, stat)() for stat in STATISTICS}, axis=1)
+        cells.columns = cells.columns.set_names(["statistic", "metric"])
+        self._fold(cells)
+        return self
+
+    def merge(self, other: "AggregateCube") -> "AggregateCube":
+        """Fold another cube, e.g. from a separate run or shard, into this one."""
+        if other.dimensions != self.dimensions or other.metrics != self.metrics:
+            raise ValueError("Cannot merge cubes over different dimensions or metrics")
+        self._fold(other.cells)
+        return self
+
+    def __add__(self, other: "AggregateCube") -> "AggregateCube":
+        return self.copy().merge(other)
+
+    def copy(self) -> "AggregateCube":
+        result = AggregateCube(self.dimensions, self.metrics)
+        result.cells = self.cells.copy()
+        return result
+
+    def _by(self, by) -> tuple:
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = [dim for dim in by if dim not in self.dimensions]
+        if unknown:
+            raise KeyError(f"Unknown dimensions {unknown}; the cube has {list(self.dimensions)}")
+        return tuple(dim for dim in self.dimensions if dim in by)
+
+    def _cuboid(self, by: tuple) -> Cuboid:
+        if by not in self.cuboids:
+            self.cuboids[by] = Cuboid(self._combine(self.cells, list(by)))
+        return self.cuboids[by]
+
+    def materialize(self) -> "AggregateCube":
+        """Precompute every roll-up, from the finest to the grand total."""
+        for size in range(len(self.dimensions), -1, -1):
+            for by in itertools.combinations(self.dimensions, size):
+                self._cuboid(by)
+        return self
+
+    def rollup(self, by=()) -> pd.DataFrame:
+        """Statistics per group of the dimensions ``by``, aggregated over the others.
+
+        The columns are ``(statistic, metric)`` pairs; an empty ``by`` gives
+        the grand total in a single row labelled ``ALL``.
+        """
+        return self._cuboid(self._by(by)).frame
+
+    def mean(self, by=("Topic",)) -> pd.DataFrame:
+        """Means of the non-null values per group, like ``pop_mean_df`` in In[6] for ``Topic``."""
+        rolled = self.rollup(by)
+        counts = rolled["count"]
+        return (rolled["sum"] / counts.where(counts > 0)).rename_axis(columns=None).reset_index()
+
+    def query(self, **values) -> pd.Series:
+        """Statistics of the repos with the given dimension ``values``, e.g. ``query(Topic="java")``.
+
+        A lookup in the matching roll-up, the grand total without ``values``;
+        combinations without repos have zero counts and sums and missing
+        minima and maxima.
+        """
+        by = self._by(values)
+        cuboid = self._cuboid(by)
+        row = cuboid.lookup.get(tuple(values[dim] for dim in by) if by else (ALL,))
+        if row is None:
+            result = np.where(np.isin(cuboid.frame.columns.get_level_values(0), ["count", "sum"]), 0.0, np.nan)
+        else:
+            result = cuboid.values[row]
+        return pd.Series(result, index=cuboid.frame.columns)
+
+    def slice(self, **values) -> "AggregateCube":
+        """The cube restricted to cells whose dimensions take ``values`` (one value or a list each)."""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim in self._by(values):
+            wanted = values[dim]
+            wanted = [wanted] if isinstance(wanted, str) or not np.iterable(wanted) else list(wanted)
+            mask &= self.cells.index.get_level_values(dim).isin(wanted)
+        result = AggregateCube(self.dimensions, self.metrics)
+        result.cells = self.cells[mask]
+        return result
+
+    def to_frame(self) -> pd.DataFrame:
+        """The base cells with ``(statistic, metric)`` columns."""
+        return self.cells.copy()
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "AggregateCube":
+        """Rebuild a cube from the output of ``to_frame``."""
+        result = cls(dimensions=tuple(frame.index.names), metrics=frame["count"].columns.tolist())
+        result.cells = frame.astype(np.float64)
+        return result
+
+
+def build_cube(path: str = DEFAULT_CSV, dimensions: tuple = DIMENSIONS, metrics: list | None = None) -> AggregateCube:
+    """Stream the CSV at ``path`` into a cube, reading only the dimension and metric columns."""
+    cube = AggregateCube(dimensions, metrics)
+    for chunk, _ in iter_clean_chunks(path, columns=[*cube.dimensions, *cube.metrics]):
+        cube.update(chunk)
+    return cube
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Roll up and slice the Topic x User_Name x License cube.")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="scraped CSV (default: %(default)s)")
+    parser.add_argument("--by", default="Topic", help="comma-separated dimensions to group by (default: %(default)s)")
+    parser.add_argument(
+        "--where", action="append", default=[], help="DIMENSION=VALUE filter; repeat a dimension for several values"
+    )
+    parser.add_argument("--statistic", default="sum", choices=[*STATISTICS, "mean"], help="statistic to show")
+    args = parser.parse_args(argv)
+
+    values = {}
+    for condition in args.where:
+        dim, _, value = condition.partition("=")
+        if dim not in DIMENSIONS:
+            parser.error(f"unknown dimension {dim!r}; choose from {list(DIMENSIONS)}")
+        values.setdefault(dim, []).append(value)
+    cube = build_cube(args.csv).slice(**values)
+    by = [dim for dim in args.by.split(",") if dim]
+    if args.statistic == "mean":
+        table = cube.mean(by)
+    else:
+        table = cube.rollup(by)[args.statistic].rename_axis(columns=None).reset_index()
+    with pd.option_context("display.width", 120, "display.max_columns", 20, "display.max_rows", 60):
+        print(table)
+
+
+if __name__ == "__main__":
+    main()
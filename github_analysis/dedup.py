@@ -0,0 +1,147 @@
+"""Cross-topic deduplication of repos, keyed on a hash of the normalized url.
+
+The scrape lists a repo once per topic page it was found on, so popular repos
+appear several times (CS-Notes under both java and c++, a few even twice
+under the same topic). ``pop_mean_df``, the top-10 tables and the
+repos-per-user counts then count them more than once.
+
+``Deduplicator`` streams over cleaned chunks in file order. Every url is
+normalized (case, scheme, ``www.``, trailing ``/`` and ``.git``) and hashed
+to 64 bits; a dict from hash to repo id marks in O(1) per row
+
+* the canonical row of each repo: its first row, and
+* the first row of each (repo, topic) pair, the per-topic view without
+  repeats,
+
+and records which topics each repo was listed under. The chunks it yields
+hold the per-topic view with a boolean ``Canonical`` column;
+``canonical_rows`` keeps one row per repo. ``RepoTopics`` is the compact
+repo -> topics mapping. Rows without a url are kept as distinct repos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+CANONICAL = "Canonical"
+
+
+def _normalize_url(url: str) -> str:
+    url = url.strip().lower().split("://", 1)[-1].rstrip("/")
+    url = url[4:] if url.startswith("www.") else url
+    return url[:-4].rstrip("/") if url.endswith(".git") else url
+
+
+def normalize_urls(urls: pd.Series) -> pd.Series:
+    """Lower-cased urls without scheme, ``www.``, trailing ``/`` or ``.git``."""
+    # Plain string methods beat the equivalent regular expressions by a wide margin here
+    values = [_normalize_url(url) if isinstance(url, str) else url for url in urls.tolist()]
+    return pd.Series(values, index=urls.index, dtype=object, name=urls.name)
+
+
+def url_hashes(urls: pd.Series) -> np.ndarray:
+    """64-bit hashes of the normalized ``urls``."""
+    # Urls are mostly distinct, so factorizing them first (the default) only costs time
+    return pd.util.hash_pandas_object(normalize_urls(urls), index=False, categorize=False).to_numpy()
+
+
+def _first_seen(lookup: dict, keys: list) -> tuple:
+    """Ids of ``keys`` in ``lookup`` (new keys get the next ids) and a mask of their first rows."""
+    known = len(lookup)
+    ids = np.fromiter((lookup.setdefault(key, len(lookup)) for key in keys), dtype=np.int64, count=len(keys))
+    # New ids are handed out in row order, so a row is a key's first when its id exceeds all before it
+    previous = np.maximum.accumulate(np.concatenate([[known - 1], ids[:-1]]))
+    return ids, ids > previous
+
+
+@dataclass
+class RepoTopics:
+    """Topics of ``n`` repos: repo ``i`` was listed under ``vocab[topic_ids[offsets[i]:offsets[i + 1]]]``."""
+
+    vocab: np.ndarray
+    topic_ids: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of topics of each repo."""
+        return np.diff(self.offsets)
+
+    def topics_of(self, repo: int) -> list:
+        """Topics of repo ``repo``, in the order they were first seen."""
+        return self.vocab[self.topic_ids[self.offsets[repo] : self.offsets[repo + 1]]].tolist()
+
+    def counts(self) -> pd.Series:
+        """Distinct repos per topic, in first-seen topic order."""
+        counts = np.bincount(self.topic_ids, minlength=len(self.vocab))
+        return pd.Series(counts, index=pd.Index(self.vocab, name="Topic"), name="Repos")
+
+
+class Deduplicator:
+    """Streaming url-hash deduplication of cleaned ``github_df`` chunks with a ``Url`` column."""
+
+    def __init__(self):
+        self.repo_lookup = {}
+        self.pair_lookup = {}
+        self.topic_lookup = {}
+        self.pair_repos = []
+        self.pair_topics = []
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Rows of ``chunk`` that start a new (repo, topic) pair, flagged ``Canonical`` if they start a repo."""
+        has_url = chunk["Url"].notna().to_numpy()
+        keys = np.empty(len(chunk), dtype=object)
+        keys[has_url] = url_hashes(chunk["Url"][has_url]).tolist()
+        for row in np.flatnonzero(~has_url).tolist():
+            # A row without url is its own repo, keyed by its position in the stream
+            keys[row] = ("row", self.rows + row)
+        self.rows += len(chunk)
+        repos, canonical = _first_seen(self.repo_lookup, keys.tolist())
+
+        topic_codes, topic_names = pd.factorize(chunk["Topic"], use_na_sentinel=False)
+        topic_ids = np.array([self.topic_lookup.setdefault(topic, len(self.topic_lookup)) for topic in topic_names])
+        topics = topic_ids[topic_codes] if len(topic_ids) else np.zeros(0, dtype=np.int64)
+        _, first_pair = _first_seen(self.pair_lookup, list(zip(repos.tolist(), topics.tolist())))
+        self.pair_repos.append(repos[first_pair])
+        self.pair_topics.append(topics[first_pair])
+        return chunk[first_pair].assign(**{CANONICAL: canonical[first_pair]})
+
+    def repo_topics(self) -> RepoTopics:
+        """The topics of every repo seen so far, indexed by repo id (first-seen order)."""
+        repos = np.concatenate([np.zeros(0, dtype=np.int64), *self.pair_repos])
+        topics = np.concatenate([np.zeros(0, dtype=np.int64), *self.pair_topics])
+        offsets = np.zeros(len(self.repo_lookup) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(repos, minlength=len(self.repo_lookup)), out=offsets[1:])
+        # Counting sort by repo: each pair goes to its repo's slot plus its rank among that repo's pairs
+        rank = pd.Series(repos).groupby(repos, sort=False).cumcount().to_numpy()
+        topic_ids = np.empty(len(topics), dtype=np.int32)
+        topic_ids[offsets[repos] + rank] = topics
+        vocab = np.array(list(self.topic_lookup), dtype=object)
+        return RepoTopics(vocab=vocab, topic_ids=topic_ids, offsets=offsets)
+
+
+def iter_deduplicated(chunks, deduplicator: Deduplicator | None = None):
+    """Yield the per-topic view of each chunk, with the ``Canonical`` flag."""
+    deduplicator = deduplicator or Deduplicator()
+    for chunk in chunks:
+        yield deduplicator.update(chunk)
+
+
+def deduplicate(github_df: pd.DataFrame) -> tuple:
+    """``(per_topic_df, repo_topics)`` of a cleaned ``github_df`` with a ``Url`` column.
+
+    ``per_topic_df`` keeps the first row of every (repo, topic) pair and flags
+    the first row of every repo in its ``Canonical`` column.
+    """
+    deduplicator = Deduplicator()
+    return deduplicator.update(github_df), deduplicator.repo_topics()
+
+
+def canonical_rows(frame: pd.DataFrame) -> pd.DataFrame:
+    """One row per repo of a frame flagged by ``Deduplicator``, without the flag."""
+    return frame[frame[CANONICAL].to_numpy()].drop(columns=CANONICAL)
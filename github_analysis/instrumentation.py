@@ -0,0 +1,312 @@
+"""Per-stage timing and memory instrumentation of the pipeline.
+
+The loading, cleaning, tag parsing, aggregation and rendering steps are
+wrapped in named stages::
+
+    with stage("clean", rows_in=len(raw)) as s:
+        github_df, report = clean_counts(raw)
+        s.rows_out = len(github_df)
+
+While instrumentation is disabled (the default) ``stage`` returns a shared
+no-op object, so the hooks cost a function call. Once enabled, every stage
+records wall time, CPU time, the process' peak RSS, optionally the peak of
+memory traced by ``tracemalloc`` while it ran, and its input and output row
+counts. Events are appended to a JSON-lines file as they happen and only
+per-stage running totals are kept in memory; the totals can also be written
+as a Prometheus text file (for the node exporter's textfile collector) when
+instrumentation is disabled again::
+
+    with instrumented(events_path="events.jsonl", prometheus_path="pipeline.prom"):
+        run_analysis(github_df)
+
+Worker processes started with ``worker_initializer`` append their stages to
+the same event log; the Prometheus totals only cover the parent process
+(``stage_totals`` of the parsed log covers them all).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRIC_PREFIX = "github_analysis_stage"
+_EVENT_FIELDS = {
+    "stage", "parent", "pid", "start", "wall_s", "cpu_s", "max_rss_bytes",
+    "peak_traced_bytes", "rows_in", "rows_out", "error",
+}
+_PROMETHEUS_METRICS = [
+    ("calls_total", "counter", "Number of times the stage ran.", "calls"),
+    ("wall_seconds_total", "counter", "Wall-clock time spent in the stage.", "wall"),
+    ("cpu_seconds_total", "counter", "CPU time spent in the stage.", "cpu"),
+    ("rows_in_total", "counter", "Rows passed to the stage.", "rows_in"),
+    ("rows_out_total", "counter", "Rows produced by the stage.", "rows_out"),
+    ("peak_traced_bytes", "gauge", "Largest tracemalloc peak of a single run of the stage.", "peak"),
+]
+
+_active = None
+
+
+def max_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far, if the platform reports it."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _NullStage:
+    """What ``stage`` returns while instrumentation is disabled."""
+
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """A running stage; set ``rows_out`` before it exits."""
+
+    def __init__(self, recorder: "Instrumentation", name: str, rows_in: int | None, labels: dict):
+        self.recorder = recorder
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.labels = labels
+        self.parent = None
+        self.traced_start = 0
+        self.traced_peak = 0
+
+    def __enter__(self):
+        stack = self.recorder.stack
+        self.parent = stack[-1] if stack else None
+        if self.recorder.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                self.parent.traced_peak = max(self.parent.traced_peak, peak)
+            tracemalloc.reset_peak()
+            self.traced_start = self.traced_peak = current
+        stack.append(self)
+        self.start = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        self.recorder.stack.pop()
+        event = {
+            "stage": self.name,
+            **self.labels,
+            "parent": self.parent.name if self.parent is not None else None,
+            "pid": os.getpid(),
+            "start": self.start,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "max_rss_bytes": max_rss_bytes(),
+            "peak_traced_bytes": None,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "error": exc_type.__name__ if exc_type is not None else None,
+        }
+        if self.recorder.trace_memory:
+            self.traced_peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+            event["peak_traced_bytes"] = self.traced_peak - self.traced_start
+            if self.parent is not None:
+                self.parent.traced_peak = max(self.parent.traced_peak, self.traced_peak)
+        self.recorder.record(event)
+        return False
+
+
+class Instrumentation:
+    """Writes stage events to the configured sinks and keeps per-stage totals.
+
+    Only the totals stay in memory, so a long-running server's recorder does
+    not grow with the number of stages it has run.
+    """
+
+    def __init__(
+        self, events_path: str | None = None, prometheus_path: str | None = None, trace_memory: bool = False
+    ):
+        self.events_path = events_path
+        self.prometheus_path = prometheus_path
+        self.trace_memory = trace_memory
+        self.totals = {}
+        self.stack = []
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def record(self, event: dict) -> None:
+        add_event(self.totals, event)
+        if self.events_path:
+            # One short append per event, so forked workers can share the file
+            with open(self.events_path, "a") as f:
+                f.write(json.dumps(event) + "\n")
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if self.prometheus_path:
+            write_prometheus(self.totals, self.prometheus_path)
+
+    def config(self) -> dict:
+        """Settings for worker processes: same event log and tracing, no Prometheus file."""
+        return {"events_path": self.events_path, "trace_memory": self.trace_memory}
+
+
+def enable(
+    events_path: str | None = None, prometheus_path: str | None = None, trace_memory: bool = False
+) -> Instrumentation:
+    """Start recording stages, replacing any active recorder."""
+    global _active
+    disable()
+    _active = Instrumentation(events_path, prometheus_path, trace_memory)
+    _active.start()
+    return _active
+
+
+def disable() -> "Instrumentation | None":
+    """Stop recording, write the Prometheus file if configured, return the recorder."""
+    global _active
+    recorder, _active = _active, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+def active() -> "Instrumentation | None":
+    return _active
+
+
+@contextmanager
+def instrumented(events_path: str | None = None, prometheus_path: str | None = None, trace_memory: bool = False):
+    """Record stages inside the ``with`` block; yields the ``Instrumentation``."""
+    recorder = enable(events_path, prometheus_path, trace_memory)
+    try:
+        yield recorder
+    finally:
+        if _active is recorder:
+            disable()
+
+
+def stage(name: str, rows_in: int | None = None, **labels):
+    """Context manager timing the stage ``name``; a no-op while disabled.
+
+    Extra keyword arguments (e.g. ``figure="tags_wordcloud"``) are stored in
+    the event and become Prometheus labels.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return Stage(_active, name, rows_in, labels)
+
+
+def worker_config() -> dict | None:
+    """Argument for ``worker_initializer`` in a process pool, ``None`` while disabled."""
+    return _active.config() if _active is not None else None
+
+
+def worker_initializer(config: dict | None) -> None:
+    """Process pool initializer enabling instrumentation with ``worker_config()``."""
+    global _active
+    # A forked worker inherits the parent's recorder, which must not write the Prometheus file
+    _active = None
+    if config is not None:
+        enable(**config)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _empty_totals() -> dict:
+    return {"calls": 0, "wall": 0.0, "cpu": 0.0, "rows_in": None, "rows_out": None, "peak": None}
+
+
+def add_event(totals: dict, event: dict) -> dict:
+    """Fold ``event`` into ``totals``, keyed by stage name and extra labels; returns ``totals``."""
+    labels = {key: event[key] for key in event if key not in _EVENT_FIELDS}
+    total = totals.setdefault((event["stage"], tuple(sorted(labels.items()))), _empty_totals())
+    total["calls"] += 1
+    total["wall"] += event["wall_s"]
+    total["cpu"] += event["cpu_s"]
+    # Row counters only exist for stages that report them
+    for field in ("rows_in", "rows_out"):
+        if event[field] is not None:
+            total[field] = (total[field] or 0) + event[field]
+    if event["peak_traced_bytes"] is not None:
+        total["peak"] = max(total["peak"] or 0, event["peak_traced_bytes"])
+    return totals
+
+
+def stage_totals(events) -> dict:
+    """Per-stage totals of an iterable of events, e.g. the lines of an event log."""
+    totals = {}
+    for event in events:
+        add_event(totals, event)
+    return totals
+
+
+def prometheus_text(totals: dict) -> str:
+    """Per-stage ``totals`` (see ``stage_totals``) in the Prometheus text exposition format."""
+    lines = []
+    for metric, kind, help_text, field in _PROMETHEUS_METRICS:
+        samples = [(key, total[field]) for key, total in totals.items() if total[field] is not None]
+        if not samples:
+            continue
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+        for (name, labels), value in samples:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in (("stage", name), *labels))
+            lines.append(f"{METRIC_PREFIX}_{metric}{{{label_text}}} {value}")
+    rss = max_rss_bytes()
+    if rss is not None:
+        lines.append("# HELP github_analysis_max_rss_bytes Peak resident set size of the process.")
+        lines.append("# TYPE github_analysis_max_rss_bytes gauge")
+        lines.append(f"github_analysis_max_rss_bytes {rss}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(totals: dict, path: str) -> None:
+    """Write ``prometheus_text(totals)`` to ``path`` atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=".prom")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(prometheus_text(totals))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def add_arguments(parser) -> None:
+    """Add the ``--events``, ``--prometheus`` and ``--trace-memory`` options to a CLI."""
+    parser.add_argument("--events", default=None, help="append per-stage timings to this JSON-lines file")
+    parser.add_argument("--prometheus", default=None, help="write per-stage totals to this Prometheus text file")
+    parser.add_argument("--trace-memory", action="store_true", help="also record tracemalloc peaks (slower)")
+
+
+def enable_from_args(args) -> Instrumentation | None:
+    """Enable instrumentation if the options of ``add_arguments`` ask for it."""
+    if not (args.events or args.prometheus):
+        return None
+    return enable(args.events, args.prometheus, args.trace_memory)
@@ -0,0 +1,83 @@
+"""Streaming top-k leaderboards (In[8], In[10], In[12] and In[19]).
+
+Each of those cells calls ``github_df.nlargest`` on the fully loaded frame.
+``Leaderboard`` keeps, for several metrics at once, only the ``k`` best rows
+seen so far (optionally per topic). Every chunk is reduced to its own top
+``k`` and merged into that bounded state, so memory stays O(k x groups)
+whatever the number of chunks.
+
+Ties are broken like ``nlargest(keep="first")``: among equal values the row
+with the smaller index wins, so chunks must carry their row positions as
+index (as ``iter_clean_chunks`` does). Rows with a missing metric are skipped.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_METRICS = ("Star", "Watch", "Fork")
+
+
+def _top_rows(frame: pd.DataFrame, metric: str, k: int, by: str | None = None) -> pd.DataFrame:
+    """Best ``k`` rows of ``frame`` by ``metric`` (per ``by`` group), best first."""
+    values = frame[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = ~np.isnan(values)
+    if by is None and keep.sum() > k:
+        # Cheap pre-selection: everything tied with the k-th value survives
+        kth = np.partition(values[keep], keep.sum() - k)[keep.sum() - k]
+        keep &= values >= kth
+    frame, values = frame[keep], values[keep]
+    position = frame.index.to_numpy()
+    if by is None:
+        return frame.iloc[np.lexsort((position, -values))[:k]]
+    groups = pd.factorize(frame[by])[0]
+    frame = frame.iloc[np.lexsort((position, -values, groups))]
+    return frame[frame.groupby(by, sort=False, observed=True).cumcount().to_numpy() < k]
+
+
+class Leaderboard:
+    """Top ``k`` rows for each of ``metrics``, overall or per ``by`` group."""
+
+    def __init__(self, metrics: tuple = DEFAULT_METRICS, k: int = 10, by: str | None = None):
+        self.metrics = tuple(metrics)
+        self.k = k
+        self.by = by
+        self.boards = {metric: None for metric in self.metrics}
+
+    def update(self, chunk: pd.DataFrame) -> "Leaderboard":
+        """Fold a chunk of cleaned rows into every leaderboard."""
+        for metric in self.metrics:
+            self._fold(metric, _top_rows(chunk, metric, self.k, self.by))
+        return self
+
+    def _fold(self, metric: str, candidates: pd.DataFrame) -> None:
+        board = self.boards[metric]
+        if board is not None:
+            candidates = pd.concat([board, candidates])
+        self.boards[metric] = _top_rows(candidates, metric, self.k, self.by)
+
+    def merge(self, other: "Leaderboard") -> "Leaderboard":
+        """Fold in a leaderboard built over other chunks of the same data."""
+        if (other.metrics, other.k, other.by) != (self.metrics, self.k, self.by):
+            raise ValueError("Cannot merge leaderboards with different metrics, k or grouping")
+        for metric, board in other.boards.items():
+            if board is not None:
+                self._fold(metric, board)
+        return self
+
+    def top(self, metric: str, n: int | None = None, group=None) -> pd.DataFrame:
+        """Best ``n`` (default ``k``) rows by ``metric``, like ``github_df.nlargest(n, metric)``.
+
+        For a grouped leaderboard, ``group`` selects one group; without it all
+        groups are returned, each in leaderboard order.
+        """
+        n = self.k if n is None else n
+        if n > self.k:
+            raise ValueError(f"Leaderboard only keeps the top {self.k} rows")
+        board = self.boards[metric]
+        if board is None:
+            return pd.DataFrame()
+        if self.by is None:
+            return board.head(n)
+        if group is not None:
+            return board[board[self.by] == group].head(n)
+        return board[board.groupby(self.by, sort=False, observed=True).cumcount().to_numpy() < n]
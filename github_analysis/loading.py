@@ -0,0 +1,85 @@
+"""Chunked, column-projected reading of the scraped CSV (In[2]-In[4]).
+
+In[2] parses every column of ``Github_data.csv``, including the long
+description and url fields, before In[3] throws most of them away. The
+loader below only parses the columns the analysis needs, reads them as plain
+strings and cleans each chunk as soon as it is read, so peak memory is bound
+by ``chunksize`` rather than by the size of the file.
+"""
+
+from typing import Iterator
+
+import pandas as pd
+
+from github_analysis.cleaning import CleaningReport, clean_counts
+from github_analysis.instrumentation import stage
+from github_analysis.schema import OPTIONAL_COLUMNS, RAW_TO_CLEAN, compact_github_df, select_columns
+
+DEFAULT_CSV = "Github_data.csv"
+DEFAULT_CHUNKSIZE = 100_000
+
+CLEAN_TO_RAW = {clean: raw for raw, clean in {**RAW_TO_CLEAN, **OPTIONAL_COLUMNS}.items()}
+
+# Every raw column is text: counts carry "k" suffixes and "," separators
+RAW_DTYPES = {raw: str for raw in CLEAN_TO_RAW.values()}
+
+
+def raw_columns(columns: list | None = None) -> list:
+    """Raw CSV column names needed to produce the given cleaned columns.
+
+    The default is the 11 columns of In[3]; optional columns such as ``Url``
+    are only read when listed.
+    """
+    if columns is None:
+        return list(RAW_TO_CLEAN)
+    unknown = [col for col in columns if col not in CLEAN_TO_RAW]
+    if unknown:
+        raise ValueError(f"Unknown github_df columns: {unknown}")
+    return [raw for clean, raw in CLEAN_TO_RAW.items() if clean in columns]
+
+
+def iter_clean_chunks(
+    path: str = DEFAULT_CSV, chunksize: int = DEFAULT_CHUNKSIZE, columns: list | None = None
+) -> Iterator[tuple[pd.DataFrame, CleaningReport]]:
+    """Yield ``(github_df_chunk, report)`` pairs read from ``path``.
+
+    Only the raw columns behind ``columns`` (cleaned names, default all 11)
+    are parsed. Each chunk is renamed and cleaned before it is yielded and
+    keeps its row positions in the file as index.
+    """
+    usecols = raw_columns(columns)
+    dtypes = {col: RAW_DTYPES[col] for col in usecols}
+    with pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize) as reader:
+        while True:
+            with stage("read_csv") as read:
+                raw_chunk = next(reader, None)
+                read.rows_out = 0 if raw_chunk is None else len(raw_chunk)
+            if raw_chunk is None:
+                return
+            with stage("clean", rows_in=len(raw_chunk)) as clean:
+                chunk, report = clean_counts(select_columns(raw_chunk, columns))
+                clean.rows_out = len(chunk)
+            yield chunk, report
+
+
+def load_github_df(
+    path: str = DEFAULT_CSV, chunksize: int = DEFAULT_CHUNKSIZE, columns: list | None = None, compact: bool = False
+) -> tuple[pd.DataFrame, CleaningReport]:
+    """Read and clean ``path`` chunk by chunk into one ``github_df``.
+
+    Equivalent to running In[2]-In[4] on the file. With ``compact=True`` the
+    frame gets the layout of ``compact_github_df``.
+    """
+    with stage("load") as load:
+        chunks = []
+        report = CleaningReport()
+        for chunk, chunk_report in iter_clean_chunks(path, chunksize=chunksize, columns=columns):
+            chunks.append(chunk)
+            report = report + chunk_report
+        if not chunks:
+            return select_columns(pd.DataFrame(columns=raw_columns(columns)), columns), report
+        github_df = pd.concat(chunks)
+        if compact:
+            github_df = compact_github_df(github_df)
+        load.rows_out = len(github_df)
+    return github_df, report
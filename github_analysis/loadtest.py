@@ -0,0 +1,119 @@
+"""Load test of a running ``github_analysis.server``.
+
+Usage::
+
+    python -m github_analysis.server Github_data.csv &
+    python -m github_analysis.loadtest --url http://127.0.0.1:8000 --requests 20000 --concurrency 16
+
+Each of ``--concurrency`` threads keeps one HTTP/1.1 connection open and
+sends GET requests for the server's outputs in turn until ``--requests``
+have been sent in total. Latency is measured per request, from sending it to
+reading the whole response; the report gives its percentiles and the overall
+requests per second.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+DEFAULT_URL = "http://127.0.0.1:8000"
+
+
+def default_paths(url: str) -> list:
+    """Every output and section the server at ``url`` lists on its index page."""
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    try:
+        connection.request("GET", "/")
+        index = json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+    return [f"/outputs/{name}" for name in index["outputs"]] + [f"/sections/{name}" for name in index["sections"]]
+
+
+def _worker(host: str, port: int, paths, latencies: list, errors: list) -> None:
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as error:
+                errors.append(f"{path}: {type(error).__name__}")
+                connection.close()
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append(f"{path}: HTTP {response.status}")
+    finally:
+        connection.close()
+
+
+def run_load(url: str = DEFAULT_URL, requests: int = 10_000, concurrency: int = 8, paths: list | None = None) -> dict:
+    """Send ``requests`` GETs over ``concurrency`` connections and summarize the latencies."""
+    parts = urlsplit(url)
+    paths = paths or default_paths(url)
+    cycle = itertools.cycle(paths)
+    schedule = [[] for _ in range(concurrency)]
+    for i in range(requests):
+        schedule[i % concurrency].append(next(cycle))
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_worker, args=(parts.hostname, parts.port or 80, share, latencies, errors))
+        for share in schedule
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1e3
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "paths": len(paths),
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else None,
+        "mean_ms": float(ms.mean()) if len(ms) else None,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else None,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else None,
+        "max_ms": float(ms.max()) if len(ms) else None,
+    }
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of a github_analysis server.")
+    parser.add_argument("--url", default=DEFAULT_URL, help="server address (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=10_000, help="total requests (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel connections (default: %(default)s)")
+    parser.add_argument("--paths", default=None, help="comma-separated paths (default: every output and section)")
+    parser.add_argument("--out", default=None, help="also write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    paths = args.paths.split(",") if args.paths else None
+    result = run_load(args.url, requests=args.requests, concurrency=args.concurrency, paths=paths)
+    print(
+        f"{result['requests']} requests over {result['concurrency']} connections ({result['paths']} paths): "
+        f"{result['rps']:.0f} req/s, p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+        f"max {result['max_ms']:.2f} ms, {result['errors']} errors"
+    )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Multiprocess map-reduce over the cleaned data (sections 1-4).
+
+The cleaned rows are split into contiguous shards. ``map_shard`` computes the
+mergeable partial aggregates of one shard (per-topic moments, leaderboards,
+per-user and overall correlation moments, tag counts), ``ShardResult.merge``
+combines partials in shard order and ``finalize`` turns the result into the
+frames the plotting cells use. ``run_analysis`` hands each worker of a
+``ProcessPoolExecutor`` a contiguous run of shards, which it maps and merges
+itself, so this process only merges one partial per worker; with
+``workers=1`` the same shards are processed here, which gives identical
+output.
+
+Given a ``sections.Plan``, only the columns and partial aggregates of the
+selected sections are loaded and computed. In deduplicated mode the rows go
+through ``dedup.Deduplicator`` first: per-topic statistics count each repo
+once per topic, everything else once overall.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.aggregates import RunningAggregates
+from github_analysis.correlation import (
+    CONTRIBUTION_COLUMNS,
+    CORR_DROPNA_SUBSET,
+    CorrelationAccumulator,
+    GroupedCorrelation,
+)
+from github_analysis.dedup import CANONICAL, Deduplicator, iter_deduplicated
+from github_analysis.instrumentation import stage, worker_config, worker_initializer
+from github_analysis.leaderboards import Leaderboard
+from github_analysis.loading import DEFAULT_CHUNKSIZE, iter_clean_chunks
+from github_analysis.schema import COUNT_COLUMNS
+from github_analysis.sections import Plan, plan
+from github_analysis.tags import parse_topic_tags
+
+POPULARITY_METRICS = ("Star", "Watch", "Fork")
+TOP_N = 10
+POPULAR_N = 100
+LARGE_REPO_USERS_N = 10
+TOP_TAGS_N = 15
+
+
+@dataclass
+class ShardResult:
+    """Mergeable partial aggregates of a set of rows.
+
+    Parts the selected sections do not need are ``None``.
+    """
+
+    topics: RunningAggregates | None = None
+    leaders: Leaderboard | None = None
+    users: GroupedCorrelation | None = None
+    contributions: CorrelationAccumulator | None = None
+    tag_counts: pd.Series | None = None
+
+    def merge(self, other: "ShardResult") -> "ShardResult":
+        """Fold in the partial of the rows that come after this one's."""
+        for part in ("topics", "leaders", "users", "contributions"):
+            if getattr(self, part) is not None:
+                getattr(self, part).merge(getattr(other, part))
+        if self.tag_counts is not None:
+            # Summing in shard order keeps tags in first-seen order, like Counter
+            self.tag_counts = pd.concat([self.tag_counts, other.tag_counts]).groupby(level=0, sort=False).sum()
+        return self
+
+
+def map_shard(shard: pd.DataFrame, selection: Plan | None = None) -> ShardResult:
+    """Partial aggregates of one shard of the cleaned ``github_df`` (all sections by default).
+
+    If the shard carries the ``Canonical`` flag of ``dedup.Deduplicator``,
+    the per-topic aggregates use all its rows and the others only the
+    canonical rows.
+    """
+    selection = selection or plan()
+    sections = selection.sections
+    canonical = shard[CANONICAL].to_numpy(dtype=bool) if CANONICAL in shard.columns else None
+    result = ShardResult()
+    if "tags" in sections:
+        with stage("tag_parse", rows_in=len(shard)) as parse:
+            tags = parse_topic_tags(shard["Topic_Tags"])
+            parse.rows_out = len(tags)
+        shard = shard.assign(Total_Tags=tags.lengths)
+        result.tag_counts = tags.counts(canonical)
+
+    with stage("map_aggregates", rows_in=len(shard)):
+        topic_columns = selection.count_columns if "popularity" in sections else []
+        if "tags" in sections:
+            topic_columns = topic_columns + ["Total_Tags"]
+        if topic_columns:
+            result.topics = RunningAggregates("Topic", topic_columns).update(shard)
+        repos = shard if canonical is None else shard[canonical]
+        if "popularity" in sections or "contributions" in sections:
+            metrics = POPULARITY_METRICS if "popularity" in sections else ("Star",)
+            columns = [col for col in ["Repo_Name", "Topic", *selection.count_columns] if col in selection.columns]
+            result.leaders = Leaderboard(metrics, k=POPULAR_N).update(repos[columns])
+        if "users" in sections or "contributions" in sections:
+            columns = CONTRIBUTION_COLUMNS if "contributions" in sections else []
+            result.users = GroupedCorrelation("User_Name", columns).update(repos)
+        if "contributions" in sections:
+            complete = repos.dropna(subset=CORR_DROPNA_SUBSET)
+            result.contributions = CorrelationAccumulator(CONTRIBUTION_COLUMNS).update(complete)
+    return result
+
+
+def _fold(merged: ShardResult | None, result: ShardResult) -> ShardResult:
+    return result if merged is None else merged.merge(result)
+
+
+def map_reduce_shards(shards: list, selection: Plan | None = None) -> ShardResult:
+    """``map_shard`` over consecutive ``shards`` and merge the partials, in one worker."""
+    return reduce_shards(map_shard(shard, selection) for shard in shards)
+
+
+def reduce_shards(results) -> ShardResult:
+    """Merge shard partials, in shard order."""
+    merged = None
+    for result in results:
+        merged = _fold(merged, result)
+    if merged is None:
+        raise ValueError("No shards to reduce")
+    return merged
+
+
+def finalize(result: ShardResult, selection: Plan | None = None) -> dict:
+    """Frames of the selected sections (default 1-4), named after the notebook variables."""
+    sections = (selection or plan()).sections
+    output = {}
+    if "popularity" in sections:
+        count_columns = [col for col in COUNT_COLUMNS if col in result.topics.columns]
+        output["pop_mean_df"] = result.topics.mean()[["Topic", *count_columns]]
+        for metric in POPULARITY_METRICS:
+            output[f"top_{metric.lower()}_df"] = result.leaders.top(metric, TOP_N)[["Repo_Name", "Topic", metric]]
+
+    if "users" in sections or "contributions" in sections:
+        large_repo_users = result.users.largest(LARGE_REPO_USERS_N)
+    if "users" in sections:
+        output["large_repo_users"] = large_repo_users
+        output["large_repo_users_count_df"] = result.users.sizes().loc[large_repo_users].reset_index(name="Count")
+
+    if "contributions" in sections:
+        popular_df = result.leaders.top("Star", POPULAR_N)
+        output["corr"] = result.contributions.corr()
+        output["popular_corr"] = CorrelationAccumulator(CONTRIBUTION_COLUMNS).update(popular_df).corr()
+        output["large_repo_users_corr"] = result.users.accumulator(large_repo_users).corr()
+
+    if "tags" in sections:
+        counts = result.tag_counts
+        output["tag_counts"] = counts
+        order = np.argsort(-counts.to_numpy(), kind="stable")[:TOP_TAGS_N]
+        output["toptags_df"] = pd.DataFrame(
+            {"Name of the Tag": counts.index[order], "Count": counts.to_numpy()[order]}
+        )
+        totals = result.topics.sum()
+        output["topic_wise_tag"] = (
+            totals[["Topic", "Total_Tags"]]
+            .rename(columns={"Total_Tags": "Total Tags"})
+            .astype({"Total Tags": np.int64})
+        )
+    return output
+
+
+def split_shards(github_df: pd.DataFrame, shards: int) -> list:
+    """Split ``github_df`` into ``shards`` contiguous, order-preserving pieces."""
+    bounds = np.linspace(0, len(github_df), max(shards, 1) + 1).astype(np.int64)
+    return [github_df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _map_all(shards: list, workers: int, selection: Plan):
+    if workers == 1:
+        return map(partial(map_shard, selection=selection), shards)
+    # One contiguous run of shards per worker, pre-reduced there
+    bounds = np.linspace(0, len(shards), min(workers, len(shards)) + 1).astype(np.int64)
+    runs = [shards[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+    mapper = partial(map_reduce_shards, selection=selection)
+    with ProcessPoolExecutor(max_workers=workers, initializer=worker_initializer, initargs=(worker_config(),)) as pool:
+        return list(pool.map(mapper, runs))
+
+
+def run_analysis(
+    github_df: pd.DataFrame,
+    workers: int | None = None,
+    shards: int | None = None,
+    sections=None,
+    dedup: bool = False,
+) -> dict:
+    """Compute the frames of ``sections`` (default 1-4) of a cleaned ``github_df`` with ``workers`` processes.
+
+    ``sections`` takes the names of ``sections.SECTIONS`` and ``github_df``
+    needs at least the columns of their plan (with ``Url`` for ``dedup``).
+    ``shards`` defaults to four per worker, which bounds the size of each map
+    step; a worker merges its own shards before returning. The index of
+    ``github_df`` must hold row positions, as after loading.
+    """
+    selection = plan(sections, dedup=dedup)
+    workers = workers or os.cpu_count() or 1
+    shards = shards or 4 * workers
+    if dedup:
+        with stage("dedup", rows_in=len(github_df)) as deduplicate:
+            github_df = Deduplicator().update(github_df)
+            deduplicate.rows_out = len(github_df)
+    with stage("map_reduce", rows_in=len(github_df), workers=workers):
+        merged = reduce_shards(_map_all(split_shards(github_df, shards), workers, selection))
+    with stage("finalize"):
+        return finalize(merged, selection)
+
+
+def run_analysis_csv(
+    path: str, workers: int | None = None, chunksize: int = DEFAULT_CHUNKSIZE, sections=None, dedup: bool = False
+) -> dict:
+    """Like ``run_analysis``, streaming cleaned CSV chunks to the workers.
+
+    Only the columns the selected ``sections`` need are read from the CSV.
+    With ``dedup`` the chunks are deduplicated in this process, in file order.
+    """
+    selection = plan(sections, dedup=dedup)
+    workers = workers or os.cpu_count() or 1
+    chunks = (chunk for chunk, _ in iter_clean_chunks(path, chunksize=chunksize, columns=selection.columns))
+    if dedup:
+        chunks = iter_deduplicated(chunks)
+    mapper = partial(map_shard, selection=selection)
+    if workers == 1:
+        with stage("map_reduce", workers=1):
+            merged = reduce_shards(map(mapper, chunks))
+        with stage("finalize"):
+            return finalize(merged, selection)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=worker_initializer, initargs=(worker_config(),))
+    with pool, stage("map_reduce", workers=workers):
+        # Keep a bounded number of chunks in flight, merging in file order
+        pending = deque()
+        merged = None
+        for chunk in chunks:
+            pending.append(pool.submit(mapper, chunk))
+            if len(pending) >= 2 * workers:
+                merged = _fold(merged, pending.popleft().result())
+        while pending:
+            merged = _fold(merged, pending.popleft().result())
+    if merged is None:
+        raise ValueError(f"No rows in {path}")
+    with stage("finalize"):
+        return finalize(merged, selection)
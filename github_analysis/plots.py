@@ -0,0 +1,350 @@
+"""The report's figures, drawn from the computed aggregates.
+
+Every figure of the notebook has a function here that takes its input data
+and returns a matplotlib ``Figure`` without showing it. The styling the cells
+repeat (edge colour, spines, palette, label fonts) lives in one place, and
+``FIGURES`` maps each figure name to its function and to the key of its input
+in the ``run_analysis`` output.
+
+matplotlib, seaborn, wordcloud and PIL are imported when a figure is drawn,
+not when this module is, so importing ``FIGURES`` or the closed-form fit
+helpers stays cheap.
+"""
+
+import hashlib
+import json
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.cache import DEFAULT_CACHE_DIR
+
+# Bump whenever the look of the figures changes, so they get re-rendered
+STYLE_VERSION = 3
+
+TEXT_COLOR = "#333F4B"
+POINT_COLOR = "#4682B4"
+PALETTE = "Blues_d"
+LABEL_FONTSIZE = 13
+
+WORDCLOUD_PARAMS = {"background_color": "white", "max_font_size": 120, "max_words": 200}
+
+# Above this many rows the relationship plots switch to the binned, closed-form mode
+REGPLOT_MAX_POINTS = 100_000
+
+
+def _pyplot() -> tuple:
+    """``matplotlib.pyplot`` and ``seaborn``, imported on first use."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    return plt, sns
+
+
+def _style_axes(ax, xlim=None, hide=("top", "right", "left"), left_ticks=False, bottom_ticks=True):
+    """Spines, ticks and background shared by the bar and count plots."""
+    plt, _ = _pyplot()
+    plt.rcParams["axes.edgecolor"] = TEXT_COLOR
+    for spine in hide:
+        ax.spines[spine].set_visible(False)
+    ax.tick_params(axis="both", which="both", labelsize=10, bottom=bottom_ticks, left=left_ticks)
+    if xlim is not None:
+        ax.set_xlim(*xlim)
+    ax.grid(False)
+    ax.set_facecolor("white")
+
+
+def _labels(fig, ax, xlabel, ylabel, title, title_size=18):
+    ax.set_xlabel(xlabel, fontsize=LABEL_FONTSIZE, color=TEXT_COLOR)
+    ax.set_ylabel(ylabel, fontsize=LABEL_FONTSIZE, color=TEXT_COLOR)
+    fig.suptitle(title, fontsize=title_size, color=TEXT_COLOR)
+
+
+def topic_average_bar(pop_mean_df: pd.DataFrame, metric: str, xlim: float, xlabel: str, title: str):
+    """Average ``metric`` per topic (In[7], In[9], In[11])."""
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    _style_axes(ax, xlim=(0, xlim))
+    sns.barplot(data=pop_mean_df.sort_values(metric, ascending=False), x=metric, y="Topic", palette=PALETTE)
+    _labels(fig, ax, xlabel, "Topic", title)
+    return fig
+
+
+def linear_fit(x: np.ndarray, y: np.ndarray) -> dict:
+    """Closed-form least-squares fit of ``y`` on ``x`` over the rows where both are present.
+
+    Returns the slope, intercept and Pearson r that ``sns.regplot`` draws,
+    plus what ``regression_band`` needs for the confidence interval.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    n = len(x)
+    x_mean, y_mean = x.mean(), y.mean()
+    sxx = np.sum((x - x_mean) ** 2)
+    syy = np.sum((y - y_mean) ** 2)
+    sxy = np.sum((x - x_mean) * (y - y_mean))
+    slope = sxy / sxx
+    intercept = y_mean - slope * x_mean
+    residual = max(syy - slope * sxy, 0.0)
+    return {
+        "n": n,
+        "slope": slope,
+        "intercept": intercept,
+        "r": sxy / np.sqrt(sxx * syy),
+        "x_mean": x_mean,
+        "sxx": sxx,
+        "sigma": np.sqrt(residual / (n - 2)) if n > 2 else np.nan,
+    }
+
+
+def regression_band(fit: dict, grid: np.ndarray, ci: float = 95) -> tuple:
+    """Analytic confidence band of the fitted mean at ``grid``.
+
+    Uses the normal quantile, which matches Student's t closely at the row
+    counts the large-data mode is meant for.
+    """
+    z = NormalDist().inv_cdf(0.5 + ci / 200)
+    line = fit["intercept"] + fit["slope"] * grid
+    se = fit["sigma"] * np.sqrt(1 / fit["n"] + (grid - fit["x_mean"]) ** 2 / fit["sxx"])
+    return line, line - z * se, line + z * se
+
+
+def _log_edges(values: np.ndarray, bins: int) -> tuple:
+    """Bin edges evenly spaced in ``log1p`` when ``values`` are non-negative, and the matching axis scale.
+
+    Star, fork and watcher counts span several orders of magnitude, so linear
+    bins put nearly every repository in the first column.
+    """
+    low, high = values.min(), values.max()
+    if low < 0 or high == low:
+        return np.linspace(low, high, bins + 1), "linear"
+    return np.expm1(np.linspace(np.log1p(low), np.log1p(high), bins + 1)), "symlog"
+
+
+def _binned_regplot(ax, x: np.ndarray, y: np.ndarray, bins: int = 200):
+    """2-D histogram of the points on log-spaced bins, with the closed-form regression line on top."""
+    from matplotlib.colors import LogNorm
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x_edges, x_scale = _log_edges(x[keep], bins)
+    y_edges, y_scale = _log_edges(y[keep], bins)
+    counts, x_edges, y_edges = np.histogram2d(x[keep], y[keep], bins=[x_edges, y_edges])
+    mesh = ax.pcolormesh(
+        x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap="Blues", norm=LogNorm(), shading="flat"
+    )
+    ax.figure.colorbar(mesh, ax=ax, label="Repositories")
+    # symlog is linear below 1, so the zero counts stay on the axes
+    for set_scale, scale in ((ax.set_xscale, x_scale), (ax.set_yscale, y_scale)):
+        set_scale(scale, **({"linthresh": 1} if scale == "symlog" else {}))
+
+    fit = linear_fit(x, y)
+    # The edges are evenly spaced on the drawn scale, so the line stays smooth on it
+    grid = np.interp(np.linspace(0, bins, 400), np.arange(bins + 1), x_edges)
+    line, low, high = regression_band(fit, grid)
+    label = f"slope={fit['slope']:.4g}, intercept={fit['intercept']:.4g}, r={fit['r']:.3f}"
+    ax.plot(grid, line, color=POINT_COLOR, label=label)
+    ax.fill_between(grid, low, high, color=POINT_COLOR, alpha=0.15)
+    ax.set_xlim(x_edges[0], x_edges[-1])
+    ax.set_ylim(y_edges[0], y_edges[-1])
+    ax.legend(loc="upper left", fontsize=9)
+    return fit
+
+
+def relationship_regplot(
+    github_df: pd.DataFrame,
+    x: str,
+    y: str,
+    xlabel: str,
+    ylabel: str,
+    title: str,
+    max_points: int = REGPLOT_MAX_POINTS,
+):
+    """Scatter plot with regression line of two popularity columns (In[13]-In[15]).
+
+    Above ``max_points`` rows, the points are drawn as a density on
+    log-spaced bins and symlog axes, and the regression line and its 95% band are computed in closed form instead
+    of bootstrapping, with slope, intercept and r in the legend.
+    """
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    sns.set_theme("paper")
+    if len(github_df) > max_points:
+        _binned_regplot(ax, github_df[x].to_numpy(), github_df[y].to_numpy())
+    else:
+        sns.regplot(data=github_df, x=x, y=y, color=POINT_COLOR, ax=ax)
+    _labels(fig, ax, xlabel, ylabel, title)
+    return fig
+
+
+def large_repo_users_bar(count_df: pd.DataFrame):
+    """Users with most repositories (In[16])."""
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    sns.despine(left=True, bottom=True)
+    _style_axes(ax, xlim=(0, 18), hide=(), bottom_ticks=False)
+    sns.barplot(data=count_df, x="Count", y="User_Name", palette=PALETTE)
+    _labels(fig, ax, "Count", "User", "Top 10 Users with Most Number of Repositories")
+    return fig
+
+
+def correlation_heatmap(corr: pd.DataFrame, title: str, title_size: int = 14):
+    """Correlation of the contribution columns (In[18]-In[20])."""
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    ax.tick_params(labelsize=13, labelrotation=90)
+    sns.heatmap(corr, linewidths=0.1, vmax=1.0, square=True, linecolor="white", annot=True, cmap="Blues", ax=ax)
+    fig.suptitle(title, fontsize=title_size, color=TEXT_COLOR)
+    return fig
+
+
+def top_tags_bar(toptags_df: pd.DataFrame):
+    """Most popular topic tags (In[23])."""
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(7, 4), dpi=100)
+    plt.xticks(rotation=90)
+    sns.despine()
+    ax.grid(False)
+    ax.set_facecolor("white")
+    sns.barplot(data=toptags_df, x="Name of the Tag", y="Count", palette=PALETTE)
+    _labels(fig, ax, "Topic Tags", "Count", "Top 15 Most Popular Topic Tags")
+    return fig
+
+
+def topic_tags_bar(topic_wise_tag: pd.DataFrame):
+    """Total tags per topic (In[25])."""
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(7, 4), dpi=100)
+    ax.grid(False)
+    ax.set_facecolor("white")
+    sns.despine()
+    data = topic_wise_tag.sort_values(ascending=False, by="Total Tags").reset_index(drop=True)
+    sns.barplot(data=data, x="Total Tags", y="Topic", errorbar=None, palette=PALETTE)
+    _labels(fig, ax, "Total Tags", "Topic", "Tags Distribution Across Topics")
+    return fig
+
+
+def wordcloud_image(tag_counts: pd.Series, cache_dir: str = DEFAULT_CACHE_DIR, **params):
+    """Word cloud image of the ``max_words`` most frequent tags, cached on disk.
+
+    The cloud is laid out straight from the tag frequencies, so hyphenated
+    tags stay whole and no joined text of all tags is built. Images are
+    cached under ``cache_dir`` keyed on the top tags, their counts and
+    ``params``.
+    """
+    from PIL import Image
+
+    params = {**WORDCLOUD_PARAMS, **params}
+    order = np.argsort(-tag_counts.to_numpy(), kind="stable")[: params["max_words"]]
+    top = tag_counts.iloc[order]
+    key = hashlib.sha256(
+        json.dumps([params, top.index.astype(str).tolist(), top.to_numpy().tolist()], sort_keys=True).encode()
+    ).hexdigest()[:32]
+    path = os.path.join(cache_dir, "wordcloud", f"{key}.png")
+    if os.path.isfile(path):
+        return Image.open(path)
+
+    from wordcloud import WordCloud
+
+    image = WordCloud(**params).generate_from_frequencies(top.to_dict()).to_image()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path)
+    return image
+
+
+def tags_wordcloud(tag_counts: pd.Series, cache_dir: str = DEFAULT_CACHE_DIR):
+    """Word cloud of the topic tags (In[26])."""
+    plt, _ = _pyplot()
+    tags_wc = wordcloud_image(tag_counts, cache_dir=cache_dir)
+    fig = plt.figure(figsize=(6, 6), dpi=100)
+    plt.imshow(tags_wc, interpolation="bilinear")
+    plt.axis("off")
+    plt.tight_layout(pad=0)
+    plt.title(
+        "Most common tags used in Github Repositories",
+        fontdict={"size": 15, "color": TEXT_COLOR, "verticalalignment": "center"},
+    )
+    return fig
+
+
+# Figure name -> (function, key of its input, keyword arguments)
+# In the notebook, sns.set_theme("paper") in In[13] applies to every later figure
+FIGURES = {
+    "average_stars": (
+        topic_average_bar,
+        "pop_mean_df",
+        {"metric": "Star", "xlim": 45000, "xlabel": "No. of Stars", "title": "Average Stars on Each Topic"},
+    ),
+    "average_watchers": (
+        topic_average_bar,
+        "pop_mean_df",
+        {"metric": "Watch", "xlim": 1600, "xlabel": "No. of Watchers", "title": "Average Watchers on Each Topic"},
+    ),
+    "average_forks": (
+        topic_average_bar,
+        "pop_mean_df",
+        {"metric": "Fork", "xlim": 8000, "xlabel": "No. of Forks", "title": "Average Forks on Each Topic"},
+    ),
+    "star_vs_fork": (
+        relationship_regplot,
+        "github_df",
+        {"x": "Star", "y": "Fork", "xlabel": "No. of Stars", "ylabel": "No. of Forks",
+         "title": "Relationship Between Star and Fork"},
+    ),
+    "star_vs_watch": (
+        relationship_regplot,
+        "github_df",
+        {"x": "Star", "y": "Watch", "xlabel": "No. of Stars", "ylabel": "No. of Watchers",
+         "title": "Relationship Between Star and Watch"},
+    ),
+    "watch_vs_fork": (
+        relationship_regplot,
+        "github_df",
+        {"x": "Watch", "y": "Fork", "xlabel": "No. of Watchers", "ylabel": "No. of Forks",
+         "title": "Relationship Between Watch and Fork"},
+    ),
+    "large_repo_users": (large_repo_users_bar, "large_repo_users_count_df", {}),
+    "contribution_corr": (
+        correlation_heatmap,
+        "corr",
+        {"title": "Correlation Between the Contribution Columns", "title_size": 16},
+    ),
+    "popular_corr": (
+        correlation_heatmap,
+        "popular_corr",
+        {"title": "Correlation of Contribution Columns in Top 100 Popular Repositories"},
+    ),
+    "large_repo_users_corr": (
+        correlation_heatmap,
+        "large_repo_users_corr",
+        {"title": "Correlation of Contribution Columns of Users with Large No. of Repositories"},
+    ),
+    "top_tags": (top_tags_bar, "toptags_df", {}),
+    "tags_by_topic": (topic_tags_bar, "topic_wise_tag", {}),
+    "wordcloud": (tags_wordcloud, "tag_counts", {}),
+}
+
+PAPER_THEME_FIGURES = set(list(FIGURES)[list(FIGURES).index("star_vs_fork") :])
+
+
+def draw_figure(name: str, data, cache_dir: str = DEFAULT_CACHE_DIR):
+    """Draw figure ``name`` from ``data`` with the rc settings it has in the notebook.
+
+    Call it inside ``matplotlib.rc_context()`` to keep the settings local.
+    The word cloud image is cached under ``cache_dir``.
+    """
+    import matplotlib
+
+    _, sns = _pyplot()
+    function, _, kwargs = FIGURES[name]
+    if function is tags_wordcloud:
+        kwargs = dict(kwargs, cache_dir=cache_dir)
+    matplotlib.rcdefaults()
+    if name in PAPER_THEME_FIGURES:
+        sns.set_theme("paper")
+    return function(data, **kwargs)
@@ -0,0 +1,334 @@
+"""Related-repository search by ``Topic_Tags`` overlap, with MinHash and LSH.
+
+The report only counts tags (In[22]-In[26]). Two repos are related when their
+tag sets overlap, measured by the Jaccard similarity ``|A & B| / |A | B|``;
+comparing every pair is quadratic in the number of repos.
+
+``MinHash`` maps each tag set to ``num_perm`` minima of random hash functions
+of its tags; two sets agree on a minimum with probability equal to their
+Jaccard similarity. ``RelatedRepos`` cuts the signatures into ``bands`` bands
+of ``num_perm / bands`` rows and buckets the repos by a hash of each band, so
+a query only looks at repos sharing a bucket with it in some band: a pair of
+similarity ``s`` shares one with probability ``1 - (1 - s ** rows) ** bands``
+(about 50% at ``s = (1 / bands) ** (1 / rows)``, 0.125 with the defaults: tag
+sets are short, so even close neighbours often share only a few tags).
+
+That threshold is low enough that repos sharing one common tag collide too,
+so buckets grow with the scrape. A candidate's number of shared buckets (an
+estimate of its similarity: ``bands * s ** rows`` expected) ranks the
+candidates, and only the ``max_candidates`` with the most are compared by
+exact Jaccard similarity, bounding the exact work per query at a small cost
+in recall. ``save`` and ``load`` keep a built index in an ``.npz`` file.
+
+``benchmark`` compares the recall and latency of the index with an exact scan
+on ``Github_data.csv`` or a synthetic scrape.
+
+Usage::
+
+    python -m github_analysis.related Github_data.csv --repo 0
+    python -m github_analysis.related Github_data.csv --benchmark --rows 100000,1000000
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.loading import DEFAULT_CSV, load_github_df
+from github_analysis.synthetic import SyntheticScrape
+from github_analysis.tags import TagTable, parse_topic_tags
+
+DEFAULT_PERMUTATIONS = 128
+DEFAULT_BANDS = 64
+DEFAULT_MAX_CANDIDATES = 500
+# Repos whose signatures are computed at once; bounds the (repos, tags, num_perm) intermediates
+BLOCK_ROWS = 8192
+
+
+def distinct_tags(table: TagTable) -> tuple:
+    """``(tag_ids, offsets)`` of ``table`` with each repo's tags sorted and listed once."""
+    n_tags = max(len(table.vocab), 1)
+    pairs = np.unique(table.row_ids * n_tags + table.tag_ids)
+    rows, tag_ids = np.divmod(pairs, n_tags)
+    offsets = np.zeros(len(table) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(table)), out=offsets[1:])
+    return tag_ids.astype(np.int32), offsets
+
+
+class MinHash:
+    """``num_perm`` multiply-shift hash functions over the 64-bit hashes of tag strings."""
+
+    def __init__(self, num_perm: int = DEFAULT_PERMUTATIONS, seed: int = 0):
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # Odd multipliers, as in sketches.CountMinSketch; the top 32 bits of the product are the hash
+        self.multipliers = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.offsets = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def hash_tags(self, tags) -> np.ndarray:
+        """``(len(tags), num_perm)`` uint32 hash values of the tag strings ``tags``."""
+        hashes = pd.util.hash_array(np.asarray(tags, dtype=object))
+        with np.errstate(over="ignore"):
+            mixed = hashes[:, None] * self.multipliers[None, :] + self.offsets[None, :]
+        return (mixed >> np.uint64(32)).astype(np.uint32)
+
+    def signatures(self, tag_ids: np.ndarray, offsets: np.ndarray, tag_hashes: np.ndarray) -> np.ndarray:
+        """``(repos, num_perm)`` signatures of CSR tag sets; repos without tags get all-ones rows.
+
+        ``tag_hashes`` holds the ``hash_tags`` of the vocabulary ``tag_ids`` refer to.
+        """
+        n = len(offsets) - 1
+        result = np.full((n, self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, n, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, n)
+            bounds = offsets[start : stop + 1]
+            nonempty = np.flatnonzero(np.diff(bounds) > 0)
+            if not len(nonempty):
+                continue
+            values = tag_hashes[tag_ids[bounds[0] : bounds[-1]]]
+            # Minimum over each repo's slice of tag hashes, per permutation
+            result[start + nonempty] = np.minimum.reduceat(values, bounds[nonempty] - bounds[0], axis=0)
+        return result
+
+
+def jaccard(query: np.ndarray, rows: np.ndarray, tag_ids: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Exact Jaccard similarity of the sorted distinct tag ids ``query`` with the tag sets of ``rows``."""
+    starts, lengths = offsets[rows], offsets[rows + 1] - offsets[rows]
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    positions = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+    shared = np.bincount(owner, weights=np.isin(tag_ids[positions], query), minlength=len(rows))
+    union = len(query) + lengths - shared
+    return np.divide(shared, union, out=np.zeros(len(rows)), where=union > 0)
+
+
+def _best(rows: np.ndarray, similarity: np.ndarray, k: int) -> tuple:
+    """The ``k`` most similar ``rows`` with positive similarity, ties by row."""
+    keep = similarity > 0
+    rows, similarity = rows[keep], similarity[keep]
+    order = np.lexsort((rows, -similarity))[:k]
+    return rows[order], similarity[order]
+
+
+class RelatedRepos:
+    """LSH index over the MinHash signatures of the tag sets of a ``TagTable``."""
+
+    def __init__(
+        self,
+        table: TagTable,
+        num_perm: int = DEFAULT_PERMUTATIONS,
+        bands: int = DEFAULT_BANDS,
+        seed: int = 0,
+        max_candidates: int | None = DEFAULT_MAX_CANDIDATES,
+    ):
+        self._configure(table.vocab, num_perm, bands, seed, max_candidates)
+        self.tag_ids, self.offsets = distinct_tags(table)
+        keys = self.band_keys(self.minhash.signatures(self.tag_ids, self.offsets, self.tag_hashes))
+        # Repos without tags have no neighbours and stay out of the buckets
+        indexed = np.flatnonzero(np.diff(self.offsets) > 0)
+        keys = keys[indexed]
+        order = np.argsort(keys, axis=0, kind="stable")
+        self.bucket_rows = indexed[order].T.copy()
+        self.bucket_keys = np.take_along_axis(keys, order, axis=0).T.copy()
+
+    def _configure(self, vocab: np.ndarray, num_perm: int, bands: int, seed: int, max_candidates: int | None) -> None:
+        """Parameters and hash functions, everything but the tag sets and buckets."""
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.seed = seed
+        self.max_candidates = max_candidates
+        self.rows_per_band = num_perm // bands
+        self.minhash = MinHash(num_perm, seed)
+        self.vocab = vocab
+        self.tag_lookup = {tag: i for i, tag in enumerate(vocab)}
+        self.tag_hashes = self.minhash.hash_tags(vocab)
+        rng = np.random.default_rng(seed + 1)
+        multipliers = rng.integers(1, 1 << 63, size=self.rows_per_band, dtype=np.uint64)
+        self.band_multipliers = multipliers * np.uint64(2) + np.uint64(1)
+
+    def save(self, path: str) -> None:
+        """Write the index to the ``.npz`` file ``path``; tags are stored as text, nothing is pickled."""
+        params = [self.minhash.num_perm, self.bands, self.seed, self.max_candidates or 0]
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                params=np.array(params, dtype=np.int64),
+                vocab=np.asarray(self.vocab, dtype=str),
+                tag_ids=self.tag_ids,
+                offsets=self.offsets,
+                bucket_rows=self.bucket_rows,
+                bucket_keys=self.bucket_keys,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "RelatedRepos":
+        """An index written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            num_perm, bands, seed, max_candidates = data["params"].tolist()
+            index = cls.__new__(cls)
+            index._configure(data["vocab"].astype(object), num_perm, bands, seed, max_candidates or None)
+            for name in ("tag_ids", "offsets", "bucket_rows", "bucket_keys"):
+                setattr(index, name, data[name])
+        return index
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """``(repos, bands)`` uint32 bucket keys: a multiply-add hash of each band of the signatures."""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows_per_band).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            mixed = (bands * self.band_multipliers).sum(axis=2, dtype=np.uint64)
+        return (mixed >> np.uint64(32)).astype(np.uint32)
+
+    def _query_tags(self, tags) -> np.ndarray:
+        ids = {self.tag_lookup[tag] for tag in tags if tag in self.tag_lookup}
+        return np.array(sorted(ids), dtype=np.int32)
+
+    def candidates(self, tags) -> np.ndarray:
+        """Sorted rows sharing an LSH bucket with the tag set ``tags``.
+
+        Beyond ``max_candidates`` rows, only those sharing the most buckets
+        (ties by row) are kept.
+        """
+        query = self._query_tags(tags)
+        if not len(query):
+            return np.zeros(0, dtype=np.int64)
+        keys = self.band_keys(self.tag_hashes[query].min(axis=0, keepdims=True))[0]
+        spans = []
+        for band, key in enumerate(keys):
+            start = np.searchsorted(self.bucket_keys[band], key, side="left")
+            stop = np.searchsorted(self.bucket_keys[band], key, side="right")
+            spans.append(self.bucket_rows[band, start:stop])
+        rows, hits = np.unique(np.concatenate(spans), return_counts=True)
+        if self.max_candidates and len(rows) > self.max_candidates:
+            rows = np.sort(rows[np.lexsort((rows, -hits))[: self.max_candidates]])
+        return rows
+
+    def top_k(self, tags, k: int = 10, exclude: int | None = None, exact: bool = False) -> tuple:
+        """``(rows, similarities)`` of the ``k`` repos most similar to the tag set ``tags``.
+
+        Only LSH candidates are compared unless ``exact``, which scans every
+        repo. Repos sharing no tag are never returned; ``exclude`` drops one
+        row, e.g. the queried repo itself. Ties are ordered by row.
+        """
+        query = self._query_tags(tags)
+        rows = np.arange(len(self)) if exact else self.candidates(tags)
+        if exclude is not None:
+            rows = rows[rows != exclude]
+        return _best(rows, jaccard(query, rows, self.tag_ids, self.offsets), k)
+
+    def tags_of(self, row: int) -> list:
+        """Distinct tags of the repo at position ``row``."""
+        return self.vocab[self.tag_ids[self.offsets[row] : self.offsets[row + 1]]].tolist()
+
+    def related(self, row: int, k: int = 10, exact: bool = False) -> tuple:
+        """``(rows, similarities)`` of the ``k`` repos most similar to the repo at position ``row``."""
+        return self.top_k(self.tags_of(row), k=k, exclude=row, exact=exact)
+
+    def lookup(self, github_df: pd.DataFrame, row: int, k: int = 10) -> pd.DataFrame:
+        """Related repos of ``row`` as a ``Repo_Name``/``Topic``/``Jaccard`` frame."""
+        rows, similarity = self.related(row, k=k)
+        return github_df.iloc[rows][["Repo_Name", "Topic"]].assign(Jaccard=similarity.round(3))
+
+
+def _percentiles(seconds: list) -> dict:
+    ms = np.array(seconds) * 1e3
+    return {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99))}
+
+
+def benchmark(table: TagTable, queries: int = 200, k: int = 10, seed: int = 0, **index_options) -> dict:
+    """Recall and latency of ``RelatedRepos`` against an exact Jaccard scan.
+
+    ``queries`` repos with tags are drawn at random. Recall@k is the share of
+    the exact top ``k`` matched by the index, counting any returned repo at
+    least as similar as the exact ``k``-th as a match (ties are arbitrary).
+    """
+    start = time.perf_counter()
+    index = RelatedRepos(table, seed=seed, **index_options)
+    build = time.perf_counter() - start
+    rng = np.random.default_rng(seed)
+    rows = np.flatnonzero(np.diff(index.offsets) > 0)
+    rows = rng.choice(rows, size=min(queries, len(rows)), replace=False)
+
+    recalls, candidates, approximate, exact = [], [], [], []
+    for row in rows.tolist():
+        start = time.perf_counter()
+        _, found = index.related(row, k=k)
+        approximate.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        _, expected = index.related(row, k=k, exact=True)
+        exact.append(time.perf_counter() - start)
+        candidates.append(len(index.candidates(index.tags_of(row))))
+        if len(expected):
+            recalls.append(min(int((found >= expected[-1]).sum()), len(expected)) / len(expected))
+    return {
+        "rows": len(index),
+        "num_perm": index.minhash.num_perm,
+        "bands": index.bands,
+        "max_candidates": index.max_candidates,
+        "k": k,
+        "queries": len(rows),
+        "build_s": build,
+        "recall": statistics.mean(recalls) if recalls else None,
+        "mean_candidates": statistics.mean(candidates) if candidates else 0,
+        "lsh": _percentiles(approximate),
+        "exact": _percentiles(exact),
+    }
+
+
+def synthetic_tags(rows: int, seed: int = 0) -> TagTable:
+    """The ``TagTable`` of a synthetic scrape of ``rows`` repos."""
+    tags = [chunk["topic_tag"] for chunk in SyntheticScrape(rows, seed).chunks()]
+    return parse_topic_tags(pd.concat(tags, ignore_index=True))
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Find repos related by topic tags (MinHash + LSH).")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="scraped CSV (default: %(default)s)")
+    parser.add_argument("--repo", type=int, default=0, help="row position of the repo to find neighbours of")
+    parser.add_argument("-k", type=int, default=10, help="number of related repos (default: %(default)s)")
+    parser.add_argument("--num-perm", type=int, default=DEFAULT_PERMUTATIONS, help="MinHash functions")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS, help="LSH bands (must divide --num-perm)")
+    parser.add_argument(
+        "--max-candidates", type=int, default=DEFAULT_MAX_CANDIDATES, help="repos compared exactly; 0 for all"
+    )
+    parser.add_argument("--benchmark", action="store_true", help="measure recall and latency against exact Jaccard")
+    parser.add_argument("--rows", default="", help="with --benchmark, also comma-separated synthetic sizes")
+    parser.add_argument("--queries", type=int, default=200, help="benchmark queries per dataset")
+    parser.add_argument("--out", default=None, help="write the benchmark results to this JSON file")
+    args = parser.parse_args(argv)
+    options = {"num_perm": args.num_perm, "bands": args.bands, "max_candidates": args.max_candidates}
+
+    github_df, _ = load_github_df(args.csv, columns=["Repo_Name", "Topic", "Topic_Tags"])
+    table = parse_topic_tags(github_df["Topic_Tags"])
+    if not args.benchmark:
+        index = RelatedRepos(table, **options)
+        print(f"{github_df['Repo_Name'].iloc[args.repo]}: {', '.join(index.tags_of(args.repo))}\n")
+        print(index.lookup(github_df, args.repo, k=args.k))
+        return
+
+    datasets = [(args.csv, lambda: table)]
+    for rows in [int(rows) for rows in args.rows.split(",") if rows]:
+        datasets.append((f"synthetic {rows}", lambda rows=rows: synthetic_tags(rows)))
+    results = []
+    for name, load in datasets:
+        result = dict(benchmark(load(), queries=args.queries, k=args.k, **options), dataset=name)
+        results.append(result)
+        print(
+            f"{name:<20} {result['rows']:>9} rows  build {result['build_s']:7.2f}s  recall@{args.k} "
+            f"{result['recall']:.3f}  candidates {result['mean_candidates']:9.1f}  "
+            f"lsh p50/p99 {result['lsh']['p50_ms']:7.2f}/{result['lsh']['p99_ms']:7.2f} ms  "
+            f"exact p50/p99 {result['exact']['p50_ms']:8.2f}/{result['exact']['p99_ms']:8.2f} ms"
+        )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Headless, parallel rendering of the report's figures.
+
+Usage::
+
+    python -m github_analysis.report Github_data.csv --out report --formats png,svg
+
+The figures of ``plots.FIGURES`` are drawn with the Agg backend in worker
+processes (in this one with ``--workers 1``) and saved to ``--out``;
+matplotlib is only imported by the process that draws. A ``manifest.json`` there records a hash of
+each figure's input data and parameters; figures whose hash has not changed
+since the last run, and whose files still exist, are skipped.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from github_analysis import instrumentation
+from github_analysis.cache import DEFAULT_CACHE_DIR, load_cached_github_df
+from github_analysis.dedup import Deduplicator, canonical_rows
+from github_analysis.instrumentation import stage
+from github_analysis.loading import DEFAULT_CSV
+from github_analysis.mapreduce import run_analysis
+from github_analysis.plots import FIGURES, STYLE_VERSION, draw_figure
+from github_analysis.sections import SECTIONS, plan
+
+DEFAULT_OUT_DIR = "report"
+MANIFEST = "manifest.json"
+
+
+def report_inputs(outputs: dict, github_df: pd.DataFrame, dedup: bool = False) -> dict:
+    """``render_report`` inputs: the ``run_analysis`` outputs plus the rows the relationship plots draw.
+
+    With ``dedup`` those rows are one per repo, as ``run_analysis(..., dedup=True)`` counts them.
+    """
+    if dedup:
+        github_df = canonical_rows(Deduplicator().update(github_df))
+    return dict(outputs, github_df=github_df)
+
+
+def figure_input(inputs: dict, name: str):
+    """The data figure ``name`` is drawn from, out of the ``run_analysis`` output."""
+    _, key, kwargs = FIGURES[name]
+    data = inputs[key]
+    if key == "github_df":
+        # The relationship plots only need their two columns
+        data = data[[kwargs["x"], kwargs["y"]]]
+    return data
+
+
+def input_hash(name: str, data) -> str:
+    """Hash of a figure's input data, parameters and the shared style version."""
+    _, key, kwargs = FIGURES[name]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([name, key, kwargs, STYLE_VERSION], sort_keys=True, default=str).encode())
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        labels = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(json.dumps([str(label) for label in labels]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def render_figure(name: str, data, out_dir: str, formats: tuple, cache_dir: str = DEFAULT_CACHE_DIR) -> list:
+    """Draw figure ``name`` from ``data`` with the Agg backend and save it once per format."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    paths = []
+    with stage("render", rows_in=len(data) if hasattr(data, "__len__") else None, figure=name):
+        with matplotlib.rc_context():
+            fig = draw_figure(name, data, cache_dir=cache_dir)
+            for fmt in formats:
+                path = os.path.join(out_dir, f"{name}.{fmt}")
+                fig.savefig(path, format=fmt, bbox_inches="tight")
+                paths.append(path)
+        plt.close(fig)
+    return paths
+
+
+def _load_manifest(out_dir: str) -> dict:
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def render_report(
+    inputs: dict,
+    out_dir: str = DEFAULT_OUT_DIR,
+    formats: tuple = ("png",),
+    workers: int | None = None,
+    figures: list | None = None,
+    force: bool = False,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> dict:
+    """Render ``figures`` (default all) whose inputs changed since the last run.
+
+    ``inputs`` is the ``run_analysis`` output plus the cleaned ``github_df``.
+    With ``workers=1`` the figures are drawn in this process. Returns
+    ``{"rendered": [...], "skipped": [...]}`` with figure names.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    formats = tuple(formats)
+    todo = {}
+    skipped = []
+    for name in figures or FIGURES:
+        data = figure_input(inputs, name)
+        digest = input_hash(name, data)
+        entry = manifest.get(name, {})
+        up_to_date = (
+            entry.get("hash") == digest
+            and tuple(entry.get("formats", ())) == formats
+            and all(os.path.isfile(path) for path in entry.get("files", []))
+        )
+        if up_to_date and not force:
+            skipped.append(name)
+        else:
+            todo[name] = (data, digest)
+
+    if todo and workers == 1:
+        for name, (data, digest) in todo.items():
+            files = render_figure(name, data, out_dir, formats, cache_dir)
+            manifest[name] = {"hash": digest, "formats": list(formats), "files": files}
+    elif todo:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=instrumentation.worker_initializer,
+            initargs=(instrumentation.worker_config(),),
+        )
+        with pool:
+            futures = {
+                name: pool.submit(render_figure, name, data, out_dir, formats, cache_dir)
+                for name, (data, _) in todo.items()
+            }
+            for name, future in futures.items():
+                manifest[name] = {"hash": todo[name][1], "formats": list(formats), "files": future.result()}
+    if todo:
+        with open(os.path.join(out_dir, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return {"rendered": list(todo), "skipped": skipped}
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Render the report's figures without a display.")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="scraped CSV (default: %(default)s)")
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="output directory (default: %(default)s)")
+    parser.add_argument("--formats", default="png", help="comma-separated formats, e.g. png,svg")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="re-render figures even if their inputs are unchanged")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help="comma-separated sections to render")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="read the CSV without using the cache")
+    parser.add_argument("--dedup", action="store_true", help="count repos listed under several topics once")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        selection = plan(args.sections, dedup=args.dedup)
+    except ValueError as error:
+        parser.error(str(error))
+
+    instrumentation.enable_from_args(args)
+    start = time.perf_counter()
+    try:
+        github_df, _, status = load_cached_github_df(
+            args.csv, cache_dir=args.cache_dir, columns=selection.columns, use_cache=not args.no_cache
+        )
+        outputs = run_analysis(github_df, workers=args.workers, sections=selection.sections, dedup=args.dedup)
+        result = render_report(
+            report_inputs(outputs, github_df, dedup=args.dedup),
+            out_dir=args.out,
+            formats=args.formats.split(","),
+            workers=args.workers,
+            figures=selection.figures,
+            force=args.force,
+            cache_dir=args.cache_dir,
+        )
+    finally:
+        instrumentation.disable()
+    elapsed = time.perf_counter() - start
+    print(f"cache {status}; rendered {len(result['rendered'])}, skipped {len(result['skipped'])} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Column layout of the raw scrape and of the cleaned ``github_df``."""
+
+import numpy as np
+import pandas as pd
+
+# Raw column -> cleaned column, in the order In[3] selects them
+RAW_TO_CLEAN = {
+    "topic": "Topic",
+    "name": "Repo_Name",
+    "user": "User_Name",
+    "star": "Star",
+    "fork": "Fork",
+    "watch": "Watch",
+    "issue": "Issues",
+    "pull_requests": "Pull_Requests",
+    "topic_tag": "Topic_Tags",
+    "commits": "Commits",
+    "contributers": "Contributors",
+}
+
+# Raw columns In[3] drops, loaded only when asked for by their cleaned name
+OPTIONAL_COLUMNS = {
+    "url": "Url",
+    "License": "License",
+}
+
+# Numeric columns of the cleaned frame, in frame order
+COUNT_COLUMNS = ["Star", "Fork", "Watch", "Issues", "Pull_Requests", "Commits", "Contributors"]
+
+
+def select_columns(raw_df: pd.DataFrame, columns: list | None = None) -> pd.DataFrame:
+    """Keep the 11 relevant raw columns and give them their cleaned names (In[3]).
+
+    With ``columns`` (cleaned names, optional columns included), keep the raw
+    columns behind those instead.
+    """
+    if columns is None:
+        mapping = RAW_TO_CLEAN
+    else:
+        mapping = {raw: clean for raw, clean in {**RAW_TO_CLEAN, **OPTIONAL_COLUMNS}.items() if clean in columns}
+    present = [col for col in mapping if col in raw_df.columns]
+    return raw_df[present].rename(columns=mapping)
+
+
+# Text columns with few distinct values, stored as categories in the compact schema. User_Name is
+# not one of them: most users own one or two repos, so its categories outweigh the object column.
+CATEGORY_COLUMNS = ["Topic"]
+
+# Nullable integer dtypes from smallest to largest
+_INTEGER_DTYPES = [("Int8", np.int8), ("Int16", np.int16), ("Int32", np.int32), ("Int64", np.int64)]
+
+
+def smallest_dtype(series: pd.Series) -> str:
+    """Smallest nullable integer dtype holding ``series`` exactly, else ``"float64"``."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    if len(values) and not np.array_equal(values, np.round(values)):
+        return "float64"
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for name, dtype in _INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return name
+    return "float64"
+
+
+def compact_github_df(github_df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of a cleaned ``github_df`` with a compact memory layout.
+
+    ``Topic`` becomes a category and every count column the smallest nullable
+    integer dtype that holds it (``float64`` if a column has fractional
+    values). Missing counts become ``pd.NA``. The layout is library-only: the
+    cache and the command-line tools keep the float64 frame the figures are
+    drawn from, and ``run_analysis`` gives the same results on either.
+    """
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS if col in github_df.columns}
+    for col in COUNT_COLUMNS:
+        if col in github_df.columns:
+            dtypes[col] = smallest_dtype(github_df[col])
+    return github_df.astype(dtypes)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Bytes per column (including strings) before and after a layout change."""
+    report = pd.DataFrame(
+        {
+            "dtype_before": before.dtypes.astype(str),
+            "dtype_after": after.dtypes.astype(str),
+            "bytes_before": before.memory_usage(index=False, deep=True),
+            "bytes_after": after.memory_usage(index=False, deep=True),
+        }
+    )
+    report.loc["Total"] = ["", "", report["bytes_before"].sum(), report["bytes_after"].sum()]
+    report["ratio"] = report["bytes_before"] / report["bytes_after"]
+    return report
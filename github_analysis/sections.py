@@ -0,0 +1,86 @@
+"""The four sections of the report and what each of them needs.
+
+A run of the notebook computes every section. ``plan`` turns a selection of
+sections into the cleaned columns to load, the ``run_analysis`` outputs to
+compute and the figures to draw, so that e.g. the tag analysis alone never
+parses or cleans the popularity and contribution counts. A deduplicated plan
+also loads the ``Url`` (and ``Topic``) columns ``dedup.Deduplicator`` keys on.
+"""
+
+from dataclasses import dataclass
+
+from github_analysis.correlation import CONTRIBUTION_COLUMNS
+from github_analysis.schema import COUNT_COLUMNS, OPTIONAL_COLUMNS, RAW_TO_CLEAN
+
+SECTIONS = {
+    # 1. Analysis of Top Repositories Based on Popularity (In[6]-In[15])
+    "popularity": {
+        # pop_mean_df (In[6]) averages every count column, not only the three plotted
+        "columns": ["Repo_Name", "Topic", *COUNT_COLUMNS],
+        "outputs": ["pop_mean_df", "top_star_df", "top_watch_df", "top_fork_df"],
+        "figures": [
+            "average_stars", "average_watchers", "average_forks", "star_vs_fork", "star_vs_watch", "watch_vs_fork",
+        ],
+    },
+    # 2. Analysis of Users with Large Number of Repositories (In[16])
+    "users": {
+        "columns": ["User_Name"],
+        "outputs": ["large_repo_users", "large_repo_users_count_df"],
+        "figures": ["large_repo_users"],
+    },
+    # 3. Understanding Contribution Activities across the Repositories (In[17]-In[20])
+    "contributions": {
+        "columns": ["User_Name", "Star", *CONTRIBUTION_COLUMNS],
+        "outputs": ["corr", "popular_corr", "large_repo_users_corr"],
+        "figures": ["contribution_corr", "popular_corr", "large_repo_users_corr"],
+    },
+    # 4. Analysis of Topic Tags (In[21]-In[26])
+    "tags": {
+        "columns": ["Topic", "Topic_Tags"],
+        "outputs": ["tag_counts", "toptags_df", "topic_wise_tag"],
+        "figures": ["top_tags", "tags_by_topic", "wordcloud"],
+    },
+}
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Columns, outputs and figures of a selection of sections."""
+
+    sections: tuple
+    columns: list
+    outputs: list
+    figures: list
+    dedup: bool = False
+
+    @property
+    def count_columns(self) -> list:
+        """The count columns the plan loads, in ``COUNT_COLUMNS`` order."""
+        return [col for col in COUNT_COLUMNS if col in self.columns]
+
+
+def plan(sections=None, dedup: bool = False) -> Plan:
+    """The plan of ``sections`` (names or a comma-separated string, default all).
+
+    Columns keep the order of the cleaned ``github_df``; sections keep the
+    order of the report. With ``dedup`` every repo is counted once, see
+    ``mapreduce.map_shard``.
+    """
+    if sections is None:
+        sections = list(SECTIONS)
+    elif isinstance(sections, str):
+        sections = [name.strip() for name in sections.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in SECTIONS]
+    if unknown or not sections:
+        raise ValueError(f"Unknown or empty sections {unknown}; choose from {list(SECTIONS)}")
+    sections = tuple(name for name in SECTIONS if name in sections)
+    needed = {col for name in sections for col in SECTIONS[name]["columns"]}
+    if dedup:
+        needed |= {"Topic", "Url"}
+    return Plan(
+        sections=sections,
+        columns=[col for col in [*RAW_TO_CLEAN.values(), *OPTIONAL_COLUMNS.values()] if col in needed],
+        outputs=[out for name in sections for out in SECTIONS[name]["outputs"]],
+        figures=[fig for name in sections for fig in SECTIONS[name]["figures"]],
+        dedup=dedup,
+    )
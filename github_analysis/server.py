@@ -0,0 +1,276 @@
+"""Local HTTP server answering the report's questions from warm aggregates.
+
+Usage::
+
+    python -m github_analysis.server Github_data.csv --port 8000
+    curl localhost:8000/outputs/top_star_df
+    curl "localhost:8000/outputs/tag_counts?limit=20"
+    curl localhost:8000/sections/tags
+
+The cleaned frame and the ``run_analysis`` outputs of sections 1-4 are built
+once at start-up (through the on-disk cache, with ``--workers`` processes) and
+kept in memory. Rendered
+responses go through an LRU cache keyed on the data snapshot, the path and
+the query. A background thread polls the CSV's size and modification time;
+when they change, the analysis is rebuilt off the request path and swapped in
+atomically, which also retires every cached response. Reloads run in this
+process: forking a worker pool from a process already running request
+threads can deadlock the children. Requests keep being served from the
+previous data while a reload runs, or if it fails.
+
+``github_analysis.loadtest`` measures latency percentiles and throughput of a
+running server.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from github_analysis import instrumentation
+from github_analysis.cache import DEFAULT_CACHE_DIR, load_cached_github_df
+from github_analysis.instrumentation import stage
+from github_analysis.loading import DEFAULT_CSV
+from github_analysis.mapreduce import run_analysis
+from github_analysis.sections import SECTIONS, plan
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_POLL_SECONDS = 1.0
+
+
+def to_json_value(value, limit: int | None = None):
+    """A ``run_analysis`` output as plain JSON data, keeping its first ``limit`` entries.
+
+    Frames indexed by row (leaderboards, per-topic tables) become lists of
+    records, labelled frames (correlation matrices) nested objects, Series
+    objects keyed by their index.
+    """
+    if isinstance(value, pd.DataFrame):
+        if pd.api.types.is_integer_dtype(value.index):
+            return json.loads(value.head(limit).to_json(orient="records"))
+        return json.loads(value.head(limit).to_json(orient="index"))
+    if isinstance(value, pd.Series):
+        return json.loads(value.head(limit).to_json(orient="index"))
+    return list(value)[:limit]
+
+
+@dataclass(frozen=True, eq=False)
+class Snapshot:
+    """The outputs served for one version of the CSV (hashed by identity, as a cache key)."""
+
+    generation: int
+    outputs: dict
+    rows: int
+    signature: tuple
+    loaded_at: float = field(default_factory=time.time)
+
+
+def file_signature(path: str) -> tuple:
+    """Size and modification time of ``path``; a change triggers a reload."""
+    info = os.stat(path)
+    return info.st_size, info.st_mtime_ns
+
+
+class AnalysisService:
+    """The analysis of one CSV, rebuilt when the file changes, with an LRU cache of rendered responses."""
+
+    def __init__(
+        self,
+        csv: str = DEFAULT_CSV,
+        sections=None,
+        dedup: bool = False,
+        workers: int | None = None,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        use_cache: bool = True,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.csv = csv
+        self.selection = plan(sections, dedup=dedup)
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.reloads = 0
+        self.last_error = None
+        self._reload_lock = threading.Lock()
+        self.render = functools.lru_cache(maxsize=cache_size)(self._render)
+        self.snapshot = self._build(0, workers)
+
+    def _build(self, generation: int, workers: int | None = 1) -> Snapshot:
+        signature = file_signature(self.csv)
+        with stage("reload") as reload:
+            github_df, _, _ = load_cached_github_df(
+                self.csv, cache_dir=self.cache_dir, columns=self.selection.columns, use_cache=self.use_cache
+            )
+            outputs = run_analysis(
+                github_df, workers=workers, sections=self.selection.sections, dedup=self.selection.dedup
+            )
+            reload.rows_out = len(github_df)
+        return Snapshot(generation=generation, outputs=outputs, rows=len(github_df), signature=signature)
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild the analysis if the CSV changed since the last build; True if a new one was swapped in."""
+        with self._reload_lock:
+            try:
+                if file_signature(self.csv) == self.snapshot.signature:
+                    return False
+                snapshot = self._build(self.snapshot.generation + 1)
+            except Exception as error:  # keep serving the previous data, e.g. while the CSV is rewritten
+                self.last_error = f"{type(error).__name__}: {error}"
+                return False
+            # One assignment swaps the data; responses of older generations are never looked up again
+            self.snapshot = snapshot
+            self.render.cache_clear()
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    def watch(self, interval: float = DEFAULT_POLL_SECONDS, stop: threading.Event | None = None) -> threading.Thread:
+        """Poll the CSV every ``interval`` seconds in a daemon thread until ``stop`` is set."""
+        stop = stop or threading.Event()
+
+        def poll():
+            while not stop.wait(interval):
+                self.reload_if_changed()
+
+        thread = threading.Thread(target=poll, name="csv-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def index(self) -> dict:
+        return {
+            "outputs": list(self.snapshot.outputs),
+            "sections": {name: SECTIONS[name]["outputs"] for name in self.selection.sections},
+            "endpoints": ["/health", "/outputs/<name>[?limit=n]", "/sections/<name>[?limit=n]"],
+        }
+
+    def health(self) -> dict:
+        snapshot = self.snapshot
+        info = self.render.cache_info()
+        return {
+            "csv": os.path.abspath(self.csv),
+            "rows": snapshot.rows,
+            "generation": snapshot.generation,
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+            "dedup": self.selection.dedup,
+            "cache": {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize},
+        }
+
+    def _resource(self, snapshot: Snapshot, path: str, query: str) -> tuple:
+        outputs = snapshot.outputs
+        parts = [part for part in path.split("/") if part]
+        try:
+            limit = parse_qs(query).get("limit", [None])[-1]
+            limit = None if limit is None else int(limit)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "limit must be an integer"}
+        if not parts:
+            return HTTPStatus.OK, self.index()
+        if len(parts) == 2 and parts[0] == "outputs" and parts[1] in outputs:
+            return HTTPStatus.OK, to_json_value(outputs[parts[1]], limit)
+        if len(parts) == 2 and parts[0] == "sections" and parts[1] in self.selection.sections:
+            return HTTPStatus.OK, {name: to_json_value(outputs[name], limit) for name in SECTIONS[parts[1]]["outputs"]}
+        return HTTPStatus.NOT_FOUND, {"error": f"no such resource: {path}"}
+
+    def _render(self, snapshot: Snapshot, path: str, query: str) -> tuple:
+        """``(status, JSON bytes)`` of a GET of ``path?query`` against ``snapshot``."""
+        status, body = self._resource(snapshot, path, query)
+        return status, json.dumps(body).encode()
+
+    def respond(self, target: str) -> tuple:
+        """``(status, JSON bytes)`` for the request target ``target``."""
+        url = urlsplit(target)
+        if url.path.rstrip("/") == "/health":
+            return HTTPStatus.OK, json.dumps(self.health()).encode()
+        return self.render(self.snapshot, url.path, url.query)
+
+
+def make_handler(service: AnalysisService, quiet: bool = True):
+    """A request handler class serving ``service`` over HTTP/1.1 keep-alive connections."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle on, delayed ACKs add ~40 ms to every response
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            status, body = service.respond(self.path)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the report's sections as JSON from warm aggregates.")
+    parser.add_argument("csv", nargs="?", default=DEFAULT_CSV, help="scraped CSV (default: %(default)s)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port (default: %(default)s)")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help="comma-separated sections to serve")
+    parser.add_argument("--dedup", action="store_true", help="count repos listed under several topics once")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="start-up analysis processes (default: all cores; reloads use 1)"
+    )
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="read the CSV without using the cache")
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="rendered responses kept (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--poll", type=float, default=DEFAULT_POLL_SECONDS, help="seconds between CSV change checks; 0 disables reload"
+    )
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        plan(args.sections)
+    except ValueError as error:
+        parser.error(str(error))
+
+    instrumentation.enable_from_args(args)
+    try:
+        start = time.perf_counter()
+        service = AnalysisService(
+            args.csv,
+            sections=args.sections,
+            dedup=args.dedup,
+            workers=args.workers,
+            cache_dir=args.cache_dir,
+            use_cache=not args.no_cache,
+            cache_size=args.cache_size,
+        )
+        if args.poll > 0:
+            service.watch(args.poll)
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(service, quiet=not args.verbose))
+        host, port = server.server_address[:2]
+        elapsed = time.perf_counter() - start
+        rows = service.snapshot.rows
+        print(f"serving {rows} rows on http://{host}:{port}/ (ready in {elapsed:.2f}s)", file=sys.stderr)
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        instrumentation.disable()
+
+
+if __name__ == "__main__":
+    main()
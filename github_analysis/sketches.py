@@ -0,0 +1,190 @@
+"""Approximate heavy-hitter counting for users and tags (In[16] and In[22]).
+
+In[16] counts repos per user with ``groupby("User_Name").size()`` and In[22]
+counts tags with a ``Counter``; both need one counter per distinct user or
+tag. The sketches below bound that memory:
+
+``SpaceSaving``
+    Keeps at most ``capacity`` counters. Every reported count over-estimates
+    the true count by at most its ``error``, and ``error <= total / capacity``;
+    any item not in the summary occurs at most ``absent_bound`` times.
+``CountMinSketch``
+    A ``depth x width`` table answering point queries. An estimate never
+    under-estimates and, with probability ``1 - exp(-depth)``, over-estimates
+    by at most ``e / width * total``.
+
+Both take whole chunks at a time (pre-counted with ``value_counts``) and
+sketches built on different shards combine exactly with ``merge``.
+
+``top_users`` and ``top_tags`` compute the tables of In[16] and In[22] from
+chunks, exactly or, with ``approximate=True``, from a ``SpaceSaving``
+summary. The approximate mode is library-only: ``run_analysis`` and the
+command-line tools always build the exact tables, since the correlation of
+the largest users' repos and the tag figures are drawn from them.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _chunk_counts(values: pd.Series) -> pd.Series:
+    return values.dropna().value_counts(sort=False).astype(np.int64)
+
+
+class SpaceSaving:
+    """Top-``capacity`` summary of item counts with per-item error bounds."""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.absent_bound = 0
+        self.total = 0
+
+    def _combine(self, counts: pd.Series, errors: pd.Series, absent_bound: int, total: int) -> None:
+        items = self.counts.index.union(counts.index, sort=False)
+        new_counts = self.counts.reindex(items, fill_value=self.absent_bound) + counts.reindex(
+            items, fill_value=absent_bound
+        )
+        new_errors = self.errors.reindex(items, fill_value=self.absent_bound) + errors.reindex(
+            items, fill_value=absent_bound
+        )
+        self.total += total
+        self.absent_bound += absent_bound
+        if len(items) > self.capacity:
+            order = np.argsort(-new_counts.to_numpy(), kind="stable")
+            dropped = order[self.capacity :]
+            self.absent_bound = max(self.absent_bound, int(new_counts.iloc[dropped].max()))
+            order = order[: self.capacity]
+            new_counts, new_errors = new_counts.iloc[order], new_errors.iloc[order]
+        self.counts, self.errors = new_counts, new_errors
+
+    def update(self, values: pd.Series) -> "SpaceSaving":
+        """Count the non-null items of ``values``."""
+        counts = _chunk_counts(values)
+        self._combine(counts, pd.Series(0, index=counts.index, dtype=np.int64), 0, int(counts.sum()))
+        return self
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Fold in a summary built on another shard."""
+        self._combine(other.counts, other.errors, other.absent_bound, other.total)
+        return self
+
+    def top(self, n: int = 10) -> pd.DataFrame:
+        """The ``n`` items with the largest estimated counts.
+
+        ``Count`` is an upper bound and ``Count - Error`` a lower bound of the
+        true count.
+        """
+        order = np.argsort(-self.counts.to_numpy(), kind="stable")[:n]
+        return pd.DataFrame(
+            {
+                "Item": self.counts.index[order],
+                "Count": self.counts.to_numpy()[order],
+                "Error": self.errors.to_numpy()[order],
+            }
+        )
+
+
+class CountMinSketch:
+    """Count-Min sketch over hashed items; merge requires equal shape and seed."""
+
+    def __init__(self, width: int = 1 << 16, depth: int = 4, seed: int = 0):
+        self.width = 1 << max(int(width - 1).bit_length(), 1)
+        self.depth = depth
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for multiply-shift hashing of the 64-bit item hashes
+        self.multipliers = rng.integers(1, 1 << 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, seed: int = 0) -> "CountMinSketch":
+        """Sketch over-estimating by at most ``epsilon * total`` with probability ``1 - delta``."""
+        return cls(width=math.ceil(math.e / epsilon), depth=math.ceil(math.log(1 / delta)), seed=seed)
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    def _buckets(self, items: pd.Index) -> np.ndarray:
+        hashes = pd.util.hash_array(np.asarray(items, dtype=object))
+        shift = np.uint64(64 - (self.width.bit_length() - 1))
+        with np.errstate(over="ignore"):
+            return ((hashes[None, :] * self.multipliers[:, None]) >> shift).astype(np.int64)
+
+    def update(self, values: pd.Series) -> "CountMinSketch":
+        """Count the non-null items of ``values``."""
+        counts = _chunk_counts(values)
+        buckets = self._buckets(counts.index)
+        weights = counts.to_numpy(dtype=np.float64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(buckets[row], weights=weights, minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+        return self
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Fold in a sketch built on another shard with the same parameters."""
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Cannot merge Count-Min sketches with different width, depth or seed")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def estimate(self, items) -> np.ndarray:
+        """Estimated counts of ``items`` (never below the true counts)."""
+        buckets = self._buckets(pd.Index(items))
+        return self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
+
+    @property
+    def error_bound(self) -> float:
+        """Over-estimation bound holding with probability ``1 - delta``."""
+        return self.epsilon * self.total
+
+
+def _exact_top(chunks, n: int, sort_items: bool) -> pd.Series:
+    total = pd.Series(dtype=np.int64)
+    for values in chunks:
+        total = pd.concat([total, _chunk_counts(values)]).groupby(level=0, sort=False).sum()
+    if sort_items:
+        total = total.sort_index()
+    # Stable sort, so ties keep their order like nlargest(keep="first")
+    return total.iloc[np.argsort(-total.to_numpy(), kind="stable")[:n]]
+
+
+def _approximate_top(chunks, n: int, capacity: int) -> pd.DataFrame:
+    summary = SpaceSaving(capacity)
+    for values in chunks:
+        summary.update(values)
+    return summary.top(n)
+
+
+def top_users(chunks, n: int = 10, approximate: bool = False, capacity: int = 1000) -> pd.DataFrame:
+    """Users with the most repos over an iterable of cleaned chunks (In[16]).
+
+    The exact mode matches ``groupby("User_Name").size().nlargest(n)``; the
+    approximate mode keeps ``capacity`` counters and adds an ``Error`` column.
+    """
+    user_chunks = (chunk["User_Name"] for chunk in chunks)
+    if approximate:
+        return _approximate_top(user_chunks, n, capacity).rename(columns={"Item": "User_Name"})
+    return _exact_top(user_chunks, n, sort_items=True).rename_axis("User_Name").reset_index(name="Count")
+
+
+def top_tags(tag_chunks, n: int = 15, approximate: bool = False, capacity: int = 1000) -> pd.DataFrame:
+    """Most used tags over an iterable of ``TagTable`` chunks (In[22]).
+
+    The exact mode matches ``Counter(all_tags).most_common(n)``; the
+    approximate mode keeps ``capacity`` counters and adds an ``Error`` column.
+    """
+    tag_values = (pd.Series(table.vocab[table.tag_ids], dtype=object) for table in tag_chunks)
+    if approximate:
+        return _approximate_top(tag_values, n, capacity).rename(columns={"Item": "Name of the Tag"})
+    return _exact_top(tag_values, n, sort_items=False).rename_axis("Name of the Tag").reset_index(name="Count")
@@ -0,0 +1,430 @@
+"""Append-only store of successive scrapes, with growth between them.
+
+The notebook analyses a single scrape. ``SnapshotStore`` keeps every scrape
+of the same schema that is ingested, keyed by repo url and scrape time, so
+the change of Star, Fork, Watch and Commits can be followed per repo, per
+topic and per tag.
+
+A store is a directory that is only ever appended to:
+
+* ``urls.txt`` holds one url per line; its line number is the repo id. It
+  is only read to show urls, never to ingest.
+* ``index-<n>-hashes.npy`` and ``index-<n>-ids.npy`` are runs of the url
+  index: 64-bit hashes of the normalized urls in ascending order and their
+  repo ids. Each ingest writes the run of its new urls; runs of similar
+  size are merged, as in a log-structured merge tree, so there are about
+  ``log2`` of the number of repos of them. ``index.json`` lists the current
+  runs and how much of ``urls.txt`` they cover; it is written last, so an
+  ingest that fails before leaves urls that the next one cuts off.
+* ``snapshot-<n>.npz`` holds one scrape: repo ids in ascending order plus the
+  metric, name, topic and tag columns in the same order.
+* ``snapshots.jsonl`` lists the snapshots with their timestamps.
+
+Ingesting a scrape hashes its urls and looks them up by binary search in the
+memory-mapped runs, so it reads only the pages of the index it probes and
+costs time about proportional to that scrape, whatever the size of the
+history (plus the occasional merge of runs). Urls are normalized as in
+``dedup`` (case, scheme, ``www.``, trailing ``/`` and ``.git``), so a repo
+keeps its id when its url is written differently in a later scrape. Repos
+are told apart by that hash alone: two distinct urls collide with
+probability about ``repos ** 2 / 2 ** 65``, 3e-8 for a million repos. Two
+snapshots are joined on their sorted repo ids, never by merging frames on
+url. A url listed twice in one scrape (a repo scraped under several topics)
+keeps its first row.
+
+Usage::
+
+    python -m github_analysis.snapshots store/ ingest Github_data.csv --timestamp 2024-05-01
+    python -m github_analysis.snapshots store/ growth --by Star -n 10
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.aggregates import RunningAggregates
+from github_analysis.dedup import url_hashes
+from github_analysis.loading import DEFAULT_CHUNKSIZE, load_github_df
+from github_analysis.tags import parse_topic_tags
+
+GROWTH_METRICS = ["Star", "Fork", "Watch", "Commits"]
+TEXT_COLUMNS = ["Repo_Name", "User_Name", "Topic", "Topic_Tags"]
+# Cleaned columns a snapshot is built from
+SNAPSHOT_COLUMNS = ["Url", *TEXT_COLUMNS, *GROWTH_METRICS]
+
+URLS_FILE = "urls.txt"
+MANIFEST = "snapshots.jsonl"
+INDEX_FILE = "index.json"
+# Version of the index layout and url hashing; an index of another version is rebuilt from urls.txt
+INDEX_VERSION = 2
+
+_SECONDS_PER_DAY = 86_400
+_LOADED_SNAPSHOTS = 4
+
+
+def _timestamp(value) -> datetime:
+    """``value`` (datetime, ISO string or ``None`` for now) as an aware UTC datetime."""
+    if value is None:
+        return datetime.now(timezone.utc)
+    stamp = pd.Timestamp(value)
+    stamp = stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+    return stamp.to_pydatetime()
+
+
+def _save(path: str, array: np.ndarray) -> None:
+    """``np.save`` to ``path`` through a temporary file, so readers never see a partial array."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+class UrlIndex:
+    """Persistent url-hash -> repo id index of a store: sorted, memory-mapped runs merged by size.
+
+    ``index.json`` is replaced last by every ``add`` and records the runs, the
+    number of repos and the length of ``urls.txt`` they cover. Urls appended by
+    an ``add`` that failed before that are cut off by the next one, so line
+    ``i`` of ``urls.txt`` is always the url of repo id ``i``.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.runs = []  # {"name", "size"} of each run, oldest first
+        self.size = 0
+        self.urls_bytes = 0  # length of the committed part of urls.txt
+        self._mapped = {}
+        index_path = os.path.join(root, INDEX_FILE)
+        stale = []
+        if os.path.isfile(index_path):
+            with open(index_path) as f:
+                state = json.load(f)
+            if state.get("version") == INDEX_VERSION:
+                self.runs, self.size, self.urls_bytes = state["runs"], state["size"], state["urls_bytes"]
+            else:
+                stale = state["runs"]
+        if not self.runs and os.path.isfile(os.path.join(root, URLS_FILE)):
+            # A store written before the index, or by an older version of it
+            self._rebuild(stale)
+
+    def read_urls(self) -> list:
+        """Url of each repo id."""
+        if not self.urls_bytes:
+            return []
+        with open(os.path.join(self.root, URLS_FILE), "rb") as f:
+            return f.read(self.urls_bytes).decode("utf-8").splitlines()
+
+    def _rebuild(self, stale: list) -> None:
+        with open(os.path.join(self.root, URLS_FILE), "rb") as f:
+            data = f.read()
+        # A partial last line was never committed
+        data = data[: data.rfind(b"\n") + 1]
+        urls = data.decode("utf-8").splitlines()
+        name = "index-rebuilt"
+        runs = []
+        if urls:
+            self._write_run(name, url_hashes(pd.Series(urls, dtype=object)), np.arange(len(urls), dtype=np.int64))
+            runs = [{"name": name, "size": len(urls)}]
+        self._commit(runs, len(urls), len(data))
+        self._remove([run["name"] for run in stale if run["name"] != name])
+
+    def _arrays(self, name: str) -> tuple:
+        if name not in self._mapped:
+            path = os.path.join(self.root, name)
+            hashes = np.load(f"{path}-hashes.npy", mmap_mode="r")
+            self._mapped[name] = hashes, np.load(f"{path}-ids.npy", mmap_mode="r")
+        return self._mapped[name]
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """Repo ids of the url ``hashes``, -1 for unknown ones."""
+        # Probing in hash order walks each run front to back instead of at random
+        order = np.argsort(hashes)
+        hashes = hashes[order]
+        ids = np.full(len(hashes), -1, dtype=np.int64)
+        for run in self.runs:
+            run_hashes, run_ids = self._arrays(run["name"])
+            positions = np.minimum(np.searchsorted(run_hashes, hashes), len(run_hashes) - 1)
+            found = run_hashes[positions] == hashes
+            ids[found] = run_ids[positions[found]]
+        result = np.empty_like(ids)
+        result[order] = ids
+        return result
+
+    def _write_run(self, name: str, hashes: np.ndarray, ids: np.ndarray) -> None:
+        order = np.argsort(hashes, kind="stable")
+        path = os.path.join(self.root, name)
+        self._mapped.pop(name, None)
+        _save(f"{path}-hashes.npy", hashes[order])
+        _save(f"{path}-ids.npy", ids[order])
+
+    def _commit(self, runs: list, size: int, urls_bytes: int) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": INDEX_VERSION, "runs": runs, "size": size, "urls_bytes": urls_bytes}, f)
+        os.replace(tmp_path, os.path.join(self.root, INDEX_FILE))
+        self.runs, self.size, self.urls_bytes = runs, size, urls_bytes
+
+    def _remove(self, names: list) -> None:
+        for name in names:
+            self._mapped.pop(name, None)
+            for suffix in ("-hashes.npy", "-ids.npy"):
+                path = os.path.join(self.root, name + suffix)
+                if os.path.isfile(path):
+                    os.remove(path)
+
+    def add(self, hashes: np.ndarray, urls: list) -> None:
+        """Give the new, distinct url ``hashes`` the next repo ids, in order; ``urls`` are their urls."""
+        data = "".join(url + "\n" for url in urls).encode("utf-8")
+        with open(os.path.join(self.root, URLS_FILE), "ab") as f:
+            f.truncate(self.urls_bytes)
+            f.write(data)
+        # Runs are named by their first repo id, which no committed run shares
+        name = f"index-{self.size:012d}"
+        self._write_run(name, hashes, np.arange(self.size, self.size + len(hashes), dtype=np.int64))
+        runs = [*self.runs, {"name": name, "size": len(hashes)}]
+        retired = []
+        # Merge the newest run into the previous one while it is at least half its size
+        while len(runs) > 1 and 2 * runs[-1]["size"] >= runs[-2]["size"]:
+            older, newer = runs[-2:]
+            merged = {"name": f"{name}-{len(retired) // 2}", "size": older["size"] + newer["size"]}
+            arrays = zip(self._arrays(older["name"]), self._arrays(newer["name"]))
+            self._write_run(merged["name"], *(np.concatenate(pair) for pair in arrays))
+            retired += [older["name"], newer["name"]]
+            runs[-2:] = [merged]
+        self._commit(runs, self.size + len(hashes), self.urls_bytes + len(data))
+        self._remove(retired)
+
+
+class SnapshotStore:
+    """Scrapes of the same schema over time, keyed by repo url."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.index = UrlIndex(root)
+        self._urls = None
+        self.manifest = []
+        manifest_path = os.path.join(root, MANIFEST)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = [json.loads(line) for line in f if line.strip()]
+        self._loaded = {}  # position -> arrays, for the last few snapshots read
+
+    def __len__(self) -> int:
+        return len(self.manifest)
+
+    @property
+    def urls(self) -> list:
+        """Url of each repo id, read from ``urls.txt`` on first use."""
+        if self._urls is None:
+            self._urls = self.index.read_urls()
+        return self._urls
+
+    def snapshots(self) -> pd.DataFrame:
+        """One row per snapshot: timestamp, source, rows and repos seen for the first time."""
+        frame = pd.DataFrame(self.manifest, columns=["timestamp", "source", "rows", "new_repos", "file"])
+        return frame.assign(timestamp=pd.to_datetime(frame["timestamp"], utc=True)).drop(columns="file")
+
+    def ingest(self, github_df: pd.DataFrame, timestamp=None, source: str = "") -> int:
+        """Append a cleaned scrape with the ``SNAPSHOT_COLUMNS``; returns its position.
+
+        Timestamps must increase from one snapshot to the next.
+        """
+        stamp = _timestamp(timestamp)
+        if self.manifest and stamp <= _timestamp(self.manifest[-1]["timestamp"]):
+            raise ValueError(f"Snapshot at {stamp.isoformat()} is not newer than the last one")
+        missing = [col for col in SNAPSHOT_COLUMNS if col not in github_df.columns]
+        if missing:
+            raise ValueError(f"github_df lacks the snapshot columns {missing}")
+
+        frame = github_df[SNAPSHOT_COLUMNS]
+        frame = frame[frame["Url"].notna()]
+        urls = frame["Url"].to_numpy(dtype=object)
+        hashes = url_hashes(frame["Url"])
+        first = ~pd.Series(hashes).duplicated().to_numpy()
+        frame, urls, hashes = frame[first], urls[first], hashes[first]
+        ids = self.index.lookup(hashes)
+        # Unseen urls get the next ids, in row order
+        new = ids < 0
+        ids[new] = np.arange(self.index.size, self.index.size + int(new.sum()))
+        new_urls = urls[new].tolist()
+        order = np.argsort(ids)
+
+        position = len(self.manifest)
+        if new_urls:
+            self.index.add(hashes[new], new_urls)
+            if self._urls is not None:
+                self._urls.extend(new_urls)
+        name = f"snapshot-{position:06d}.npz"
+        arrays = {"repo_id": ids[order]}
+        for col in GROWTH_METRICS:
+            arrays[col] = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        for col in TEXT_COLUMNS:
+            arrays[col] = frame[col].to_numpy(dtype=object)[order]
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, os.path.join(self.root, name))
+
+        entry = {
+            "timestamp": stamp.isoformat(),
+            "source": source,
+            "rows": len(frame),
+            "new_repos": len(new_urls),
+            "file": name,
+        }
+        with open(os.path.join(self.root, MANIFEST), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.manifest.append(entry)
+        return position
+
+    def ingest_csv(self, path: str, timestamp=None, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+        """Read, clean and ingest a scraped CSV; the timestamp defaults to now."""
+        github_df, _ = load_github_df(path, chunksize=chunksize, columns=SNAPSHOT_COLUMNS)
+        return self.ingest(github_df, timestamp=timestamp, source=os.path.abspath(path))
+
+    def _arrays(self, position: int) -> dict:
+        position = range(len(self.manifest))[position]
+        if position not in self._loaded:
+            if len(self._loaded) >= _LOADED_SNAPSHOTS:
+                del self._loaded[next(iter(self._loaded))]
+            with np.load(os.path.join(self.root, self.manifest[position]["file"]), allow_pickle=True) as data:
+                self._loaded[position] = {key: data[key] for key in data.files}
+        return self._loaded[position]
+
+    def snapshot(self, position: int = -1) -> pd.DataFrame:
+        """The snapshot at ``position`` (negative counts from the latest), indexed by repo id."""
+        arrays = dict(self._arrays(position))
+        ids = arrays.pop("repo_id")
+        frame = pd.DataFrame(arrays, index=pd.Index(ids, name="repo_id"))[[*TEXT_COLUMNS, *GROWTH_METRICS]]
+        frame.insert(0, "Url", [self.urls[repo_id] for repo_id in ids.tolist()])
+        return frame
+
+    def deltas(self, start: int = -2, end: int = -1) -> pd.DataFrame:
+        """Per-repo change of the ``GROWTH_METRICS`` from snapshot ``start`` to ``end``.
+
+        Only repos present in both snapshots are listed, indexed by repo id,
+        with names and topic from ``end``, the ``end`` values, the changes
+        (``Star_Delta``, ...) and the days between the two scrapes.
+        """
+        if len(self.manifest) < 2:
+            raise ValueError("Growth needs at least two snapshots")
+        before, after = self._arrays(start), self._arrays(end)
+        # Both id arrays are sorted, so a binary search joins them
+        where = np.searchsorted(before["repo_id"], after["repo_id"])
+        matched = where < len(before["repo_id"])
+        matched[matched] = before["repo_id"][where[matched]] == after["repo_id"][matched]
+        rows_after, rows_before = np.flatnonzero(matched), where[matched]
+
+        days = (self._time(end) - self._time(start)).total_seconds() / _SECONDS_PER_DAY
+        ids = after["repo_id"][rows_after]
+        data = {"Url": [self.urls[repo_id] for repo_id in ids.tolist()]}
+        data.update({col: after[col][rows_after] for col in ["Repo_Name", "User_Name", "Topic"]})
+        for col in GROWTH_METRICS:
+            data[col] = after[col][rows_after]
+            data[f"{col}_Delta"] = after[col][rows_after] - before[col][rows_before]
+        return pd.DataFrame(data, index=pd.Index(ids, name="repo_id")).assign(Days=days)
+
+    def _time(self, position: int) -> datetime:
+        return _timestamp(self.manifest[position]["timestamp"])
+
+    def fastest_growing(
+        self, n: int = 10, by: str = "Star", start: int = -2, end: int = -1, per_day: bool = False
+    ) -> pd.DataFrame:
+        """The ``n`` repos whose ``by`` grew most between two snapshots, largest first.
+
+        With ``per_day`` the change is divided by the days between the scrapes
+        (column ``<by>_Per_Day``). Ties keep repo id order.
+        """
+        deltas = self.deltas(start, end)
+        key = f"{by}_Delta"
+        if per_day:
+            key = f"{by}_Per_Day"
+            deltas[key] = deltas[f"{by}_Delta"] / deltas["Days"]
+        top = deltas.nlargest(n, key, keep="first")
+        return top[["Url", "Repo_Name", "User_Name", "Topic", by, f"{by}_Delta", *([key] if per_day else [])]]
+
+    def topic_deltas(self, start: int = -2, end: int = -1) -> pd.DataFrame:
+        """Per topic: repos in both snapshots, and the total and mean change of each metric."""
+        columns = [f"{col}_Delta" for col in GROWTH_METRICS]
+        aggregates = RunningAggregates("Topic", columns).update(self.deltas(start, end))
+        totals = aggregates.sum().set_index("Topic")
+        means = aggregates.mean().set_index("Topic").add_suffix("_Mean")
+        repos = aggregates.stats["count"][columns[0]].astype(np.int64).rename("Repos")
+        return pd.concat([repos, totals, means], axis=1).reset_index()
+
+    def rising_tags(self, n: int = 15, by: str = "Star", start: int = -2, end: int = -1) -> pd.DataFrame:
+        """Tags ordered by the total change of ``by`` over their repos (``"Repos"``: by repos gained).
+
+        ``Repos_Before``/``Repos_After`` count the repos carrying the tag in
+        each snapshot; ``<metric>_Delta`` sums the changes of the repos tagged
+        in ``end`` that are present in both snapshots.
+        """
+        before, after = self._arrays(start), self._arrays(end)
+        counts_before = parse_topic_tags(pd.Series(before["Topic_Tags"])).counts()
+        tags = parse_topic_tags(pd.Series(after["Topic_Tags"]))
+        frame = pd.DataFrame(
+            {
+                "Repos_Before": counts_before.reindex(tags.vocab, fill_value=0).to_numpy(),
+                "Repos_After": tags.counts().to_numpy(),
+            },
+            index=pd.Index(tags.vocab, name="Tag"),
+        )
+        frame["Repos_Delta"] = frame["Repos_After"] - frame["Repos_Before"]
+
+        # Changes per row of ``end``, zero for repos new in ``end``
+        deltas = self.deltas(start, end)
+        rows = np.searchsorted(after["repo_id"], deltas.index.to_numpy())
+        row_ids = tags.row_ids
+        for col in GROWTH_METRICS:
+            per_row = np.zeros(len(tags))
+            per_row[rows] = np.nan_to_num(deltas[f"{col}_Delta"].to_numpy())
+            frame[f"{col}_Delta"] = np.bincount(tags.tag_ids, weights=per_row[row_ids], minlength=len(tags.vocab))
+        key = "Repos_Delta" if by == "Repos" else f"{by}_Delta"
+        order = np.argsort(-frame[key].to_numpy(), kind="stable")[:n]
+        return frame.iloc[order].reset_index()
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Append scrapes to a snapshot store and report growth.")
+    parser.add_argument("store", help="store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="append a scraped CSV")
+    ingest.add_argument("csv", help="scraped CSV")
+    ingest.add_argument("--timestamp", default=None, help="scrape time, ISO 8601 (default: now)")
+    commands.add_parser("list", help="list the snapshots")
+    for name, help_text in [
+        ("growth", "fastest-growing repos"),
+        ("topics", "change per topic"),
+        ("tags", "rising tags"),
+    ]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--start", type=int, default=-2, help="earlier snapshot (default: %(default)s)")
+        command.add_argument("--end", type=int, default=-1, help="later snapshot (default: %(default)s)")
+        if name != "topics":
+            command.add_argument("--by", default="Star", help="metric to rank by (default: %(default)s)")
+            command.add_argument("-n", type=int, default=10, help="rows to show (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.store)
+    if args.command == "ingest":
+        position = store.ingest_csv(args.csv, timestamp=args.timestamp)
+        entry = store.manifest[position]
+        print(f"snapshot {position} at {entry['timestamp']}: {entry['rows']} repos, {entry['new_repos']} new")
+    elif args.command == "list":
+        print(store.snapshots().to_string())
+    elif args.command == "growth":
+        print(store.fastest_growing(args.n, by=args.by, start=args.start, end=args.end).to_string())
+    elif args.command == "topics":
+        print(store.topic_deltas(args.start, args.end).to_string())
+    else:
+        print(store.rising_tags(args.n, by=args.by, start=args.start, end=args.end).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Synthetic scrapes in the raw format of ``Github_data.csv``.
+
+The generated rows have the same 21 columns as the Kaggle file, with counts
+written the way GitHub shows them ("47.9k" stars, "2,940" commits) and
+``topic_tag`` as the text of a Python list. Users and tags are drawn from Zipf
+distributions, so a few of them are very frequent and most are rare, as in
+real crawls.
+
+Usage::
+
+    python -m github_analysis.synthetic synthetic.csv --rows 1000000
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.loading import DEFAULT_CHUNKSIZE
+
+TOPICS = [
+    "Data-Science", "machine-Learning", "Open-CV", "Computer-Vision", "GAN",
+    "variational-encoder", "Android-studio", "flutter", "java", "awesome",
+    "javascript", "c++", "Raspberry pi", "Arduino", "sensor",
+]
+LICENSES = ["MIT", "Fetching contributors", "View license", "Apache-2.0", "GPL-3.0", "BSD-3-Clause"]
+RAW_COLUMNS = [
+    "Unnamed: 0.1", "Unnamed: 0", "topic", "name", "user", "star", "fork", "watch", "issue",
+    "pull_requests", "projects", "topic_tag", "discription_text", "discription_url", "commits",
+    "branches", "packages", "releases", "contributers", "License", "url",
+]
+
+USER_EXPONENT = 1.0
+TAG_EXPONENT = 1.1
+MAX_TAGS = 12
+
+
+class ZipfSampler:
+    """Draws ranks ``0..size-1`` with probability proportional to ``1 / (rank + 1) ** exponent``."""
+
+    def __init__(self, size: int, exponent: float):
+        weights = 1.0 / np.arange(1, size + 1, dtype=np.float64) ** exponent
+        self.cdf = np.cumsum(weights / weights.sum())
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return np.minimum(np.searchsorted(self.cdf, rng.random(n)), len(self.cdf) - 1)
+
+
+def _format_abbreviated(values: np.ndarray) -> np.ndarray:
+    """GitHub's star/fork/watch format: 987, 1k, 47.9k, 1.2m."""
+    text = values.astype(str).astype(object)
+    thousands = values >= 1_000
+    # From 999,950 on, one decimal of thousands rounds to 1000k, which GitHub shows as 1m
+    millions = values >= 999_950
+    text[thousands] = np.char.mod("%.1fk", values[thousands] / 1e3)
+    text[millions] = np.char.mod("%.1fm", values[millions] / 1e6)
+    return np.char.replace(text.astype(str), ".0", "").astype(object)
+
+
+def _format_grouped(values: np.ndarray) -> list:
+    """Comma-grouped integers, as GitHub shows issues and commits."""
+    return [f"{value:,}" for value in values.tolist()]
+
+
+def _with_missing(rng: np.random.Generator, values, rate: float) -> np.ndarray:
+    values = np.asarray(values, dtype=object)
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+
+class SyntheticScrape:
+    """Generator of raw scrape rows for a dataset of ``total_rows`` repos."""
+
+    def __init__(self, total_rows: int, seed: int = 0):
+        self.total_rows = total_rows
+        self.rng = np.random.default_rng(seed)
+        self.users = ZipfSampler(max(total_rows // 4, 10), USER_EXPONENT)
+        self.tags = ZipfSampler(max(total_rows // 20, 200), TAG_EXPONENT)
+
+    def _topic_tags(self, n: int) -> list:
+        lengths = self.rng.integers(0, MAX_TAGS + 1, size=n)
+        # Names are built from the sampled ranks chunk by chunk, never for the whole vocabulary
+        ranks = self.tags.sample(self.rng, int(lengths.sum()))
+        quoted = [f"'tag-{rank}'" for rank in ranks.tolist()]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+        # A repo lists each tag once
+        spans = zip(offsets[:-1], offsets[1:])
+        return ["[" + ", ".join(dict.fromkeys(quoted[start:stop])) + "]" for start, stop in spans]
+
+    def chunk(self, start: int, n: int) -> pd.DataFrame:
+        """Raw rows ``start .. start + n - 1``."""
+        rng = self.rng
+        stars = np.round(rng.lognormal(7.5, 1.6, n)).astype(np.int64)
+        forks = np.round(stars * rng.uniform(0.05, 0.4, n)).astype(np.int64)
+        watch = np.round(stars * rng.uniform(0.02, 0.08, n)).astype(np.int64)
+        users = np.char.add("user", self.users.sample(rng, n).astype(str)).astype(object)
+        names = np.char.add("repo", np.arange(start, start + n).astype(str)).astype(object)
+        index = np.arange(start, start + n)
+        return pd.DataFrame(
+            {
+                "Unnamed: 0.1": index,
+                "Unnamed: 0": index,
+                "topic": np.array(TOPICS, dtype=object)[rng.integers(0, len(TOPICS), n)],
+                "name": names,
+                "user": users,
+                "star": _format_abbreviated(stars),
+                "fork": _format_abbreviated(forks),
+                "watch": _format_abbreviated(watch),
+                "issue": _with_missing(rng, _format_grouped(rng.geometric(0.004, n)), 0.001),
+                "pull_requests": _with_missing(rng, rng.geometric(0.02, n), 0.001),
+                "projects": rng.integers(0, 5, n).astype(np.float64),
+                "topic_tag": self._topic_tags(n),
+                "discription_text": "Synthetic repository",
+                "discription_url": "https://example.com/",
+                "commits": _format_grouped(rng.geometric(0.0005, n)),
+                "branches": rng.integers(1, 50, n),
+                "packages": 0,
+                "releases": rng.integers(0, 100, n),
+                "contributers": _with_missing(rng, rng.geometric(0.02, n), 0.003),
+                "License": np.array(LICENSES, dtype=object)[rng.integers(0, len(LICENSES), n)],
+                "url": "https://github.com/" + users + "/" + names,
+            },
+            columns=RAW_COLUMNS,
+        )
+
+    def chunks(self, chunksize: int = DEFAULT_CHUNKSIZE):
+        for start in range(0, self.total_rows, chunksize):
+            yield self.chunk(start, min(chunksize, self.total_rows - start))
+
+
+def generate_raw(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A synthetic raw scrape of ``rows`` repos, in memory."""
+    return pd.concat(SyntheticScrape(rows, seed).chunks(), ignore_index=True)
+
+
+def write_csv(path: str, rows: int, seed: int = 0, chunksize: int = DEFAULT_CHUNKSIZE) -> None:
+    """Write a synthetic raw scrape of ``rows`` repos to ``path``, chunk by chunk."""
+    for i, chunk in enumerate(SyntheticScrape(rows, seed).chunks(chunksize)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic scrape in the Github_data.csv format.")
+    parser.add_argument("path", help="output CSV")
+    parser.add_argument("--rows", type=int, default=10_000, help="number of repos (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows generated at a time")
+    args = parser.parse_args(argv)
+    write_csv(args.path, args.rows, seed=args.seed, chunksize=args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Inverted index from topic tag to repos, with top-k-by-metric lookups.
+
+In[22]-In[25] only count tags over the whole frame; finding "the most starred
+repos tagged ``deep-learning``" means re-parsing and scanning everything.
+``TagIndex`` turns a ``TagTable`` around once: for every tag it keeps the
+sorted row positions of the repos carrying it (the posting list) and, per
+metric, the same rows ordered by that metric. A single-tag top-k is then a
+slice of the ranked list. An AND top-k walks the ranked list of the rarest
+tag, tests each row against the other posting lists by binary search and
+stops at the k-th match; an OR top-k only ranks the first k rows of each
+tag's ranked list, which must contain the k best of the union.
+"""
+
+import numpy as np
+import pandas as pd
+
+from github_analysis.tags import TagTable
+
+DEFAULT_METRICS = ("Star", "Fork", "Watch")
+# Ranked rows tested per step of an AND top-k walk, doubling after each step
+_WALK_BLOCK = 64
+
+
+def _rank(rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Order ``rows`` by descending value, ties by row, NaN last (like ``nlargest``)."""
+    keys = np.where(np.isnan(values), -np.inf, values)
+    return rows[np.lexsort((rows, -keys))]
+
+
+def _contains(posting: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Mask of the ``rows`` present in the sorted ``posting``."""
+    positions = np.searchsorted(posting, rows)
+    found = positions < len(posting)
+    found[found] = posting[positions[found]] == rows[found]
+    return found
+
+
+class TagIndex:
+    """Posting lists of row positions per tag, plus per-metric rankings."""
+
+    def __init__(self, table: TagTable, github_df: pd.DataFrame, metrics: tuple = DEFAULT_METRICS):
+        if len(table) != len(github_df):
+            raise ValueError("TagTable and github_df have a different number of rows")
+        self.vocab = table.vocab
+        self.tag_lookup = {tag: i for i, tag in enumerate(table.vocab)}
+
+        # Distinct (tag, row) pairs, grouped by tag with ascending rows
+        pairs = np.unique(table.tag_ids.astype(np.int64) * len(table) + table.row_ids)
+        tag_ids, rows = np.divmod(pairs, max(len(table), 1))
+        self.postings = rows
+        self.offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tag_ids, minlength=len(self.vocab)), out=self.offsets[1:])
+
+        self.metrics = {}
+        self.ranked = {}
+        for metric in metrics:
+            values = github_df[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+            keys = np.where(np.isnan(values), -np.inf, values)[rows]
+            self.metrics[metric] = values
+            self.ranked[metric] = rows[np.lexsort((rows, -keys, tag_ids))]
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    def _span(self, tag: str) -> tuple:
+        tag_id = self.tag_lookup.get(tag)
+        if tag_id is None:
+            return 0, 0
+        return self.offsets[tag_id], self.offsets[tag_id + 1]
+
+    def posting(self, tag: str) -> np.ndarray:
+        """Sorted row positions of the repos tagged ``tag``."""
+        start, stop = self._span(tag)
+        return self.postings[start:stop]
+
+    def query(self, all_of: list | None = None, any_of: list | None = None) -> np.ndarray:
+        """Sorted row positions of repos carrying every tag of ``all_of`` and any tag of ``any_of``."""
+        if not all_of and not any_of:
+            raise ValueError("query() needs all_of and/or any_of tags")
+        if all_of:
+            # Filter the shortest posting list through the others, by binary search
+            postings = sorted((self.posting(tag) for tag in all_of), key=len)
+            result = postings[0]
+            for posting in postings[1:]:
+                result = result[_contains(posting, result)]
+        if any_of:
+            postings = [self.posting(tag) for tag in any_of]
+            if all_of:
+                result = result[np.any([_contains(posting, result) for posting in postings], axis=0)]
+            else:
+                result = np.unique(np.concatenate(postings))
+        return result
+
+    def top_k(self, tags: list, k: int = 10, by: str = "Star", mode: str = "and") -> np.ndarray:
+        """Row positions of the ``k`` repos with the largest ``by`` among those matching ``tags``.
+
+        ``mode`` is ``"and"`` (repos with all tags) or ``"or"`` (any tag).
+        Ties and missing values behave like ``DataFrame.nlargest``.
+        """
+        if by not in self.ranked:
+            raise KeyError(f"{by!r} is not indexed; available: {list(self.ranked)}")
+        if mode not in ("and", "or"):
+            raise ValueError(f"mode must be 'and' or 'or', not {mode!r}")
+        tags = [tags] if isinstance(tags, str) else list(tags)
+        if not tags:
+            raise ValueError("top_k() needs at least one tag")
+        values = self.metrics[by]
+
+        spans = [self._span(tag) for tag in tags]
+        if len(tags) == 1:
+            start, stop = spans[0]
+            rows = self.ranked[by][start : min(stop, start + k)]
+            return rows[~np.isnan(values[rows])]
+
+        if mode == "or":
+            # Every row of the union's top k is within the top k of one of its tags
+            rows = np.unique(np.concatenate([self.ranked[by][start : min(stop, start + k)] for start, stop in spans]))
+            rows = rows[~np.isnan(values[rows])]
+            return _rank(rows, values[rows])[:k]
+
+        (start, stop), *others = sorted(spans, key=lambda span: span[1] - span[0])
+        others = [self.postings[other_start:other_stop] for other_start, other_stop in others]
+        matches = []
+        found = 0
+        block = _WALK_BLOCK
+        while start < stop and found < k:
+            rows = self.ranked[by][start : min(stop, start + block)]
+            start += len(rows)
+            rows = rows[~np.isnan(values[rows])]
+            for posting in others:
+                rows = rows[_contains(posting, rows)]
+            matches.append(rows)
+            found += len(rows)
+            block *= 2
+        return np.concatenate(matches)[:k] if matches else np.zeros(0, dtype=np.int64)
+
+    def lookup(self, github_df: pd.DataFrame, tags: list, k: int = 10, by: str = "Star", mode: str = "and"):
+        """Top ``k`` repos as a ``Repo_Name``/``Topic``/``by`` frame, like In[8]."""
+        return github_df.iloc[self.top_k(tags, k=k, by=by, mode=mode)][["Repo_Name", "Topic", by]]
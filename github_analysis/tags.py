@@ -0,0 +1,106 @@
+"""Compact parsing of the ``Topic_Tags`` column (In[22]-In[25]).
+
+Each ``Topic_Tags`` value is the text of a Python list, e.g.
+``"['deep-learning', 'tensorflow']"``. In[22] runs ``ast.literal_eval`` on
+every value and keeps the resulting list of lists around. ``parse_topic_tags``
+instead extracts all tags in one regular-expression pass over the column and
+stores them CSR-style: a vocabulary of distinct tags, one int32 tag id per
+(repo, tag) pair and per-repo offsets into that id array. Tag counts, tags per
+repo and tags per topic are then plain NumPy reductions.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+_TAG_PATTERN = re.compile(r"'([^']*)'")
+
+
+@dataclass
+class TagTable:
+    """Tags of ``n`` repos: repo ``i`` has ``vocab[tag_ids[offsets[i]:offsets[i + 1]]]``."""
+
+    vocab: np.ndarray
+    tag_ids: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of tags of each repo (``Total_Tags`` in In[24])."""
+        return np.diff(self.offsets)
+
+    @property
+    def row_ids(self) -> np.ndarray:
+        """Repo position of every entry of ``tag_ids``."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.lengths)
+
+    def tags_of(self, row: int) -> list:
+        """Tags of the repo at position ``row``, in their original order."""
+        return self.vocab[self.tag_ids[self.offsets[row] : self.offsets[row + 1]]].tolist()
+
+    def counts(self, rows: np.ndarray | None = None) -> pd.Series:
+        """Occurrences of each tag, indexed by tag, in first-seen order.
+
+        With a boolean mask of repos ``rows``, only the tags of those repos
+        are counted (and listed).
+        """
+        if rows is None:
+            counts = np.bincount(self.tag_ids, minlength=len(self.vocab))
+            return pd.Series(counts, index=pd.Index(self.vocab, name="Name of the Tag"), name="Count")
+        counts = np.bincount(self.tag_ids[rows[self.row_ids]], minlength=len(self.vocab))
+        present = counts > 0
+        return pd.Series(counts[present], index=pd.Index(self.vocab[present], name="Name of the Tag"), name="Count")
+
+    def most_common(self, n: int = 15) -> pd.DataFrame:
+        """Top ``n`` tags with their counts, as ``toptags_df`` in In[22].
+
+        Ties keep first-seen order, like ``Counter.most_common``.
+        """
+        counts = np.bincount(self.tag_ids, minlength=len(self.vocab))
+        order = np.argsort(-counts, kind="stable")[:n]
+        return pd.DataFrame({"Name of the Tag": self.vocab[order], "Count": counts[order]})
+
+
+def parse_topic_tags(series: pd.Series) -> TagTable:
+    """Parse a ``Topic_Tags`` column into a ``TagTable``.
+
+    Missing values count as repos without tags. Values containing double
+    quotes (tags that Python quoted differently) go through ``ast.literal_eval``;
+    the other values of the column still take the regular-expression pass.
+    """
+    text = series.fillna("[]").astype(str)
+    quoted = text.str.contains('"', regex=False).to_numpy()
+    lengths = (text.str.count("'") // 2).to_numpy(dtype=np.int64)
+    tags = _TAG_PATTERN.findall("".join(text[~quoted].tolist()))
+    if quoted.any():
+        lists = [ast.literal_eval(value) for value in text[quoted].tolist()]
+        lengths[quoted] = [len(item) for item in lists]
+        # Put each row's tags back in row order among those of the regex pass
+        from_literal = np.repeat(quoted, lengths)
+        merged = np.empty(len(from_literal), dtype=object)
+        merged[~from_literal] = tags
+        merged[from_literal] = [tag for item in lists for tag in item]
+        tags = merged
+
+    codes, vocab = pd.factorize(pd.Series(tags, dtype=object), sort=False)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if offsets[-1] != len(codes):
+        raise ValueError("Topic_Tags values are not lists of quoted strings")
+    return TagTable(
+        vocab=np.asarray(vocab, dtype=object),
+        tag_ids=codes.astype(np.int32),
+        offsets=offsets,
+    )
+
+
+def topic_tag_totals(topics: pd.Series, table: TagTable) -> pd.DataFrame:
+    """Total number of tags per topic, as ``topic_wise_tag`` in In[24]."""
+    totals = pd.Series(table.lengths, index=topics.to_numpy()).groupby(level=0).sum()
+    return totals.rename_axis("Topic").reset_index(name="Total Tags")
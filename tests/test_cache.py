@@ -0,0 +1,67 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from github_analysis.cache import cache_key, load_cached_github_df, read_cache, write_cache
+from github_analysis.cleaning import CleaningReport
+from github_analysis.schema import RAW_TO_CLEAN
+from github_analysis.sections import plan
+
+CSV = Path(__file__).resolve().parent.parent / "Github_data.csv"
+
+
+def test_default_columns_share_the_key_of_none(tmp_path):
+    csv = shutil.copy(CSV, tmp_path / "github.csv")
+    assert cache_key(csv, list(RAW_TO_CLEAN.values())) == cache_key(csv, None)
+    assert cache_key(csv, plan().columns) == cache_key(csv, None)
+    assert cache_key(csv, plan("tags").columns) != cache_key(csv, None)
+
+
+def test_column_sets_hit_until_the_csv_changes(tmp_path):
+    csv = str(shutil.copy(CSV, tmp_path / "github.csv"))
+    cache_dir = str(tmp_path / "cache")
+    full, _, status = load_cached_github_df(csv, cache_dir=cache_dir)
+    assert status == "miss"
+    assert load_cached_github_df(csv, cache_dir=cache_dir, columns=plan().columns)[2] == "hit"
+    assert load_cached_github_df(csv, cache_dir=cache_dir, columns=plan("tags").columns)[2] == "miss"
+    # Building one column set keeps the other entries of the same CSV
+    cached, _, status = load_cached_github_df(csv, cache_dir=cache_dir)
+    assert status == "hit"
+    assert_frame_equal(cached, full)
+    # Numeric columns are views of the mapped files, not copies
+    assert isinstance(cached["Star"].to_numpy().base, np.memmap)
+    assert load_cached_github_df(csv, cache_dir=cache_dir, columns=plan("tags").columns)[2] == "hit"
+
+    with open(csv, "a") as f:
+        f.write(Path(CSV).read_text().splitlines()[-1] + "\n")
+    assert load_cached_github_df(csv, cache_dir=cache_dir)[2] == "miss"
+    # Entries of the old contents are gone
+    assert len([entry for entry in Path(cache_dir).iterdir() if entry.is_dir()]) == 1
+
+
+def test_entries_load_without_pickle(tmp_path):
+    frame = pd.DataFrame({"Repo_Name": ["numpy", np.nan, "naïve-ユニコード", ""], "Star": [1.0, 2.0, np.nan, 4.0]})
+    entry_dir = str(tmp_path / "entry")
+    write_cache(entry_dir, frame, CleaningReport(rows=4), str(CSV))
+    for file in Path(entry_dir).glob("*.npy"):
+        np.load(file, allow_pickle=False)
+    cached, report = read_cache(entry_dir)
+    assert_frame_equal(cached, frame)
+    assert report.rows == 4
+
+
+def test_a_rewrite_keeping_size_and_mtime_is_rehashed(tmp_path):
+    csv = str(shutil.copy(CSV, tmp_path / "github.csv"))
+    cache_dir = str(tmp_path / "cache")
+    assert load_cached_github_df(csv, cache_dir=cache_dir)[2] == "miss"
+    info = os.stat(csv)
+    contents = Path(csv).read_bytes()
+    # Same size and restored mtime, as after ``cp -p`` of an edited copy; the ctime still moves
+    Path(csv).write_bytes(contents.replace(b"numpy", b"NUMPY", 1))
+    os.utime(csv, ns=(info.st_atime_ns, info.st_mtime_ns))
+    assert os.stat(csv).st_mtime_ns == info.st_mtime_ns
+    assert load_cached_github_df(csv, cache_dir=cache_dir)[2] == "miss"
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from github_analysis.cube import AggregateCube, build_cube
+from github_analysis.loading import iter_clean_chunks, load_github_df
+from github_analysis.schema import COUNT_COLUMNS
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+
+
+@pytest.fixture(scope="module")
+def cube():
+    return build_cube(CSV).materialize()
+
+
+def test_chunked_build_matches_one_chunk(cube):
+    chunked = AggregateCube()
+    for chunk, _ in iter_clean_chunks(CSV, chunksize=37, columns=["Topic", "User_Name", "License", *COUNT_COLUMNS]):
+        chunked.update(chunk)
+    assert_frame_equal(chunked.to_frame(), cube.to_frame())
+
+
+def test_query_without_values_is_the_grand_total(cube):
+    github_df, _ = load_github_df(CSV)
+    total = cube.query()
+    assert_series_equal(total["count"], github_df[COUNT_COLUMNS].count().astype(np.float64), check_names=False)
+    assert_series_equal(total["sum"], github_df[COUNT_COLUMNS].sum(), check_names=False)
+    assert_series_equal(total, cube.rollup([]).iloc[0], check_names=False)
+
+
+def test_query_matches_a_topic_subset(cube):
+    github_df, _ = load_github_df(CSV)
+    java = github_df[github_df["Topic"] == "java"]
+    stars = cube.query(Topic="java")
+    assert stars[("sum", "Star")] == java["Star"].sum()
+    assert stars[("max", "Star")] == java["Star"].max()
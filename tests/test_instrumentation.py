@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from github_analysis import instrumentation
+from github_analysis.instrumentation import instrumented, prometheus_text, stage, stage_totals
+
+
+def read_events(path) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_stage_is_a_no_op_while_disabled():
+    assert instrumentation.active() is None
+    with stage("load", rows_in=3) as s:
+        s.rows_out = 2
+    assert stage("load") is stage("clean")
+
+
+def test_nested_stages_record_parents_and_rows(tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    with instrumented(events_path=str(events_path)) as recorder:
+        with stage("analysis"):
+            with stage("clean", rows_in=10) as s:
+                s.rows_out = 8
+            with stage("figure", figure="tags_wordcloud"):
+                pass
+        with pytest.raises(ValueError), stage("clean", rows_in=5):
+            raise ValueError
+    events = read_events(events_path)
+    # Events are written as stages exit, so children come before their parent
+    assert [(event["stage"], event["parent"]) for event in events] == [
+        ("clean", "analysis"),
+        ("figure", "analysis"),
+        ("analysis", None),
+        ("clean", None),
+    ]
+    assert (events[0]["rows_in"], events[0]["rows_out"]) == (10, 8)
+    assert (events[3]["rows_in"], events[3]["rows_out"], events[3]["error"]) == (5, None, "ValueError")
+    assert events[1]["figure"] == "tags_wordcloud"
+    assert not recorder.stack
+    # The recorder keeps the totals of the log, not the events
+    assert not hasattr(recorder, "events")
+    assert recorder.totals == stage_totals(events)
+    clean = recorder.totals[("clean", ())]
+    assert (clean["calls"], clean["rows_in"], clean["rows_out"]) == (2, 15, 8)
+    assert recorder.totals[("analysis", ())]["rows_in"] is None
+
+
+def test_prometheus_text(tmp_path):
+    prometheus_path = tmp_path / "pipeline.prom"
+    with instrumented(prometheus_path=str(prometheus_path), trace_memory=True):
+        for rows in (3, 4):
+            with stage("clean", rows_in=rows) as s:
+                s.rows_out = rows - 1
+        with stage("figure", figure='say "hi"'):
+            pass
+    text = prometheus_path.read_text()
+    lines = text.splitlines()
+    assert "# TYPE github_analysis_stage_calls_total counter" in lines
+    assert 'github_analysis_stage_calls_total{stage="clean"} 2' in lines
+    assert 'github_analysis_stage_calls_total{stage="figure",figure="say \\"hi\\""} 1' in lines
+    assert 'github_analysis_stage_rows_in_total{stage="clean"} 7' in lines
+    assert 'github_analysis_stage_rows_out_total{stage="clean"} 5' in lines
+    # Stages without row counts have no row samples
+    assert not any(line.startswith("github_analysis_stage_rows_in_total{stage=\"figure\"") for line in lines)
+    assert "# TYPE github_analysis_stage_peak_traced_bytes gauge" in lines
+    samples = [line for line in lines if not line.startswith("#")]
+    assert all(float(line.rsplit(" ", 1)[1]) >= 0 for line in samples)
+    assert all("stage" not in line for line in prometheus_text({}).splitlines())
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from github_analysis.leaderboards import Leaderboard
+from github_analysis.loading import load_github_df
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+METRICS = ("Star", "Watch", "Fork")
+
+
+@pytest.fixture(scope="module", params=["csv", "ties"])
+def github_df(request):
+    if request.param == "csv":
+        return load_github_df(CSV)[0]
+    # Few distinct values, so most of every top k is decided by ties
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({metric: rng.integers(0, 6, 5000).astype(np.float64) for metric in METRICS})
+    frame.loc[rng.random(len(frame)) < 0.1, "Fork"] = np.nan
+    frame["Topic"] = rng.choice(["java", "python", "c++", "rust"], len(frame))
+    return frame
+
+
+def build(github_df: pd.DataFrame, k: int, by: str | None, chunksize: int) -> Leaderboard:
+    """Leaderboard over ``github_df`` in chunks, half of them folded into a second board and merged."""
+    first, second = Leaderboard(METRICS, k=k, by=by), Leaderboard(METRICS, k=k, by=by)
+    for start in range(0, len(github_df), chunksize):
+        board = first if (start // chunksize) % 2 else second
+        board.update(github_df.iloc[start : start + chunksize])
+    return first.merge(second)
+
+
+@pytest.mark.parametrize("chunksize", [37, 1000, 10_000])
+@pytest.mark.parametrize("k", [1, 10, 100])
+def test_top_matches_nlargest(github_df, k, chunksize):
+    board = build(github_df, k, None, chunksize)
+    for metric in METRICS:
+        assert_frame_equal(board.top(metric), github_df.nlargest(k, metric, keep="first"))
+        assert_frame_equal(board.top(metric, n=min(k, 3)), github_df.nlargest(min(k, 3), metric, keep="first"))
+
+
+@pytest.mark.parametrize("chunksize", [37, 1000])
+@pytest.mark.parametrize("k", [1, 10])
+def test_top_per_topic_matches_groupby_nlargest(github_df, k, chunksize):
+    board = build(github_df, k, "Topic", chunksize)
+    for metric in METRICS:
+        expected = github_df.groupby("Topic")[metric].nlargest(k, keep="first")
+        for topic, rows in expected.groupby(level="Topic"):
+            top = board.top(metric, group=topic)
+            np.testing.assert_array_equal(top.index, rows.index.get_level_values(1))
+            np.testing.assert_array_equal(top[metric], rows.to_numpy())
+        assert len(board.top(metric)) == len(expected)
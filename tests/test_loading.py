@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from github_analysis.loading import load_github_df
+
+REPO = Path(__file__).resolve().parent.parent
+CSV = str(REPO / "Github_data.csv")
+
+
+@pytest.fixture(scope="module")
+def notebook_github_df():
+    """``github_df`` as In[2]-In[4] of the notebook build it, verbatim apart from the display calls."""
+    cwd = os.getcwd()
+    os.chdir(REPO)
+    try:
+        # In[2]
+        github_data_df = pd.read_csv("Github_data.csv")
+        github_data_df = github_data_df.drop(["Unnamed: 0", "Unnamed: 0.1"], axis=1)
+
+        # In[3]
+        github_df = github_data_df[["topic", "name", "user", "star", "fork", "watch",
+                                         "issue", "pull_requests", "topic_tag", "commits", "contributers"]]
+        newnames = ["Topic", "Repo_Name", "User_Name", "Star", "Fork", "Watch",
+                    "Issues", "Pull_Requests", "Topic_Tags", "Commits", "Contributors"]
+        oldnames = github_df.columns
+        github_df = github_df.rename(columns = dict(zip(oldnames, newnames)))
+
+        # In[4]
+        github_df["Star"] = github_df["Star"].apply(lambda x: float(x.rstrip("k"))*1000 if "k" in str(x) else float(x))
+        github_df["Fork"] = github_df["Fork"].apply(lambda x: float(x.rstrip("k"))*1000 if "k" in str(x) else float(x))
+        github_df["Watch"] = github_df["Watch"].apply(lambda x: float(x.rstrip("k"))*1000 if "k" in str(x) else float(x))
+        github_df["Issues"] = github_df["Issues"].apply(lambda x: x.replace(",", ""))
+        github_df["Commits"] = github_df["Commits"].apply(lambda x: x.replace(",", ""))
+        cols = ["Issues", "Pull_Requests", "Commits", "Contributors"]
+        github_df[cols] = github_df[cols].apply(pd.to_numeric, errors="coerce", axis=1)
+    finally:
+        os.chdir(cwd)
+    return github_df
+
+
+@pytest.mark.parametrize("chunksize", [None, 1000, 97])
+def test_load_github_df_matches_notebook(notebook_github_df, chunksize):
+    kwargs = {} if chunksize is None else {"chunksize": chunksize}
+    github_df, report = load_github_df(CSV, **kwargs)
+    assert_frame_equal(github_df, notebook_github_df)
+    assert report.rows == len(notebook_github_df)
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from github_analysis.loading import load_github_df
+from github_analysis.mapreduce import run_analysis, run_analysis_csv
+from github_analysis.schema import compact_github_df
+from github_analysis.sections import plan
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+
+
+def assert_outputs_equal(left: dict, right: dict, **kwargs) -> None:
+    assert list(left) == list(right)
+    for name, expected in right.items():
+        if isinstance(expected, pd.DataFrame):
+            assert_frame_equal(left[name], expected, check_exact=False, rtol=1e-9, obj=name, **kwargs)
+        elif isinstance(expected, pd.Series):
+            assert_series_equal(left[name], expected, check_exact=False, rtol=1e-9, obj=name, **kwargs)
+        else:
+            assert list(left[name]) == list(expected), name
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["all", "dedup"])
+def dedup(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def serial(dedup):
+    github_df, _ = load_github_df(CSV, columns=plan(dedup=dedup).columns)
+    return github_df, run_analysis(github_df, workers=1, dedup=dedup)
+
+
+def test_workers_match_serial(serial, dedup):
+    github_df, expected = serial
+    assert_outputs_equal(run_analysis(github_df, workers=4, dedup=dedup), expected)
+
+
+@pytest.mark.parametrize("shards", [1, 7, 64])
+def test_shard_count_does_not_change_output(serial, dedup, shards):
+    github_df, expected = serial
+    assert_outputs_equal(run_analysis(github_df, workers=1, shards=shards, dedup=dedup), expected)
+
+
+@pytest.mark.parametrize("chunksize", [97, 500])
+def test_csv_chunks_match_serial(serial, dedup, chunksize):
+    _, expected = serial
+    assert_outputs_equal(run_analysis_csv(CSV, workers=1, chunksize=chunksize, dedup=dedup), expected)
+    assert_outputs_equal(run_analysis_csv(CSV, workers=4, chunksize=chunksize, dedup=dedup), expected)
+
+
+@pytest.mark.parametrize("sections", [["popularity"], ["users"], ["contributions"], ["tags"], ["users", "tags"]])
+def test_sections_match_full_run(serial, dedup, sections):
+    _, expected = serial
+    github_df, _ = load_github_df(CSV, columns=plan(sections, dedup=dedup).columns)
+    outputs = run_analysis(github_df, workers=1, sections=sections, dedup=dedup)
+    assert_outputs_equal(outputs, {name: expected[name] for name in plan(sections).outputs})
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+@pytest.mark.parametrize("categorical_users", [False, True])
+def test_compact_layout_matches_float64(serial, dedup, categorical_users):
+    github_df, expected = serial
+    compact_df = compact_github_df(github_df)
+    if categorical_users:
+        compact_df = compact_df.astype({"User_Name": "category"})
+    outputs = run_analysis(compact_df, workers=1, dedup=dedup)
+    # Same values; the top tables keep the compact dtypes of their rows
+    assert_outputs_equal(outputs, expected, check_dtype=False, check_categorical=False)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from github_analysis.plots import _log_edges, linear_fit, regression_band
+
+
+@pytest.fixture(scope="module")
+def counts():
+    """Heavy-tailed star and fork counts, with a few missing values."""
+    rng = np.random.default_rng(0)
+    stars = np.floor(rng.pareto(1.2, size=20_000) * 50)
+    forks = np.floor(stars * rng.uniform(0.05, 0.4, size=len(stars)) + rng.poisson(2, size=len(stars)))
+    stars[::97] = np.nan
+    forks[::89] = np.nan
+    return stars, forks
+
+
+def test_linear_fit_matches_polyfit_and_corrcoef(counts):
+    stars, forks = counts
+    fit = linear_fit(stars, forks)
+    keep = ~(np.isnan(stars) | np.isnan(forks))
+    slope, intercept = np.polyfit(stars[keep], forks[keep], 1)
+    assert fit["n"] == keep.sum()
+    assert fit["slope"] == pytest.approx(slope, rel=1e-10)
+    assert fit["intercept"] == pytest.approx(intercept, rel=1e-10)
+    assert fit["r"] == pytest.approx(np.corrcoef(stars[keep], forks[keep])[0, 1], rel=1e-10)
+    residuals = forks[keep] - (intercept + slope * stars[keep])
+    assert fit["sigma"] == pytest.approx(np.sqrt((residuals**2).sum() / (keep.sum() - 2)), rel=1e-8)
+
+
+def test_regression_band_is_centred_on_the_line(counts):
+    fit = linear_fit(*counts)
+    grid = np.array([0.0, fit["x_mean"], 1e4])
+    line, low, high = regression_band(fit, grid)
+    np.testing.assert_allclose(line, fit["intercept"] + fit["slope"] * grid)
+    np.testing.assert_allclose(line - low, high - line)
+    # Narrowest at the mean of x
+    assert np.argmin(high - low) == 1
+
+
+def test_log_edges_cover_heavy_tails(counts):
+    stars = counts[0][~np.isnan(counts[0])]
+    edges, scale = _log_edges(stars, 50)
+    assert scale == "symlog"
+    assert (edges[0], edges[-1]) == pytest.approx((stars.min(), stars.max()))
+    assert (np.diff(edges) > 0).all()
+    # Linear bins put nearly every repository in the first column, log-spaced ones spread them out
+    first_linear = np.histogram(stars, bins=50)[0][0] / len(stars)
+    fullest_log = np.histogram(stars, bins=edges)[0].max() / len(stars)
+    assert first_linear > 0.99
+    assert fullest_log < 0.2
+    assert _log_edges(np.array([-1.0, 2.0]), 4)[1] == "linear"
+    assert _log_edges(np.array([3.0, 3.0]), 4)[1] == "linear"
+
+
+def test_binned_regplot_draws_on_symlog_axes(counts):
+    pytest.importorskip("seaborn")
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from github_analysis.plots import relationship_regplot
+
+    stars, forks = counts
+    frame = pd.DataFrame({"Star": stars, "Fork": forks})
+    fig = relationship_regplot(frame, "Star", "Fork", "Stars", "Forks", "Stars vs forks", max_points=1000)
+    ax = fig.axes[0]
+    assert (ax.get_xscale(), ax.get_yscale()) == ("symlog", "symlog")
+    assert "slope=" in ax.get_legend().get_texts()[0].get_text()
+    plt.close(fig)
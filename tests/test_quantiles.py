@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+from github_analysis.loading import load_github_df
+from github_analysis.quantiles import KLLSketch, describe_csv, rank_error
+from github_analysis.schema import COUNT_COLUMNS
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+QUANTILES = np.linspace(0.01, 0.99, 99)
+EXACT_ROWS = ["count", "mean", "min", "max"]
+
+
+@pytest.fixture(scope="module")
+def values():
+    """Heavy-tailed counts with many repeated values, like the Star column."""
+    rng = np.random.default_rng(0)
+    return np.round(rng.lognormal(5, 2, 200_000))
+
+
+def rank_distance(data: np.ndarray, results: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """How far ``q`` lies outside the normalized rank range of each result in ``data``."""
+    data = np.sort(data)
+    low = np.searchsorted(data, results, side="left") / len(data)
+    high = np.searchsorted(data, results, side="right") / len(data)
+    return np.maximum(low - q, 0) + np.maximum(q - high, 0)
+
+
+def sketch_of(data: np.ndarray, seed: int, chunksize: int = 10_000) -> KLLSketch:
+    sketch = KLLSketch(rng=np.random.default_rng(seed))
+    for start in range(0, len(data), chunksize):
+        sketch.update(data[start : start + chunksize])
+    return sketch
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_quantiles_stay_within_the_rank_error(values, seed):
+    sketch = sketch_of(values, seed)
+    assert rank_distance(values, sketch.quantile(QUANTILES), QUANTILES).max() <= rank_error()
+    assert sketch.quantile([0, 1]).tolist() == [values.min(), values.max()]
+    assert len(sketch) < 4 * sketch.k
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merged_sketches_match_one_sketch_of_all_values(values, seed):
+    left, right = values[: len(values) // 3], values[len(values) // 3 :]
+    merged = sketch_of(left, seed).merge(sketch_of(right, seed + 100))
+    single = sketch_of(values, seed)
+    assert merged.count == single.count == len(values)
+    assert (merged.min, merged.max, merged.mean) == (single.min, single.max, single.mean)
+    assert merged.m2 == pytest.approx(single.m2, rel=1e-9)
+
+    merged_results = merged.quantile(QUANTILES)
+    assert rank_distance(values, merged_results, QUANTILES).max() <= rank_error()
+    # Both are within the bound of the true rank, so within twice of each other
+    single_ranks = np.searchsorted(np.sort(values), single.quantile(QUANTILES)) / len(values)
+    assert rank_distance(values, merged_results, single_ranks).max() <= 2 * rank_error()
+
+
+@pytest.mark.parametrize("chunksize", [97, 100_000])
+def test_describe_csv_matches_describe(chunksize):
+    github_df, _ = load_github_df(CSV)
+    expected = github_df[COUNT_COLUMNS].describe()
+    table = describe_csv(CSV, chunksize=chunksize)
+    assert_frame_equal(table.loc[EXACT_ROWS], expected.loc[EXACT_ROWS], check_exact=True)
+    assert_frame_equal(table.loc[["std"]], expected.loc[["std"]], rtol=1e-12)
+
+    expected = github_df.groupby("Topic")[COUNT_COLUMNS].describe()
+    table = describe_csv(CSV, by="Topic", chunksize=chunksize)
+    for row in EXACT_ROWS:
+        assert_frame_equal(table.xs(row, axis=1, level=1), expected.xs(row, axis=1, level=1), check_exact=True)
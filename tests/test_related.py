@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from github_analysis.related import RelatedRepos
+from github_analysis.tags import parse_topic_tags
+
+QUERIES = 100
+
+
+@pytest.fixture(scope="module")
+def table():
+    """Families of near-duplicate tag sets, plus repos with a few popular or random tags."""
+    rng = np.random.default_rng(0)
+    common = [f"common{i}" for i in range(5)]
+    rare = [f"tag{i}" for i in range(3000)]
+    tag_sets = []
+    for _ in range(200):
+        base = rng.choice(rare, size=8, replace=False).tolist()
+        for _ in range(5):
+            # Each member swaps one tag of the family's set and adds a popular one
+            members = base.copy()
+            members[rng.integers(8)] = str(rng.choice(rare))
+            tag_sets.append(members + [str(rng.choice(common))])
+    for _ in range(2000):
+        tag_sets.append(rng.choice(common, size=2, replace=False).tolist() + rng.choice(rare, size=2).tolist())
+    tag_sets.append([])
+    return parse_topic_tags(pd.Series([str(tags) for tags in tag_sets]))
+
+
+@pytest.fixture(scope="module")
+def index(table):
+    return RelatedRepos(table, seed=1)
+
+
+def test_candidates_contain_the_exact_top_k_of_near_duplicates(index):
+    rng = np.random.default_rng(2)
+    for row in rng.choice(1000, size=QUERIES, replace=False).tolist():
+        expected, similarity = index.related(row, k=4, exact=True)
+        assert (similarity >= 0.5).all()
+        assert np.isin(expected, index.candidates(index.tags_of(row))).all()
+        rows, found = index.related(row, k=4)
+        np.testing.assert_array_equal(rows, expected)
+        np.testing.assert_array_equal(found, similarity)
+
+
+def test_max_candidates_is_honoured(table):
+    uncapped = RelatedRepos(table, seed=1, max_candidates=None)
+    capped = RelatedRepos(table, seed=1, max_candidates=20)
+    sizes = []
+    for row in range(1000, 1000 + QUERIES):
+        tags = capped.tags_of(row)
+        candidates, every = capped.candidates(tags), uncapped.candidates(tags)
+        assert len(candidates) <= 20
+        assert np.isin(candidates, every).all()
+        sizes.append(len(every))
+    # Repos with popular tags share buckets with far more repos than the cap
+    assert max(sizes) > 20
+
+
+def test_save_load_round_trips(index, table, tmp_path):
+    path = str(tmp_path / "related.npz")
+    index.save(path)
+    loaded = RelatedRepos.load(path)
+    assert (loaded.bands, loaded.max_candidates, loaded.minhash.num_perm) == (
+        index.bands,
+        index.max_candidates,
+        index.minhash.num_perm,
+    )
+    assert loaded.vocab.tolist() == table.vocab.tolist()
+    for row in [0, 7, 1500, len(table) - 1]:
+        assert loaded.tags_of(row) == index.tags_of(row)
+        for left, right in zip(loaded.related(row, k=10), index.related(row, k=10)):
+            np.testing.assert_array_equal(left, right)
+    # Queries by tags hash the vocabulary again, so they agree too
+    np.testing.assert_array_equal(loaded.candidates(["tag1", "common0"]), index.candidates(["tag1", "common0"]))
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from github_analysis.loading import load_github_df
+from github_analysis.mapreduce import run_analysis
+from github_analysis.report import figure_input, input_hash, report_inputs
+from github_analysis.sections import plan
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+
+
+def test_relationship_plots_use_one_row_per_repo_with_dedup():
+    github_df, _ = load_github_df(CSV, columns=plan("popularity", dedup=True).columns)
+    outputs = run_analysis(github_df, workers=1, sections="popularity", dedup=True)
+    full = report_inputs(outputs, github_df)
+    deduplicated = report_inputs(outputs, github_df, dedup=True)
+    assert len(figure_input(full, "star_vs_fork")) == len(github_df)
+    assert len(figure_input(deduplicated, "star_vs_fork")) == github_df["Url"].nunique()
+    assert input_hash("star_vs_fork", figure_input(full, "star_vs_fork")) != input_hash(
+        "star_vs_fork", figure_input(deduplicated, "star_vs_fork")
+    )
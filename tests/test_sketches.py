@@ -0,0 +1,89 @@
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from github_analysis.loading import load_github_df
+from github_analysis.sketches import CountMinSketch, SpaceSaving, top_tags, top_users
+from github_analysis.tags import parse_topic_tags
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+
+
+@pytest.fixture(scope="module")
+def github_df():
+    return load_github_df(CSV)[0]
+
+
+@pytest.fixture(scope="module")
+def items():
+    """Zipf-distributed items, so a few are heavy and most are rare."""
+    rng = np.random.default_rng(0)
+    return pd.Series(rng.zipf(1.3, 100_000) % 20_000).map("item{}".format)
+
+
+def chunks_of(values: pd.Series, size: int) -> list:
+    return [values.iloc[start : start + size] for start in range(0, len(values), size)]
+
+
+def test_count_min_never_underestimates_and_stays_within_epsilon_n(items):
+    truth = items.value_counts()
+    sketches = [CountMinSketch.from_error(0.001, 0.01, seed=3) for _ in range(2)]
+    for number, chunk in enumerate(chunks_of(items, 7_000)):
+        sketches[number % 2].update(chunk)
+    sketch = sketches[0].merge(sketches[1])
+    assert sketch.total == len(items)
+    over = sketch.estimate(truth.index) - truth.to_numpy()
+    assert (over >= 0).all()
+    assert over.any()  # the table is small enough for collisions
+    # Each item exceeds the bound with probability at most delta
+    assert (over > sketch.error_bound).mean() <= sketch.delta
+
+
+@pytest.mark.parametrize("capacity", [50, 500])
+def test_space_saving_error_bounds_the_true_count(items, capacity):
+    truth = items.value_counts()
+    summaries = [SpaceSaving(capacity) for _ in range(3)]
+    for number, chunk in enumerate(chunks_of(items, 3_000)):
+        summaries[number % 3].update(chunk)
+    summary = summaries[0].merge(summaries[1]).merge(summaries[2])
+    assert summary.total == len(items)
+    assert len(summary.counts) <= capacity
+
+    top = summary.top(len(summary.counts))
+    true_counts = truth.reindex(top["Item"], fill_value=0).to_numpy()
+    assert (top["Count"].to_numpy() >= true_counts).all()
+    assert (top["Count"].to_numpy() - top["Error"].to_numpy() <= true_counts).all()
+    assert (top["Error"] <= summary.total / capacity).all()
+    absent = truth.drop(top["Item"])
+    assert (absent <= summary.absent_bound).all()
+    # The heaviest items are reported, in order
+    assert top["Item"].head(5).tolist() == truth.index[:5].tolist()
+
+
+def test_exact_top_users_matches_value_counts(github_df):
+    expected = github_df["User_Name"].value_counts().head(10)
+    top = top_users(chunks_of(github_df, 97), n=10)
+    assert top["Count"].tolist() == expected.tolist()
+    # Ties are broken by name, like groupby().size().nlargest()
+    assert top["User_Name"].tolist() == github_df.groupby("User_Name").size().nlargest(10).index.tolist()
+
+
+def test_exact_top_tags_matches_value_counts(github_df):
+    tables = [parse_topic_tags(chunk["Topic_Tags"]) for chunk in chunks_of(github_df, 97)]
+    tags = [tag for table in tables for tag in table.vocab[table.tag_ids]]
+    expected = pd.Series(tags).value_counts().head(15)
+    top = top_tags(tables, n=15)
+    assert top["Count"].tolist() == expected.tolist()
+    # Ties keep first-seen order, like Counter.most_common()
+    assert list(zip(top["Name of the Tag"], top["Count"])) == Counter(tags).most_common(15)
+
+
+def test_approximate_top_users_brackets_the_exact_counts(github_df):
+    exact = github_df["User_Name"].value_counts()
+    top = top_users(chunks_of(github_df, 97), n=10, approximate=True, capacity=200)
+    true_counts = exact.reindex(top["User_Name"]).to_numpy()
+    assert (top["Count"].to_numpy() >= true_counts).all()
+    assert (top["Count"].to_numpy() - top["Error"].to_numpy() <= true_counts).all()
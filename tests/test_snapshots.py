@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from github_analysis.snapshots import GROWTH_METRICS, SnapshotStore, UrlIndex
+
+
+def scrape(repos: np.ndarray, seed: int) -> pd.DataFrame:
+    """A cleaned scrape of the repos numbered ``repos``, with random counts."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "Url": [f"https://github.com/user{repo % 7}/repo{repo}" for repo in repos],
+            "Repo_Name": [f"repo{repo}" for repo in repos],
+            "User_Name": [f"user{repo % 7}" for repo in repos],
+            "Topic": [f"topic{repo % 3}" for repo in repos],
+            "Topic_Tags": [f"['tag{repo % 5}', 'tag{repo % 11}']" for repo in repos],
+        }
+    )
+    for col in GROWTH_METRICS:
+        frame[col] = rng.integers(0, 1000, len(repos)).astype(np.float64)
+    return frame
+
+
+def assert_consistent(store: SnapshotStore, scrapes: list) -> None:
+    """Every snapshot lists its scrape's first row per repo, and each repo keeps one id throughout."""
+    assert len(store.urls) == store.index.size
+    ids = {}
+    for position, frame in enumerate(scrapes):
+        snapshot = store.snapshot(position)
+        expected = frame.drop_duplicates("Url").sort_values("Url").reset_index(drop=True)
+        actual = snapshot.sort_values("Url").reset_index()
+        assert_frame_equal(actual.drop(columns="repo_id"), expected, check_dtype=False)
+        for url, repo_id in zip(actual["Url"], actual["repo_id"]):
+            assert ids.setdefault(url, repo_id) == repo_id
+            assert store.urls[repo_id] == url
+    assert len(set(ids.values())) == len(ids)
+
+
+def test_ids_survive_reopening_and_run_merges(tmp_path):
+    rng = np.random.default_rng(0)
+    scrapes = []
+    for position in range(8):
+        # Some repos drop out, new ones appear, and a few are listed twice
+        repos = rng.choice(60 * (position + 1), size=50, replace=False)
+        scrapes.append(scrape(np.concatenate([repos, repos[:3]]), seed=position))
+        SnapshotStore(tmp_path).ingest(scrapes[-1], timestamp=f"2024-01-{position + 1:02d}")
+        store = SnapshotStore(tmp_path)
+        assert_consistent(store, scrapes)
+    # Runs were merged along the way, and their files removed
+    assert len(store.index.runs) < len(scrapes)
+    assert len(list(tmp_path.glob("index-*-hashes.npy"))) == len(store.index.runs)
+
+
+def test_normalized_urls_keep_their_id(tmp_path):
+    store = SnapshotStore(tmp_path)
+    first = scrape(np.arange(5), seed=0)
+    store.ingest(first, timestamp="2024-01-01")
+    second = scrape(np.arange(5), seed=1)
+    second["Url"] = [url.upper().replace("https://", "http://www.") + ".git/" for url in first["Url"]]
+    store.ingest(second, timestamp="2024-01-02")
+    assert store.manifest[-1]["new_repos"] == 0
+    assert len(store.deltas()) == 5
+    assert store.urls == first["Url"].tolist()
+
+
+def test_failed_ingest_leaves_urls_aligned_with_ids(tmp_path, monkeypatch):
+    def fail(self, *args):
+        raise OSError("disk full")
+
+    store = SnapshotStore(tmp_path)
+    store.ingest(scrape(np.arange(10), seed=0), timestamp="2024-01-01")
+    with monkeypatch.context() as patch:
+        patch.setattr(UrlIndex, "_commit", fail)
+        with pytest.raises(OSError):
+            store.ingest(scrape(np.arange(5, 20), seed=1), timestamp="2024-01-02")
+    # Urls of the failed ingest were appended, but are not committed
+    assert (tmp_path / "urls.txt").read_text().count("\n") == 20
+    assert SnapshotStore(tmp_path).urls == store.urls[:10]
+
+    scrapes = [scrape(np.arange(10), seed=0), scrape(np.arange(15, 30), seed=2)]
+    # The store that saw the failure and a reopened one both stay aligned
+    store.ingest(scrapes[1], timestamp="2024-01-02")
+    assert_consistent(store, scrapes)
+    assert_consistent(SnapshotStore(tmp_path), scrapes)
+    assert (tmp_path / "urls.txt").read_text().count("\n") == 25
+
+
+def test_index_is_rebuilt_from_the_urls(tmp_path):
+    scrapes = [scrape(np.arange(0, 30), seed=0), scrape(np.arange(10, 50), seed=1)]
+    store = SnapshotStore(tmp_path)
+    for day, frame in enumerate(scrapes, start=1):
+        store.ingest(frame, timestamp=f"2024-01-0{day}")
+    (tmp_path / "index.json").unlink()
+    store = SnapshotStore(tmp_path)
+    assert store.index.size == 50
+    scrapes.append(scrape(np.arange(40, 60), seed=2))
+    store.ingest(scrapes[-1], timestamp="2024-01-03")
+    assert_consistent(SnapshotStore(tmp_path), scrapes)
+
+
+def test_deltas_match_a_merge_on_url(tmp_path):
+    store = SnapshotStore(tmp_path)
+    before, after = scrape(np.arange(0, 80), seed=0), scrape(np.arange(20, 100), seed=1)
+    store.ingest(before, timestamp="2024-01-01")
+    store.ingest(after, timestamp="2024-01-11")
+    merged = after.merge(before, on="Url", suffixes=("", "_Before"))
+    for col in GROWTH_METRICS:
+        merged[f"{col}_Delta"] = merged[col] - merged[f"{col}_Before"]
+
+    # Repo ids follow first appearance, which is also the row order of ``merged``
+    deltas = store.deltas().reset_index(drop=True)
+    columns = ["Url", "Repo_Name", "User_Name", "Topic", *GROWTH_METRICS, *(f"{col}_Delta" for col in GROWTH_METRICS)]
+    assert_frame_equal(deltas[columns], merged[columns], check_dtype=False)
+    assert (deltas["Days"] == 10).all()
+
+    fastest = store.fastest_growing(10, by="Fork")
+    expected = merged.sort_values("Fork_Delta", ascending=False, kind="stable").head(10)
+    assert fastest["Url"].tolist() == expected["Url"].tolist()
+    per_day = store.fastest_growing(10, by="Star", per_day=True)
+    np.testing.assert_allclose(per_day["Star_Per_Day"], per_day["Star_Delta"] / 10)
+
+
+def test_timestamps_must_increase(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.ingest(scrape(np.arange(5), seed=0), timestamp="2024-01-02")
+    for timestamp in ("2024-01-02", "2024-01-01T23:59:59"):
+        with pytest.raises(ValueError, match="not newer"):
+            store.ingest(scrape(np.arange(5), seed=1), timestamp=timestamp)
+    assert len(SnapshotStore(tmp_path)) == 1
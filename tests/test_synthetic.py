@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from github_analysis.cleaning import parse_counts
+from github_analysis.synthetic import SyntheticScrape, _format_abbreviated
+
+
+def test_abbreviated_counts_round_to_the_next_suffix():
+    values = np.array([999, 1_000, 1_050, 999_949, 999_950, 999_999, 1_000_000, 12_345_678])
+    assert _format_abbreviated(values).tolist() == ["999", "1k", "1.1k", "999.9k", "1m", "1m", "1m", "12.3m"]
+    values = np.arange(0, 2_000_000, 7)
+    text = pd.Series(_format_abbreviated(values))
+    assert not text.str.contains("1000k").any()
+    # One decimal of the suffix: within 5% of the value
+    np.testing.assert_allclose(parse_counts(text).to_numpy(), values, rtol=0.05, atol=0)
+
+
+def test_names_follow_the_sampled_ranks():
+    scrape = SyntheticScrape(10_000, seed=1)
+    chunk = pd.concat(scrape.chunks(chunksize=3_000), ignore_index=True)
+    assert chunk["user"].str.fullmatch(r"user\d+").all()
+    assert (chunk["url"] == "https://github.com/" + chunk["user"] + "/" + chunk["name"]).all()
+    tags = chunk["topic_tag"].str.findall(r"'([^']*)'").explode().dropna()
+    assert tags.str.fullmatch(r"tag-\d+").all()
+    # Zipf-distributed users: the most frequent one owns far more repos than the median one
+    counts = chunk["user"].value_counts()
+    assert counts.iloc[0] > 20 * counts.median()
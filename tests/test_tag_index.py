@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from github_analysis.loading import load_github_df
+from github_analysis.tag_index import TagIndex
+from github_analysis.tags import parse_topic_tags
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+
+
+@pytest.fixture(scope="module")
+def github_df():
+    return load_github_df(CSV)[0]
+
+
+@pytest.fixture(scope="module")
+def index(github_df):
+    return TagIndex(parse_topic_tags(github_df["Topic_Tags"]), github_df)
+
+
+def expected_top_k(github_df, index, tags, k, by, mode):
+    rows = [set(index.posting(tag).tolist()) for tag in tags]
+    rows = sorted(set.intersection(*rows) if mode == "and" else set.union(*rows))
+    # Ties in row order; the frame's index holds row positions
+    return github_df.iloc[rows][by].dropna().sort_values(ascending=False, kind="stable").head(k).index.to_numpy()
+
+
+@pytest.mark.parametrize("mode", ["and", "or"])
+@pytest.mark.parametrize("by", ["Star", "Fork"])
+def test_top_k_matches_nlargest(github_df, index, mode, by):
+    common = [index.vocab[i] for i in np.argsort(-np.diff(index.offsets), kind="stable")[:12]]
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        tags = list(rng.choice(common, size=rng.integers(1, 4), replace=False))
+        for k in (1, 10, 50):
+            expected = expected_top_k(github_df, index, tags, k, by, mode)
+            np.testing.assert_array_equal(index.top_k(tags, k=k, by=by, mode=mode), expected)
+
+
+def test_query_matches_sets(index):
+    tags = [index.vocab[i] for i in np.argsort(-np.diff(index.offsets), kind="stable")[:4]]
+    postings = [set(index.posting(tag).tolist()) for tag in tags]
+    np.testing.assert_array_equal(index.query(all_of=tags[:2]), sorted(postings[0] & postings[1]))
+    np.testing.assert_array_equal(index.query(any_of=tags), sorted(set.union(*postings)))
+    np.testing.assert_array_equal(
+        index.query(all_of=tags[:1], any_of=tags[2:]), sorted(postings[0] & (postings[2] | postings[3]))
+    )
@@ -0,0 +1,27 @@
+import ast
+from pathlib import Path
+
+import pandas as pd
+
+from github_analysis.loading import load_github_df
+from github_analysis.tags import parse_topic_tags
+
+CSV = str(Path(__file__).resolve().parent.parent / "Github_data.csv")
+
+
+def literal_tags(series: pd.Series) -> list:
+    """Tags per row as In[22] gets them."""
+    return [ast.literal_eval(value) if isinstance(value, str) else [] for value in series.tolist()]
+
+
+def test_parse_matches_literal_eval():
+    topic_tags = load_github_df(CSV, columns=["Topic_Tags"])[0]["Topic_Tags"]
+    table = parse_topic_tags(topic_tags)
+    assert [table.tags_of(row) for row in range(len(table))] == literal_tags(topic_tags)
+
+
+def test_double_quoted_values_fall_back_per_row():
+    series = pd.Series(["['a', 'b']", None, "[\"it's\", 'x']", "[]", "['b', 'c']", '["q"]', "['a']"])
+    table = parse_topic_tags(series)
+    assert [table.tags_of(row) for row in range(len(table))] == literal_tags(series)
+    assert table.vocab.tolist() == ["a", "b", "it's", "x", "c", "q"]